@@ -21,17 +21,24 @@ from colorama import init, Fore, Style
 from typing import Any, List, Tuple, Callable, Dict
 from typing_extensions import Literal
 
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
 import traceback
+import threading
 import platform
+import time
+import zipfile
 import hashlib
+import bisect
 import shutil
 import locale
 import json
 import sys
+import io
 import os
 
 from create_bundle import BundleCreator
+from file_sync import SyncResult, sync_files, tree_files
 
 """
 Print functions
@@ -74,6 +81,13 @@ def print_summary(success: bool, failed_steps: List[str]) -> None:
     print("="*40 + "\n")
 
 
+def print_timings(results: Dict[str, Tuple[str, float]], total: float) -> None:
+    print("\nStep times:")
+    for name, (status, seconds) in results.items():
+        print(f"  {name:<28} {seconds:8.2f} s  {status}")
+    print(f"  {'Total (wall time)':<28} {total:8.2f} s")
+
+
 """
 Definitions
 """
@@ -93,6 +107,17 @@ STEP_SYMBOL: Literal['==>'] = "==>"
 ROOT: Path = Path(__file__).parent.parent.resolve()
 SNESIDEOUT: Path = ROOT / "SNES-IDE-out"
 
+# Buffer the chunks are streamed through while reconstructing files.
+COPY_BUFFER_BYTES: int = 8 * 1024 * 1024
+
+# Manifests from this version on carry a digest per chunk.
+CHUNK_DIGESTS_VERSION: int = 2
+
+MANIFEST_SUFFIX: str = ".snes.ide.reconstruct.manifest.json"
+
+# What previous builds restored and extracted; kept across clean_all.
+BUILD_STATE_FILE: Path = SNESIDEOUT / ".snes-ide-build-state.json"
+
 """
 Reconstruct chunk files
 """
@@ -102,6 +127,15 @@ class FileJoiner:
     """
     Reconstructs original file from chunks using JSON manifest.
     Validates integrity using checksum verification.
+
+    Chunks are streamed into a temporary file through one buffer, hashing
+    them as they are written, and the file is only moved into place once
+    its checksum matches.
+
+    Manifests of version 2 carry a digest per chunk: chunks are then
+    written and verified concurrently, each at its own offset, and the
+    chunks an existing or partly written file already holds are kept, so an
+    up to date file is only read and an interrupted one is resumed.
     """
 
     def __init__(self, manifest_path: str, output_path: str):
@@ -145,11 +179,28 @@ class FileJoiner:
                 'original_filename', 'total_size', 'checksum', 'chunks'
             ]
 
+            if self.version >= CHUNK_DIGESTS_VERSION:
+                required_fields = [
+                    'original_filename', 'total_size', 'digest_algorithm', 'digest', 'chunks'
+                ]
+
             if not all(field in self.manifest_data for field in required_fields):
 
                 print("Error: Invalid manifest file structure")
                 return False
 
+            if self.version >= CHUNK_DIGESTS_VERSION:
+
+                if self.manifest_data['digest_algorithm'] not in hashlib.algorithms_available:
+
+                    print(f"Error: Unsupported digest algorithm {self.manifest_data['digest_algorithm']}")
+                    return False
+
+                if not all('digest' in chunk_info for chunk_info in self.manifest_data['chunks']):
+
+                    print("Error: Invalid manifest file structure")
+                    return False
+
             return True
 
         except Exception as e:
@@ -157,6 +208,12 @@ class FileJoiner:
             print(f"Error loading manifest: {str(e)}")
             return False
 
+    @property
+    def version(self) -> int:
+        """Version of the manifest, 1 for manifests without one."""
+
+        return int(self.manifest_data.get('version', 1)) if self.manifest_data else 1
+
     def verify_chunks(self) -> bool:
         """
         Verify all chunks exist and have correct sizes.
@@ -214,11 +271,205 @@ class FileJoiner:
         hash_md5 = hashlib.md5()
 
         with open(file_path, "rb") as file:
-            for chunk in iter(lambda: file.read(4096), b""):
+            for chunk in iter(lambda: file.read(COPY_BUFFER_BYTES), b""):
                 hash_md5.update(chunk)
 
         return hash_md5.hexdigest()
 
+    @staticmethod
+    def _stream_chunk(chunk_path: Path, output_file: Any, digest: Any, buffer: bytearray) -> int:
+        """
+        Append a chunk to the output file, hashing it on the way.
+
+        Args:
+            chunk_path: Path to the chunk file
+            output_file: Binary file the chunk is appended to
+            digest: hashlib object updated with the chunk
+            buffer: Buffer the chunk is read into
+
+        Returns:
+            Number of bytes written
+        """
+
+        view: memoryview = memoryview(buffer)
+        written: int = 0
+
+        with open(chunk_path, 'rb', buffering=0) as chunk_file:
+            while True:
+                read: int = chunk_file.readinto(buffer)
+
+                if not read:
+                    break
+
+                digest.update(view[:read])
+                output_file.write(view[:read])
+                written += read
+
+        return written
+
+    def extract(self, destination: Path) -> List[str]:
+        """
+        Extract the zip archive of the manifest straight from its chunks.
+
+        The reconstructed archive is never written; every member is checked
+        against its CRC while it is extracted. Existing files are replaced,
+        not written through, as they may be links to the sources.
+
+        Args:
+            destination: Directory to extract the archive into
+
+        Returns:
+            Paths of the extracted files, relative to the destination
+
+        Raises:
+            Exception: If the manifest or the chunks are invalid
+            zipfile.BadZipFile: If the archive is corrupted
+        """
+
+        if not self.load_manifest() or not self.verify_chunks() or not self.manifest_data:
+            raise Exception(f"Invalid manifest or chunks: {self.manifest_path}")
+
+        reader: ChunkReader = ChunkReader(Path(self.manifest_path).parent, self.manifest_data['chunks'])
+
+        with io.BufferedReader(reader, COPY_BUFFER_BYTES) as stream:
+            with zipfile.ZipFile(stream) as archive:
+                files: List[str] = []
+
+                for member in archive.infolist():
+
+                    if not member.is_dir():
+                        (destination / member.filename).unlink(missing_ok=True)
+
+                    extracted: Path = Path(archive.extract(member, destination))
+
+                    if not member.is_dir():
+                        files.append(extracted.relative_to(destination).as_posix())
+
+                return files
+
+    def _hash_range(self, file_path: Path, start: int, size: int) -> str:
+        """
+        Calculate the digest of a byte range of a file, with the algorithm of the manifest.
+
+        Args:
+            file_path: Path to the file
+            start: Offset of the range
+            size: Size of the range
+
+        Returns:
+            Digest hex string
+        """
+
+        digest = hashlib.new(str(self.manifest_data['digest_algorithm']))  # type: ignore
+        buffer: bytearray = bytearray(min(COPY_BUFFER_BYTES, max(size, 1)))
+        view: memoryview = memoryview(buffer)
+
+        with open(file_path, 'rb', buffering=0) as file:
+            file.seek(start)
+
+            while size > 0:
+                read: int = file.readinto(view[:min(size, len(buffer))])
+
+                if not read:
+                    break
+
+                digest.update(view[:read])
+                size -= read
+
+        return digest.hexdigest()
+
+    def _restore_chunk(self, chunk_info: Dict[str, Any], file_path: Path, keep_valid: bool) -> bool:
+        """
+        Write a chunk at its offset in the file, verifying its digest.
+
+        Args:
+            chunk_info: The chunk entry of the manifest
+            file_path: Path to the file being reconstructed, already of its full size
+            keep_valid: Whether to keep the bytes of the file if they already match the chunk
+
+        Returns:
+            True if the chunk was written, False if the file already held it
+
+        Raises:
+            ValueError: If the chunk does not match its digest
+        """
+
+        chunk_path: Path = Path(self.manifest_path).parent / chunk_info['filename']
+        start: int = int(chunk_info['start_byte'])
+
+        if keep_valid and self._hash_range(file_path, start, int(chunk_info['size'])) == chunk_info['digest']:
+            return False
+
+        digest = hashlib.new(str(self.manifest_data['digest_algorithm']))  # type: ignore
+
+        with open(file_path, 'r+b') as output_file:
+            output_file.seek(start)
+            self._stream_chunk(chunk_path, output_file, digest, bytearray(COPY_BUFFER_BYTES))
+
+        if digest.hexdigest() != chunk_info['digest']:
+            raise ValueError(f"Chunk {chunk_path} is corrupted (digest mismatch)")
+
+        return True
+
+    def _join_chunks_concurrently(self, target: Path, sorted_chunks: List[Dict[str, Any]]) -> bool:
+        """
+        Reconstruct the file from chunks with digests, several chunks at once.
+
+        Args:
+            target: Path of the reconstructed file
+            sorted_chunks: The chunk entries of the manifest, by index
+
+        Returns:
+            True if successful, False otherwise
+        """
+
+        total_size: int = int(self.manifest_data['total_size'])  # type: ignore
+        temporary: Path = target.with_name(target.name + ".part")
+
+        # An existing file is checked (and repaired) as the temporary file,
+        # so the target never holds a half written file.
+        if target.exists() and target.stat().st_size == total_size:
+            os.replace(target, temporary)
+
+        keep_valid: bool = temporary.exists() and temporary.stat().st_size == total_size
+
+        if not keep_valid:
+            with open(temporary, 'wb') as output_file:
+                output_file.truncate(total_size)
+
+        def restore(chunk_info: Dict[str, Any]) -> 'bool|None':
+            try:
+                written: bool = self._restore_chunk(chunk_info, temporary, keep_valid)
+
+            except (OSError, ValueError) as e:
+                print(f"Error: {e}")
+                return None
+
+            print(f"{'Processed' if written else 'Kept'} chunk {chunk_info['index']:03d}:"
+                  f" {Path(self.manifest_path).parent / chunk_info['filename']} "
+                  f"({chunk_info['size'] / (1024 * 1024):.2f} MB) "
+                  f"[{chunk_info['start_byte']}-{chunk_info['end_byte']}]")
+
+            return written
+
+        with ThreadPoolExecutor(max_workers=max(1, min(len(sorted_chunks), os.cpu_count() or 1))) as pool:
+            results: List['bool|None'] = list(pool.map(restore, sorted_chunks))
+
+        if None in results:
+            # The valid chunks are kept in the temporary file for the next attempt.
+            print(f"Error: {results.count(None)} corrupted or unreadable chunks")
+            return False
+
+        os.replace(temporary, target)
+
+        if any(results):
+            print(f"File integrity verified - {results.count(True)} chunks written, "
+                  f"{results.count(False)} already up to date")
+        else:
+            print(f"{target.name} is up to date")
+
+        return True
+
     def join(self) -> bool:
         """
         Reconstruct the original file from chunks.
@@ -253,67 +504,268 @@ class FileJoiner:
             sorted_chunks = sorted(
                 self.manifest_data['chunks'], key=lambda x: x['index'])
 
-            with open(
-                str(Path(self.output_path) /
-                    self.manifest_data['original_filename']),
-                'wb'
-            ) as output_file:
+            target: Path = Path(self.output_path) / self.manifest_data['original_filename']
 
-                for i, chunk_info in enumerate(sorted_chunks):
+            if self.version >= CHUNK_DIGESTS_VERSION:
+                return self._join_chunks_concurrently(target, sorted_chunks)
 
-                    chunk_path = chunk_info['filename']
+            temporary: Path = target.with_name(target.name + ".part")
 
-                    with open(
-                        Path(self.manifest_path).parent / chunk_path, 'rb'
-                    ) as chunk_file:
+            hash_md5 = hashlib.md5()
+            buffer: bytearray = bytearray(COPY_BUFFER_BYTES)
+            reconstructed_size: int = 0
 
-                        chunk_data = chunk_file.read()
-                        output_file.write(chunk_data)
+            try:
+                with open(temporary, 'wb') as output_file:
 
-                    progress = ((i + 1) / len(sorted_chunks)) * 100
+                    for i, chunk_info in enumerate(sorted_chunks):
 
-                    print(f"Processed chunk {chunk_info['index']:03d}:"
-                          f" {Path(self.manifest_path).parent / chunk_path} "
-                          f"({chunk_info['size'] / (1024 * 1024):.2f} MB) "
-                          f"[{chunk_info['start_byte']}-{chunk_info['end_byte']}] - "
-                          f"{progress:.1f}%")
+                        chunk_path = chunk_info['filename']
 
-            print("\nVerifying file integrity...")
-            reconstructed_size = os.path.getsize(
-                str(Path(self.output_path) /
-                    self.manifest_data['original_filename'])
-            )
-            expected_size = self.manifest_data['total_size']
+                        reconstructed_size += self._stream_chunk(
+                            Path(self.manifest_path).parent / chunk_path, output_file, hash_md5, buffer
+                        )
 
-            if reconstructed_size != expected_size:
-                print(
-                    f"Error: Size mismatch (expected:"
-                    f" {expected_size}, actual: {reconstructed_size})"
-                )
-                return False
+                        progress = ((i + 1) / len(sorted_chunks)) * 100
 
-            actual_checksum = self.calculate_checksum(str(Path(
-                Path(self.output_path) /
-                self.manifest_data['original_filename']
-            )))
-            expected_checksum = self.manifest_data['checksum']
+                        print(f"Processed chunk {chunk_info['index']:03d}:"
+                              f" {Path(self.manifest_path).parent / chunk_path} "
+                              f"({chunk_info['size'] / (1024 * 1024):.2f} MB) "
+                              f"[{chunk_info['start_byte']}-{chunk_info['end_byte']}] - "
+                              f"{progress:.1f}%")
 
-            print(f"Expected checksum: {expected_checksum}")
-            print(f"Actual checksum: {actual_checksum}")
+                print(f"\nVerifying file integrity of {target.name}...")
+                expected_size = int(self.manifest_data['total_size'])
 
-            if actual_checksum == expected_checksum:
-                print("File integrity verified - checksums match!")
-                return True
+                if reconstructed_size != expected_size:
+                    print(
+                        f"Error: Size mismatch (expected:"
+                        f" {expected_size}, actual: {reconstructed_size})"
+                    )
+                    return False
 
-            else:
-                print("Error: Checksum mismatch - file may be corrupted")
-                return False
+                actual_checksum = hash_md5.hexdigest()
+                expected_checksum = self.manifest_data['checksum']
+
+                print(f"Expected checksum: {expected_checksum}")
+                print(f"Actual checksum: {actual_checksum}")
+
+                if actual_checksum != expected_checksum:
+                    print("Error: Checksum mismatch - file may be corrupted")
+                    return False
+
+                os.replace(temporary, target)
+
+            finally:
+                if temporary.exists():
+                    temporary.unlink()
+
+            print("File integrity verified - checksums match!")
+            return True
 
         except Exception as e:
             print(f"Error during file joining: {str(e)}")
             raise e
 
 
+class ChunkReader(io.RawIOBase):
+    """
+    Reads the file of a manifest straight from its chunks, as one seekable
+    stream, so archives can be extracted without reconstructing them.
+    """
+
+    def __init__(self, directory: Path, chunks: List[Dict[str, Any]]) -> None:
+        """
+        Initialize the reader.
+
+        Args:
+            directory: Directory of the chunk files
+            chunks: The chunk entries of the manifest
+        """
+
+        super().__init__()
+
+        self.directory: Path = directory
+        self.chunks: List[Dict[str, Any]] = sorted(chunks, key=lambda x: int(x['start_byte']))
+        self.starts: List[int] = [int(chunk_info['start_byte']) for chunk_info in self.chunks]
+        self.size: int = sum(int(chunk_info['size']) for chunk_info in self.chunks)
+        self.position: int = 0
+        self.handles: Dict[int, Any] = {}
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base: int = {io.SEEK_SET: 0, io.SEEK_CUR: self.position, io.SEEK_END: self.size}[whence]
+
+        if base + offset < 0:
+            raise ValueError("Negative seek position")
+
+        self.position = base + offset
+        return self.position
+
+    def readinto(self, buffer: Any) -> int:
+        if self.position >= self.size:
+            return 0
+
+        index: int = bisect.bisect_right(self.starts, self.position) - 1
+        offset: int = self.position - self.starts[index]
+
+        if index not in self.handles:
+            self.handles[index] = open(self.directory / self.chunks[index]['filename'], 'rb')
+
+        handle: Any = self.handles[index]
+        handle.seek(offset)
+
+        view: memoryview = memoryview(buffer).cast('B')
+        read: int = handle.readinto(view[:min(len(view), int(self.chunks[index]['size']) - offset)])
+
+        self.position += read
+        return read
+
+    def close(self) -> None:
+        for handle in self.handles.values():
+            handle.close()
+
+        self.handles.clear()
+        super().close()
+
+
+class BuildState:
+    """
+    JSON record of the files previous builds restored and extracted, by the
+    digest of their manifest, so unchanged archives are skipped.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """
+        Load the build state, starting empty if it is missing or unreadable.
+
+        Args:
+            path: Path to the state file
+        """
+
+        self.path: Path = path
+        self.lock: threading.Lock = threading.Lock()
+        self.data: Dict[str, Dict[str, Any]] = {'restored': {}, 'extracted': {}, 'copied': {}}
+
+        try:
+            with open(path, 'r') as state_file:
+                data: Any = json.load(state_file)
+
+            if isinstance(data, dict):
+                self.data.update({key: data[key] for key in self.data if isinstance(data.get(key), dict)})
+
+        except (OSError, ValueError):
+            pass
+
+    def get(self, section: str, key: str) -> 'Dict[str, Any]|None':
+        """Get the entry recorded for a file."""
+
+        with self.lock:
+            return self.data[section].get(key)
+
+    def set(self, section: str, key: str, entry: 'Dict[str, Any]|None') -> None:
+        """Record the entry of a file, or forget it with None, and save the state."""
+
+        with self.lock:
+            if entry is None:
+                self.data[section].pop(key, None)
+            else:
+                self.data[section][key] = entry
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+            temporary: Path = self.path.with_name(self.path.name + ".tmp")
+            temporary.write_text(json.dumps(self.data))
+            os.replace(temporary, self.path)
+
+    def extracted_files(self) -> List[str]:
+        """Paths, relative to SNES-IDE-out, of every file extracted from archives."""
+
+        with self.lock:
+            return [path for entry in self.data['extracted'].values() for path in entry.get('files', [])]
+
+    def output_files(self) -> List[str]:
+        """Paths, relative to SNES-IDE-out, of every file extracted or copied by a build step."""
+
+        with self.lock:
+            return [
+                path for section in ('extracted', 'copied')
+                for entry in self.data[section].values() for path in entry.get('files', [])
+            ]
+
+
+_build_state: 'BuildState|None' = None
+_build_state_lock: threading.Lock = threading.Lock()
+
+
+def get_build_state() -> BuildState:
+    """
+    Get the build state, loaded once and shared by every build step.
+    """
+
+    global _build_state
+
+    with _build_state_lock:
+        if _build_state is None or _build_state.path != BUILD_STATE_FILE:
+            _build_state = BuildState(BUILD_STATE_FILE)
+
+        return _build_state
+
+
+def manifest_digest(manifest_path: Path) -> str:
+    """
+    Get the digest of the file a manifest reconstructs.
+
+    Args:
+        manifest_path: Path to the manifest
+
+    Returns:
+        The whole file digest of a version 2 manifest, the checksum otherwise
+    """
+
+    with open(manifest_path, 'r') as manifest_file:
+        manifest_data: Dict[str, Any] = json.load(manifest_file)
+
+    if 'digest' in manifest_data:
+        return f"{manifest_data['digest_algorithm']}:{manifest_data['digest']}"
+
+    return f"md5:{manifest_data['checksum']}"
+
+
+def tree_digest(root: Path, files: List[str]) -> 'str|None':
+    """
+    Digest the paths, sizes and modification times of files.
+
+    Args:
+        root: Directory the paths are relative to
+        files: The file paths
+
+    Returns:
+        The digest, None if a file is missing
+    """
+
+    digest = hashlib.blake2b()
+
+    for file in sorted(files):
+        try:
+            stat: os.stat_result = (root / file).stat()
+
+        except OSError:
+            return None
+
+        digest.update(f"{file}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+
+    return digest.hexdigest()
+
+
 def get_executable_path() -> str:
     """
     Get Script Path, by using the path of the script itself.
@@ -330,56 +782,170 @@ Build Steps
 def clean_all() -> None:
     """
     Clean the SNES-IDE-out directory.
+
+    Files extracted and copied by previous builds are kept, along with the
+    build state, so unchanged archives are not extracted again and unchanged
+    files are not copied again; every other file is removed.
     """
 
-    if SNESIDEOUT.exists():
+    if not SNESIDEOUT.exists():
+        return
+
+    state: BuildState = get_build_state()
+    keep: set = set(state.output_files()) | {BUILD_STATE_FILE.name}
+
+    if keep == {BUILD_STATE_FILE.name}:
         shutil.rmtree(SNESIDEOUT)
+        return
+
+    # Deepest paths first, so emptied directories are removed too.
+    for path in sorted(SNESIDEOUT.rglob("*"), key=lambda x: len(x.parts), reverse=True):
+
+        if path.is_dir() and not path.is_symlink():
+            if not any(path.iterdir()):
+                path.rmdir()
+
+        elif path.relative_to(SNESIDEOUT).as_posix() not in keep:
+            path.unlink()
 
     return
 
 
+def get_platform_name() -> str:
+    """
+    Get the name of the resources/bin directory of the current platform.
+    """
+
+    system: str = platform.system().lower()
+
+    return 'macos' if system == 'darwin' else system
+
+
+def extracted_manifests() -> List[Path]:
+    """
+    Get the manifests of the archives extracted straight from their chunks:
+    the zip archives of the binaries of the current platform.
+    """
+
+    return sorted(
+        file for file in (ROOT / 'resources' / 'bin' / get_platform_name()).rglob(f"*.zip{MANIFEST_SUFFIX}")
+        if not file.is_dir()
+    )
+
+
 def restore_big_files() -> None:
     """
     Restore all files that were previously split into chunks and stored in the resources directory.
 
     This function goes through all files with the extension "*.snes.ide.reconstruct.manifest.json" in the resources directory,
-    and uses the FileJoiner class to join the chunks back into a single file. If the joining process is successful,
-    it prints a message indicating the file that was reconstructed. If the joining process fails, it raises an exception.
+    and uses the FileJoiner class to join the chunks back into a single file, several files at once. If the joining process
+    is successful, it prints a message indicating the file that was reconstructed. If the joining process fails for any
+    file, it raises an exception once every file was processed.
+
+    Files already reconstructed from the same manifest, and left untouched since, are skipped. The archives of the
+    binaries of the current platform are not reconstructed: decompress_zip_files_in_out extracts them from the chunks.
     """
 
-    for file in (ROOT / 'resources').rglob("*.snes.ide.reconstruct.manifest.json"):
+    state: BuildState = get_build_state()
+    skipped: List[Path] = extracted_manifests()
 
-        if file.is_dir():
-            continue
+    manifests: List[Path] = [
+        file for file in (ROOT / 'resources').rglob(f"*{MANIFEST_SUFFIX}")
+        if not file.is_dir() and file not in skipped
+    ]
 
+    def restore(file: Path) -> bool:
         joiner: FileJoiner = FileJoiner(str(file), str(file.parent))
+        output: Path = file.with_name(file.name[:-len(MANIFEST_SUFFIX)])
+        key: str = file.relative_to(ROOT).as_posix()
 
         try:
+            digest: str = manifest_digest(file)
+            entry: 'Dict[str, Any]|None' = state.get('restored', key)
+
+            if entry is not None and entry.get('manifest') == digest and output.exists() and \
+                    entry.get('file') == tree_digest(output.parent, [output.name]):
+
+                print(f"Up to date: {output}")
+                return True
+
             if joiner.join():
+                state.set('restored', key, {
+                    'manifest': digest, 'file': tree_digest(output.parent, [output.name])
+                })
                 print(f"Reconstructed file: {file}")
-
-            else:
-                raise Exception(f"Failed to reconstruct file: {file}")
+                return True
 
         except Exception as e:
-
             traceback.print_exception(Exception, e, None)
-            raise Exception(f"Failed to reconstruct file: {file}")
+
+        return False
+
+    # Files are restored concurrently: reading, hashing and writing chunks
+    # releases the GIL, so the disk and the CPU stay busy.
+    with ThreadPoolExecutor(max_workers=max(1, min(len(manifests), os.cpu_count() or 1))) as pool:
+        failed: List[Path] = [
+            file for file, restored in zip(manifests, pool.map(restore, manifests)) if not restored
+        ]
+
+    if failed:
+        raise Exception(f"Failed to reconstruct files: {', '.join(str(file) for file in failed)}")
 
     return
 
 
+def sync_output(step: str, files: Dict[Path, Path]) -> SyncResult:
+    """
+    Copy files into SNES-IDE-out, writing only the changed ones, as hardlinks
+    or reflinks when the filesystem supports them.
+
+    The files a step copied in the previous build but no longer does are
+    removed; files extracted from archives are left to the extraction.
+
+    Args:
+        step: Name the step's files are recorded under in the build state
+        files: Destination paths in SNES-IDE-out mapped to their sources
+
+    Returns:
+        SyncResult of the copy
+    """
+
+    state: BuildState = get_build_state()
+    extracted: set = set(state.extracted_files())
+
+    files = {
+        destination: source for destination, source in files.items()
+        if destination.relative_to(SNESIDEOUT).as_posix() not in extracted
+    }
+
+    previous: Dict[str, Any] = state.get('copied', step) or {}
+    stale: List[Path] = [SNESIDEOUT / file for file in previous.get('files', []) if file not in extracted]
+
+    result: SyncResult = sync_files(files, stale)
+
+    state.set('copied', step, {
+        'files': sorted(destination.relative_to(SNESIDEOUT).as_posix() for destination in files)
+    })
+
+    print(f"{step}: {result.summary()}")
+    return result
+
+
+def root_files() -> Dict[Path, Path]:
+    """
+    Get the files of the root directory, mapped from their path in SNES-IDE-out.
+    """
+
+    return {SNESIDEOUT / file.name: file for file in ROOT.glob("*.*") if not file.is_dir()}
+
+
 def copy_root() -> None:
     """
     Copy all files from the root directory to the SNES-IDE-out directory.
     """
     SNESIDEOUT.mkdir(exist_ok=True)
 
-    for file in ROOT.glob("*.*"):
-        if file.is_dir():
-            continue
-
-        shutil.copy(file, SNESIDEOUT / file.name)
+    sync_output("root", root_files())
 
     return
 
@@ -389,17 +955,9 @@ def copy_lib() -> None:
     Copy all files from the lib directory to the SNES-IDE-out directory.
     """
 
-    (SNESIDEOUT / 'libs').mkdir(exist_ok=True)
-
-    for file in (ROOT / 'resources' / 'libs').rglob("*"):
+    (SNESIDEOUT / 'libs').mkdir(parents=True, exist_ok=True)
 
-        if file.is_dir():
-            continue
-
-        rel_path: Path = file.relative_to(ROOT / 'resources' / 'libs')
-        dest_path: Path = SNESIDEOUT / 'libs' / rel_path
-        dest_path.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy(file, dest_path)
+    sync_output("libs", tree_files(ROOT / 'resources' / 'libs', SNESIDEOUT / 'libs'))
 
     return
 
@@ -409,17 +967,9 @@ def copy_docs() -> None:
     Copy the docs directory to the SNES-IDE-out directory.
     """
 
-    (SNESIDEOUT / 'docs').mkdir(exist_ok=True)
-
-    for file in (ROOT / 'docs').rglob("*"):
-
-        if file.is_dir():
-            continue
+    (SNESIDEOUT / 'docs').mkdir(parents=True, exist_ok=True)
 
-        rel_path: Path = file.relative_to(ROOT / 'docs')
-        dest_path: Path = SNESIDEOUT / 'docs' / rel_path
-        dest_path.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy(file, dest_path)
+    sync_output("docs", tree_files(ROOT / 'docs', SNESIDEOUT / 'docs'))
 
     return
 
@@ -429,41 +979,29 @@ def copy_bin() -> None:
     Copy the bin files to the SNES-IDE-out directory.
     """
 
-    (SNESIDEOUT / 'bin').mkdir(exist_ok=True)
+    (SNESIDEOUT / 'bin').mkdir(parents=True, exist_ok=True)
 
-    system: str = platform.system().lower()
-
-    if system == 'darwin':
-        system = 'macos'
-
-    path: Path = ROOT / 'resources' / 'bin' / 'COPYING.md'
-    dest_path: Path = SNESIDEOUT / 'bin' / 'COPYING.md'
+    system: str = get_platform_name()
 
-    dest_path.parent.mkdir(parents=True, exist_ok=True)
-    shutil.copy(path, dest_path)
+    files: Dict[Path, Path] = {
+        SNESIDEOUT / 'bin' / 'COPYING.md': ROOT / 'resources' / 'bin' / 'COPYING.md'
+    }
 
-    for file in (ROOT / 'resources' / 'bin' / system).rglob("*"):
+    for dest_path, file in tree_files(ROOT / 'resources' / 'bin' / system, SNESIDEOUT / 'bin').items():
 
-        if file.is_dir():
+        if file.name.endswith(MANIFEST_SUFFIX):
             continue
 
-        if len(file.suffixes) == 6:
-            if \
-                    file.suffixes[1] == ".snes" and file.suffixes[2] == ".ide" and \
-                    file.suffixes[3] == ".reconstruct" and \
-                    file.suffixes[4] == ".manifest" and \
-                    file.suffixes[5] == ".json":
-
-                continue
-
         if ".chunk" in file.suffix:
             continue
 
-        rel_path: Path = file.relative_to(ROOT / 'resources' / 'bin' / system)
-        dest_path: Path = SNESIDEOUT / 'bin' / rel_path
+        # Archives of chunks are extracted straight from the chunks.
+        if file.with_name(file.name + MANIFEST_SUFFIX).exists():
+            continue
 
-        dest_path.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy(file, dest_path)
+        files[dest_path] = file
+
+    sync_output("bin", files)
 
     return
 
@@ -473,27 +1011,71 @@ def copy_source() -> None:
     Copies all files from the src directory to the SNES-IDE-out directory.
     """
 
-    for file in (ROOT / 'src').rglob("*"):
+    SNESIDEOUT.mkdir(exist_ok=True)
 
-        if file.is_dir():
-            continue
+    sync_output("source", tree_files(ROOT / 'src', SNESIDEOUT))
 
-        rel_path: Path = file.relative_to(ROOT / 'src')
-        dest_path: Path = SNESIDEOUT / rel_path
-        dest_path.parent.mkdir(parents=True, exist_ok=True)
+    return
 
-        shutil.copy(file, dest_path)
 
-    return
+def extract_archive(manifest: Path, state: BuildState) -> None:
+    """
+    Extract an archive of the binaries into SNES-IDE-out straight from its chunks,
+    unless the files extracted from the same manifest are still there untouched.
+
+    Args:
+        manifest: Manifest of the archive
+        state: The build state, updated with the extracted files
+    """
+
+    destination: Path = SNESIDEOUT / 'bin' / \
+        manifest.parent.relative_to(ROOT / 'resources' / 'bin' / get_platform_name())
+    key: str = manifest.relative_to(ROOT).as_posix()
+
+    digest: str = manifest_digest(manifest)
+    entry: 'Dict[str, Any]|None' = state.get('extracted', key)
+
+    if entry is not None and entry.get('manifest') == digest and \
+            entry.get('tree') == tree_digest(SNESIDEOUT, entry.get('files', [])):
+
+        print(f"Up to date: {destination}")
+        return
+
+    # Files of an older version of the archive must not linger.
+    for file in (entry or {}).get('files', []):
+        (SNESIDEOUT / file).unlink(missing_ok=True)
+
+    state.set('extracted', key, None)
+
+    files: List[str] = [
+        (destination / file).relative_to(SNESIDEOUT).as_posix()
+        for file in FileJoiner(str(manifest), str(manifest.parent)).extract(destination)
+    ]
+
+    state.set('extracted', key, {'manifest': digest, 'files': files, 'tree': tree_digest(SNESIDEOUT, files)})
+    print(f"Extracted {len(files)} files into: {destination}")
 
 
 def decompress_zip_files_in_out():
     """
     Decompresses all zip files in the SNES-IDE-out directory by unpacking them into
     their parent directory and deleting the zip file.
+
+    The archives of the binaries that are stored as chunks are extracted from
+    the chunks, and only when they changed since the last build.
     """
 
-    for file in (SNESIDEOUT).rglob("*.zip"):
+    state: BuildState = get_build_state()
+
+    with ThreadPoolExecutor(max_workers=max(1, os.cpu_count() or 1)) as pool:
+        list(pool.map(lambda manifest: extract_archive(manifest, state), extracted_manifests()))
+
+    extracted: set = set(state.extracted_files())
+
+    for file in list(SNESIDEOUT.rglob("*.zip")):
+
+        if file.relative_to(SNESIDEOUT).as_posix() in extracted:
+            continue
 
         if file.suffix == ".zip":
             shutil.unpack_archive(file, extract_dir=file.parent, format="zip")
@@ -554,28 +1136,174 @@ def run_step(step_name: str, func: Callable[..., None]) -> bool:
         return False
 
 
+class BuildStep:
+    """
+    A build step of the dependency graph run by run_steps.
+    """
+
+    def __init__(self, name: str, func: Callable[..., None], requires: Tuple[str, ...] = (),
+                 inputs: Tuple[Path, ...] = (), outputs: Tuple[Path, ...] = ()) -> None:
+        """
+        Initialize a build step.
+
+        Args:
+            name: Name of the step, shown in the logs and required by other steps
+            func: Function running the step, raising an exception on failure
+            requires: Names of the steps that must succeed before this one
+            inputs: Paths the step reads
+            outputs: Paths the step writes; a step never runs while another writes a path
+                it reads or writes, or a directory inside or containing one
+        """
+
+        self.name: str = name
+        self.func: Callable[..., None] = func
+        self.requires: Tuple[str, ...] = requires
+        self.inputs: Tuple[Path, ...] = inputs
+        self.outputs: Tuple[Path, ...] = outputs
+
+    def conflicts_with(self, other: 'BuildStep') -> bool:
+        """
+        Check if the step must wait for another: one writes a path the other
+        reads or writes, the same or a directory inside or containing it.
+
+        Args:
+            other: A running step
+
+        Returns:
+            True if both steps cannot run at once
+        """
+
+        def overlap(first: Path, second: Path) -> bool:
+            return first == second or first in second.parents or second in first.parents
+
+        def overlaps(written: Tuple[Path, ...], paths: Tuple[Path, ...]) -> bool:
+            return any(overlap(first, second) for first in written for second in paths)
+
+        return overlaps(self.outputs, other.inputs + other.outputs) or overlaps(other.outputs, self.inputs)
+
+
+def run_timed_step(step: BuildStep) -> Tuple[str, float]:
+    """
+    Run a build step, timing it.
+
+    Returns:
+        "ok" or "failed", and the wall time of the step in seconds
+    """
+
+    started: float = time.perf_counter()
+    succeeded: bool = run_step(step.name, step.func)
+
+    return ("ok" if succeeded else "failed"), time.perf_counter() - started
+
+
+def run_steps(steps: List[BuildStep], jobs: 'int|None' = None) -> Dict[str, Tuple[str, float]]:
+    """
+    Run build steps as a dependency graph: every step starts as soon as the
+    steps it requires succeeded, concurrently with the other ready steps, and
+    is skipped if one of them failed or was skipped.
+
+    Args:
+        steps: The build steps
+        jobs: Steps run at once, defaults to all the ready steps as they mostly wait for the disk
+
+    Returns:
+        Status ("ok", "failed" or "skipped") and wall time in seconds of every step, by name, in the order of steps
+
+    Raises:
+        ValueError: If a step requires an unknown step, or steps require each other
+    """
+
+    names: set = {step.name for step in steps}
+
+    for step in steps:
+        for required in step.requires:
+            if required not in names:
+                raise ValueError(f"Step {step.name} requires unknown step {required}")
+
+    results: Dict[str, Tuple[str, float]] = {}
+    pending: List[BuildStep] = list(steps)
+    running: Dict[Future, BuildStep] = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs or len(steps))) as pool:
+
+        while pending or running:
+
+            changed: bool = True
+
+            while changed:
+                changed = False
+
+                for step in list(pending):
+                    statuses: List[str] = [results[name][0] if name in results else "" for name in step.requires]
+
+                    if "failed" in statuses or "skipped" in statuses:
+                        pending.remove(step)
+                        results[step.name] = ("skipped", 0.0)
+                        print_fail(f"{step.name} skipped: a required step did not succeed.")
+                        changed = True
+
+                    elif all(status == "ok" for status in statuses) and not any(
+                        step.conflicts_with(other) for other in running.values()
+                    ):
+                        pending.remove(step)
+                        running[pool.submit(run_timed_step, step)] = step
+
+            if not running:
+                if pending:
+                    raise ValueError(f"Steps require each other: {', '.join(step.name for step in pending)}")
+
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                results[running.pop(future).name] = future.result()
+
+    return {step.name: results[step.name] for step in steps}
+
+
 def main() -> int:
     """
     Main function to run the build process.
+
+    Steps run concurrently once the steps they require succeeded; the steps
+    depending on a failed step are skipped.
     """
 
-    steps: List[Tuple[str, Callable[..., None]]] = [
-        ("Cleaning SNES-IDE-out", clean_all),
-        ("Restoring big files", restore_big_files),
-        ("Copying root files", copy_root),
-        ("Copying libs", copy_lib),
-        ("Copying docs", copy_docs),
-        ("Copying binary files", copy_bin),
-        ("Copying source code", copy_source),
-        ("Decompressing zip files", decompress_zip_files_in_out),
-        ("Generating bundle", generate_bundle),
+    clean: str = "Cleaning SNES-IDE-out"
+    copies: Tuple[str, ...] = (
+        "Copying root files", "Copying libs", "Copying docs", "Copying binary files", "Copying source code"
+    )
+    decompress: str = "Decompressing zip files"
+    restore: str = "Restoring big files"
+    root: Dict[Path, Path] = root_files()
+
+    steps: List[BuildStep] = [
+        BuildStep(clean, clean_all, outputs=(SNESIDEOUT,)),
+        BuildStep(restore, restore_big_files, (clean,),
+                  inputs=(ROOT / 'resources',), outputs=(ROOT / 'resources',)),
+        BuildStep("Copying root files", copy_root, (clean,),
+                  inputs=tuple(root.values()), outputs=tuple(root)),
+        BuildStep("Copying libs", copy_lib, (clean, restore),
+                  inputs=(ROOT / 'resources' / 'libs',), outputs=(SNESIDEOUT / 'libs',)),
+        BuildStep("Copying docs", copy_docs, (clean,),
+                  inputs=(ROOT / 'docs',), outputs=(SNESIDEOUT / 'docs',)),
+        BuildStep("Copying binary files", copy_bin, (clean, restore),
+                  inputs=(ROOT / 'resources' / 'bin',), outputs=(SNESIDEOUT / 'bin',)),
+        BuildStep("Copying source code", copy_source, (clean,),
+                  inputs=(ROOT / 'src',), outputs=tuple(SNESIDEOUT / file.name for file in (ROOT / 'src').iterdir())),
+        BuildStep(decompress, decompress_zip_files_in_out, copies,
+                  inputs=(ROOT / 'resources' / 'bin', SNESIDEOUT), outputs=(SNESIDEOUT / 'bin',)),
+        BuildStep("Generating bundle", generate_bundle, copies + (decompress,),
+                  inputs=(SNESIDEOUT,), outputs=(ROOT / "dist",)),
     ]
 
-    failed_steps: List[str] = []
-    for name, func in steps:
-        if not run_step(name, func):
-            failed_steps.append(name)
+    started: float = time.perf_counter()
+    results: Dict[str, Tuple[str, float]] = run_steps(steps)
+
+    failed_steps: List[str] = [name for name, (status, _) in results.items() if status != "ok"]
 
+    print_timings(results, time.perf_counter() - started)
     print_summary(len(failed_steps) == 0, failed_steps)
 
     return 0 if not failed_steps else -1
@@ -7,6 +7,8 @@ import shutil
 import venv
 import os
 
+from file_sync import sync_tree, unshare_file
+
 
 class BundleCreator:
 
@@ -125,6 +127,9 @@ class BundleCreator:
         """
         Copies the project files from the source directory to the target directory.
 
+        Files are hardlinked or cloned when the filesystem supports it, several
+        at once, and copied otherwise.
+
         Args:
             target_dir (str): The path to the target directory where the project 
             files will be copied.
@@ -136,7 +141,9 @@ class BundleCreator:
 
         target_dir_path.parent.mkdir(parents=True, exist_ok=True)
 
-        shutil.copytree(self.source_dir, target_dir)
+        result = sync_tree(self.source_dir, target_dir_path)
+
+        print(f"Project files: {result.summary()}")
 
     def _create_venv(self, venv_path: Path) -> None:
         """
@@ -354,11 +361,11 @@ class BundleCreator:
                     '.css', '.js'
                 }
 
-                if "MacOS" in str(file_path):
-                    file_path.chmod(0o755)
-
-                elif any(suffix in file_path.suffixes for suffix in options):
+                if "MacOS" in str(file_path) or \
+                        any(suffix in file_path.suffixes for suffix in options):
 
+                    # Project files may be hardlinks to the build output.
+                    unshare_file(file_path)
                     file_path.chmod(0o755)
 
     def _create_linux_bundle(self) -> bool:
@@ -395,7 +402,7 @@ class BundleCreator:
             if appdir_path and appdir_path.exists():
                 
                 final_path = self.output_dir
-                shutil.copytree(appdir_path, final_path / "SNES-IDE.AppDir")
+                sync_tree(appdir_path, final_path / "SNES-IDE.AppDir")
                 
                 return True
 
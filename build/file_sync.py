@@ -0,0 +1,251 @@
+"""
+SNES-IDE - file_sync.py
+Copyright (C) 2025 BrunoRNS
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List
+from pathlib import Path
+import platform
+import shutil
+import os
+
+# ioctl cloning a file on Linux filesystems with reflinks (btrfs, XFS).
+FICLONE: int = 0x40049409
+
+
+class SyncResult:
+    """
+    Counts of what a sync did to the files.
+    """
+
+    def __init__(self) -> None:
+        self.cloned: int = 0
+        self.linked: int = 0
+        self.copied: int = 0
+        self.unchanged: int = 0
+        self.removed: int = 0
+
+    def summary(self) -> str:
+        """
+        One line summary of the counts.
+        """
+
+        return (f"{self.copied} copied, {self.linked} hardlinked, {self.cloned} cloned, "
+                f"{self.unchanged} unchanged, {self.removed} removed")
+
+
+def is_up_to_date(source: Path, destination: Path) -> bool:
+    """
+    Check if a destination file holds its source: it is a link to it, or
+    has the same size and modification time (copies keep the time).
+
+    Args:
+        source: The source file
+        destination: The destination file
+
+    Returns:
+        True if the destination does not need to be written
+    """
+
+    try:
+        source_stat: os.stat_result = source.stat()
+        destination_stat: os.stat_result = destination.stat()
+
+    except OSError:
+        return False
+
+    if (source_stat.st_dev, source_stat.st_ino) == (destination_stat.st_dev, destination_stat.st_ino):
+        return True
+
+    return source_stat.st_size == destination_stat.st_size and \
+        source_stat.st_mtime_ns == destination_stat.st_mtime_ns
+
+
+def clone_file(source: Path, destination: Path) -> bool:
+    """
+    Clone a file as a reflink, sharing its data until either is modified.
+
+    Args:
+        source: The source file
+        destination: The new file
+
+    Returns:
+        True if cloned, False if the platform or filesystem cannot
+    """
+
+    if platform.system() != "Linux":
+        return False
+
+    import fcntl
+
+    try:
+        with open(source, 'rb') as source_file, open(destination, 'wb') as destination_file:
+            fcntl.ioctl(destination_file.fileno(), FICLONE, source_file.fileno())
+
+    except OSError:
+        destination.unlink(missing_ok=True)
+        return False
+
+    shutil.copystat(source, destination)
+    return True
+
+
+def place_file(source: Path, destination: Path, link: bool = True) -> str:
+    """
+    Write a file in place of the destination, as a reflink, a hardlink
+    or a copy, whichever the filesystem supports first.
+
+    The file is written next to the destination and then moved over it, so
+    a destination linked to another file is replaced, never modified.
+
+    Args:
+        source: The source file
+        destination: The destination file
+        link: Whether a hardlink may be used; hardlinked files share their
+            permissions, so only use them for files that are not modified
+
+    Returns:
+        "cloned", "linked" or "copied"
+    """
+
+    destination.parent.mkdir(parents=True, exist_ok=True)
+
+    temporary: Path = destination.with_name(f".{destination.name}.sync")
+    temporary.unlink(missing_ok=True)
+
+    try:
+        method: str = "cloned"
+
+        if not clone_file(source, temporary):
+            try:
+                if not link:
+                    raise OSError("Hardlinks disabled")
+
+                os.link(source, temporary)
+                method = "linked"
+
+            except OSError:
+                shutil.copy2(source, temporary)
+                method = "copied"
+
+        os.replace(temporary, destination)
+
+    finally:
+        temporary.unlink(missing_ok=True)
+
+    return method
+
+
+def unshare_file(path: Path) -> None:
+    """
+    Replace a hardlinked file with a copy of its own, so changing its
+    contents or permissions leaves the other links alone.
+
+    Args:
+        path: The file
+    """
+
+    if path.stat().st_nlink > 1:
+        temporary: Path = path.with_name(f".{path.name}.sync")
+
+        shutil.copy2(path, temporary)
+        os.replace(temporary, path)
+
+
+def tree_files(source: Path, destination: Path) -> Dict[Path, Path]:
+    """
+    Map the files of a tree to the same paths in another directory.
+
+    Args:
+        source: The source directory
+        destination: The destination directory
+
+    Returns:
+        Destination paths mapped to their source files
+    """
+
+    files: Dict[Path, Path] = {}
+
+    for root, _, names in os.walk(source, followlinks=True):
+        for name in names:
+            file: Path = Path(root) / name
+            files[destination / file.relative_to(source)] = file
+
+    return files
+
+
+def sync_files(files: Dict[Path, Path], stale: Iterable[Path] = (), link: bool = True,
+               jobs: 'int|None' = None) -> SyncResult:
+    """
+    Bring destination files up to date with their sources, several at once,
+    and remove the stale ones.
+
+    Args:
+        files: Destination paths mapped to their source files
+        stale: Destination files to remove, unless they are in files
+        link: Whether hardlinks may be used
+        jobs: Files written at once, defaults to four per CPU as most of the
+            time is spent waiting for the filesystem
+
+    Returns:
+        SyncResult of the sync
+    """
+
+    result: SyncResult = SyncResult()
+
+    def sync(item: 'tuple[Path, Path]') -> str:
+        destination, source = item
+
+        if is_up_to_date(source, destination):
+            return "unchanged"
+
+        return place_file(source, destination, link)
+
+    with ThreadPoolExecutor(max_workers=jobs or 4 * (os.cpu_count() or 1)) as pool:
+        for method in pool.map(sync, files.items()):
+            setattr(result, method, getattr(result, method) + 1)
+
+    for path in stale:
+        if path not in files and (path.is_file() or path.is_symlink()):
+            path.unlink()
+            result.removed += 1
+
+    return result
+
+
+def sync_tree(source: Path, destination: Path, link: bool = True, jobs: 'int|None' = None) -> SyncResult:
+    """
+    Make a directory a mirror of another, writing only the files that
+    changed and removing the files the source does not have.
+
+    Args:
+        source: The source directory
+        destination: The destination directory
+        link: Whether hardlinks may be used
+        jobs: Files written at once
+
+    Returns:
+        SyncResult of the sync
+    """
+
+    files: Dict[Path, Path] = tree_files(source, destination)
+    stale: List[Path] = []
+
+    if destination.is_dir():
+        stale = [file for file in tree_files(destination, destination) if file not in files]
+
+    return sync_files(files, stale, link, jobs)
@@ -23,10 +23,22 @@ import hashlib
 import json
 import os
 
+# Version of the manifest format: version 2 adds the digest of every chunk.
+MANIFEST_VERSION: int = 2
+
+# Algorithm of the chunk and file digests, as named by hashlib.
+DIGEST_ALGORITHM: str = "blake2b"
+
+# Buffer the file is read through while splitting.
+COPY_BUFFER_BYTES: int = 8 * 1024 * 1024
+
 class FileSplitter:
     """
     Splits large files into smaller chunks with JSON manifest for reconstruction.
     Uses byte-range tracking for precise file reassembly.
+    
+    The file is read once: every chunk is hashed as it is written, along with
+    the whole file digest and the MD5 checksum read by older builds.
     """
     
     def __init__(self, file_path: str, chunk_size: int = 90 * 1024 * 1024) -> None:
@@ -41,10 +53,13 @@ class FileSplitter:
         self.file_path = file_path
         self.chunk_size = chunk_size
         self.manifest_data: Dict[str, 'int|str|List[Dict[str, str|int]]'] = {
-            'original_filename': str(Path(file_path).absolute()),
+            'version': MANIFEST_VERSION,
+            'original_filename': Path(file_path).name,
             'total_size': 0,
             'chunk_size': chunk_size,
             'checksum': '',
+            'digest_algorithm': DIGEST_ALGORITHM,
+            'digest': '',
             'chunks': []
         }
     
@@ -85,16 +100,17 @@ class FileSplitter:
             
             file_size: int = os.path.getsize(self.file_path)
             self.manifest_data['total_size'] = file_size
-            self.manifest_data['checksum'] = self.calculate_checksum()
             
             print(f"Splitting: {self.manifest_data['original_filename']}")
             print(f"Total size: {file_size / (1024 * 1024):.2f} MB")
             print(f"Chunk size: {self.chunk_size / (1024 * 1024):.2f} MB")
-            print(f"File checksum: {self.manifest_data['checksum']}")
             
             chunk_index: int = 0
             bytes_processed: int = 0
             
+            hash_md5 = hashlib.md5()
+            file_digest = hashlib.new(DIGEST_ALGORITHM)
+            
             with open(self.file_path, 'rb') as source_file:
                 while bytes_processed < file_size:
                     
@@ -104,10 +120,23 @@ class FileSplitter:
                     start_byte = bytes_processed
                     end_byte = bytes_processed + current_chunk_size - 1
                     
-                    chunk_data = source_file.read(current_chunk_size)
+                    chunk_digest = hashlib.new(DIGEST_ALGORITHM)
+                    remaining: int = current_chunk_size
                     
                     with open(chunk_filename, 'wb') as chunk_file:
-                        chunk_file.write(chunk_data)
+                        while remaining > 0:
+                            
+                            chunk_data = source_file.read(min(COPY_BUFFER_BYTES, remaining))
+                            
+                            if not chunk_data:
+                                raise IOError(f"{self.file_path} changed while splitting")
+                            
+                            hash_md5.update(chunk_data)
+                            file_digest.update(chunk_data)
+                            chunk_digest.update(chunk_data)
+                            chunk_file.write(chunk_data)
+                            
+                            remaining -= len(chunk_data)
                     
                     chunk_info: Dict[str, 'str|int'] = {
                         'index': chunk_index,
@@ -115,6 +144,7 @@ class FileSplitter:
                         'start_byte': start_byte,
                         'end_byte': end_byte,
                         'size': current_chunk_size,
+                        'digest': chunk_digest.hexdigest(),
                     }
                     
                     if isinstance(self.manifest_data['chunks'], list):
@@ -129,6 +159,12 @@ class FileSplitter:
                     
                     chunk_index += 1
             
+            self.manifest_data['checksum'] = hash_md5.hexdigest()
+            self.manifest_data['digest'] = file_digest.hexdigest()
+            
+            print(f"File checksum: {self.manifest_data['checksum']}")
+            print(f"File digest ({DIGEST_ALGORITHM}): {self.manifest_data['digest']}")
+            
             manifest_path: str = f"{self.file_path}.snes.ide.reconstruct.manifest.json"
             
             out_dict: Dict[str, 'str|int|List[Dict[str, str|int]]'] = dict()
@@ -0,0 +1,105 @@
+"""
+SNES-IDE - script_host.py
+Copyright (C) 2025 BrunoRNS
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+# The heavy imports shared by the scripts are done before any request arrives,
+# so the cost is paid while the worker waits in the pool and not after a click.
+from PySide6.QtWidgets import QApplication, QFileDialog, QMainWindow  # noqa: F401
+from PySide6.QtCore import Qt, QProcess  # noqa: F401
+from PySide6.QtGui import QIcon  # noqa: F401
+
+from typing_extensions import NoReturn
+from typing import Any, Dict, List
+from pathlib import Path
+import runpy
+import json
+import sys
+import os
+
+
+def read_request() -> "Dict[str, Any]|None":
+    """
+    Block until the ScriptRunner sends a request on stdin.
+
+    A request is a single JSON line with the absolute "script" path and
+    optional "args" list and "cwd" string.
+
+    :return: The decoded request, or None when the pipe was closed.
+    """
+
+    line: str = sys.stdin.readline()
+
+    if not line.strip():
+        return None
+
+    request: Dict[str, Any] = json.loads(line)
+
+    if "script" not in request:
+        raise ValueError("Request has no script to run")
+
+    return request
+
+
+def run_request(request: Dict[str, Any]) -> None:
+    """
+    Execute a script of the scripts directory as if it was the main module.
+
+    The interpreter state is set up the way `python -s script.py` would:
+    sys.argv, sys.path[0] and the working directory point to the script.
+
+    :param request: The decoded request sent by the ScriptRunner.
+    :return: None
+    """
+
+    script_path: Path = Path(request["script"]).resolve()
+    args: List[str] = [str(arg) for arg in request.get("args", [])]
+
+    sys.argv = [str(script_path)] + args
+    sys.path[0] = str(script_path.parent)
+    os.chdir(request.get("cwd", str(script_path.parent)))
+
+    sys.stdin = open(os.devnull, "r")
+
+    runpy.run_path(str(script_path), run_name="__main__")
+
+
+def main() -> NoReturn:
+    """
+    Wait for one request, run it and exit with the script's exit code.
+
+    Every worker serves a single script, so a crash or a leaked QApplication
+    never reaches the next one; the ScriptRunner spawns a fresh warm worker
+    as soon as this one is handed out.
+    """
+
+    try:
+        request: "Dict[str, Any]|None" = read_request()
+
+    except Exception as e:
+        print(f"Invalid request for script host: {e}", file=sys.stderr)
+        sys.exit(2)
+
+    if request is None:
+        sys.exit(0)
+
+    run_request(request)
+
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,524 @@
+"""
+SNES-IDE - aram_planner.py
+Copyright (C) 2025 BrunoRNS
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from typing import Dict, List
+from pathlib import Path
+import argparse
+import hashlib
+import json
+import mmap
+import math
+import sys
+
+import numpy as np
+
+from brr_codec import BLOCK_BYTES, BLOCK_SAMPLES, DSP_RATE, END_FLAG, LOOP_FLAG
+
+
+ARAM_BYTES: int = 64 * 1024
+
+# SNESMOD leaves 58 KB to the samples, the rest is its driver.
+DRIVER_BYTES: int = ARAM_BYTES - 58 * 1024
+
+# Each step of echo delay (EDL) takes 2 KB at the end of ARAM.
+ECHO_STEP_BYTES: int = 2048
+
+# Source directory entry: start and loop addresses of a sample.
+DIRECTORY_ENTRY_BYTES: int = 4
+
+# The directory (DIR) and echo buffer (ESA) are set in 256 byte pages.
+PAGE_BYTES: int = 256
+
+
+class BankSample:
+    """A BRR sample of a sound bank, read from a BRR file or encoded from a WAV file."""
+
+    def __init__(self, name: str, path: Path, size: int, digest: str, loop_offset: "int|None" = None,
+                 rate: "int|None" = None, offset: int = 0, data: "bytes|None" = None) -> None:
+        """
+        Initialize a bank sample.
+
+        Args:
+            name: Name shown in reports
+            path: The BRR or WAV file
+            size: Bytes of BRR data, up to the block with the end flag
+            digest: Hash of the BRR data, to find identical samples
+            loop_offset: Byte offset the sample loops to, None if it does not loop
+            rate: Sample rate of the source in Hz, if known
+            offset: Position of the BRR data in a BRR file, after any loop header
+            data: The BRR data of an encoded WAV file, read from the file otherwise
+        """
+
+        self.name: str = name
+        self.path: Path = path
+        self.size: int = size
+        self.digest: str = digest
+        self.loop_offset: "int|None" = loop_offset
+        self.rate: "int|None" = rate
+        self.offset: int = offset
+        self.data: "bytes|None" = data
+
+    @property
+    def blocks(self) -> int:
+        """Number of BRR blocks."""
+
+        return self.size // BLOCK_BYTES
+
+    def load(self) -> bytes:
+        """The BRR data."""
+
+        if self.data is not None:
+            return self.data
+
+        with open(self.path, "rb") as file:
+            file.seek(self.offset)
+            return file.read(self.size)
+
+    @classmethod
+    def from_brr(cls, path: Path) -> "BankSample":
+        """
+        Scan a BRR file through a memory map, only reading its block headers.
+
+        A file two bytes longer than whole blocks starts with the loop offset,
+        as written by some converters; otherwise a looping sample loops to
+        its start.
+
+        Args:
+            path: The BRR file
+
+        Returns:
+            BankSample: The sample
+
+        Raises:
+            ValueError: If the file holds no BRR block
+            OSError: If the file cannot be read
+        """
+
+        length: int = path.stat().st_size
+        offset: int = 2 if length % BLOCK_BYTES == 2 else 0
+
+        if length - offset < BLOCK_BYTES:
+            raise ValueError(f"{path.name} holds no BRR block")
+
+        with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            headers: np.ndarray = np.frombuffer(
+                mapped, dtype=np.uint8, count=(length - offset) // BLOCK_BYTES * BLOCK_BYTES, offset=offset
+            )[::BLOCK_BYTES].copy()
+
+            ends: np.ndarray = np.flatnonzero(headers & END_FLAG)
+            blocks: int = int(ends[0]) + 1 if len(ends) else len(headers)
+
+            loop_offset: "int|None" = None
+
+            if headers[blocks - 1] & LOOP_FLAG:
+                loop_offset = int.from_bytes(mapped[:2], "little") if offset else 0
+
+            digest = hashlib.blake2b(memoryview(mapped)[offset:offset + blocks * BLOCK_BYTES], digest_size=16)
+
+        return cls(path.name, path, blocks * BLOCK_BYTES, digest.hexdigest(), loop_offset, offset=offset)
+
+
+def load_wav_samples(paths: List[Path]) -> List[BankSample]:
+    """
+    Encode WAV files to BRR in one batch with the native encoder.
+
+    Args:
+        paths: The WAV files
+
+    Returns:
+        List[BankSample]: The samples, in order
+
+    Raises:
+        ValueError: If a WAV file cannot be encoded
+        OSError: If a WAV file cannot be read
+    """
+
+    from brr_codec import BrrSample, WavSample, encode_many, read_wav
+
+    sources: List[WavSample] = [read_wav(path) for path in paths]
+
+    encoded: List[BrrSample] = encode_many(
+        [source.samples for source in sources], [source.loop_start for source in sources]
+    )
+
+    return [
+        BankSample(
+            path.name, path, len(sample.data), hashlib.blake2b(sample.data, digest_size=16).hexdigest(),
+            sample.loop_offset, round(source.rate * sample.ratio), data=sample.data
+        )
+        for path, source, sample in zip(paths, sources, encoded)
+    ]
+
+
+def collect_samples(paths: List[Path]) -> List[BankSample]:
+    """
+    Load the BRR and WAV files given, and those of the directories given.
+
+    A WAV file with a BRR file next to it is represented by the BRR file.
+
+    Args:
+        paths: BRR and WAV files and directories, searched recursively
+
+    Returns:
+        List[BankSample]: The samples, in path order
+
+    Raises:
+        ValueError: If a file is not a valid BRR or WAV file
+        OSError: If a file cannot be read
+    """
+
+    files: List[Path] = []
+
+    for path in paths:
+        if path.is_dir():
+            files += [
+                found for found in sorted(path.rglob("*"))
+                if found.suffix.lower() in (".brr", ".wav") and found.is_file()
+                and not any(part.startswith(".") for part in found.relative_to(path).parts)
+            ]
+
+        else:
+            files.append(path)
+
+    brr_files: List[Path] = [path for path in files if path.suffix.lower() == ".brr"]
+    converted = {path.with_suffix("").resolve() for path in brr_files}
+
+    wav_files: List[Path] = [
+        path for path in files
+        if path.suffix.lower() == ".wav" and path.with_suffix("").resolve() not in converted
+    ]
+
+    loaded: Dict[Path, BankSample] = {path: BankSample.from_brr(path) for path in brr_files}
+
+    if wav_files:
+        loaded.update(zip(wav_files, load_wav_samples(wav_files)))
+
+    return [loaded[path] for path in files if path in loaded]
+
+
+class AramPlan:
+    """Where a sound bank goes in ARAM."""
+
+    def __init__(self, samples: List[BankSample], reserved: int = DRIVER_BYTES, echo_delay: int = 0) -> None:
+        """
+        Lay out a bank: the driver, then the source directory, then the
+        samples back to back, identical samples being stored once; the
+        echo buffer takes the end of ARAM.
+
+        Args:
+            samples: The samples, in directory order
+            reserved: Bytes at the start of ARAM used by the sound driver
+            echo_delay: Echo delay (EDL) of the music, 0-15
+        """
+
+        self.samples: List[BankSample] = samples
+        self.reserved: int = reserved
+        self.echo_delay: int = echo_delay
+
+        self.directory: int = -(-reserved // PAGE_BYTES) * PAGE_BYTES
+        self.echo: int = ARAM_BYTES - echo_delay * ECHO_STEP_BYTES
+
+        self.addresses: List[int] = []
+        self.first: Dict[str, int] = {}
+
+        address: int = self.sample_start
+
+        for index, sample in enumerate(samples):
+            if sample.digest in self.first:
+                self.addresses.append(self.addresses[self.first[sample.digest]])
+                continue
+
+            self.first[sample.digest] = index
+            self.addresses.append(address)
+            address += sample.size
+
+        self.end: int = address
+
+    @property
+    def directory_bytes(self) -> int:
+        """Size of the source directory."""
+
+        return len(self.samples) * DIRECTORY_ENTRY_BYTES
+
+    @property
+    def sample_start(self) -> int:
+        """Address of the first sample."""
+
+        return self.directory + self.directory_bytes
+
+    @property
+    def available(self) -> int:
+        """Bytes left to the samples."""
+
+        return max(0, self.echo - self.sample_start)
+
+    @property
+    def used(self) -> int:
+        """Bytes of the samples, identical ones counted once."""
+
+        return self.end - self.sample_start
+
+    @property
+    def fits(self) -> bool:
+        """Whether the samples fit below the echo buffer."""
+
+        return self.end <= self.echo
+
+    def is_duplicate(self, index: int) -> bool:
+        """Whether a sample shares the data of an earlier one."""
+
+        return self.first[self.samples[index].digest] != index
+
+    def sized_to(self, ratio: float) -> int:
+        """
+        Bytes the samples would take resampled by a ratio.
+
+        Args:
+            ratio: New rate over the current rate, at most 1
+
+        Returns:
+            int: Bytes of the samples, identical ones counted once
+        """
+
+        return sum(
+            math.ceil(math.ceil(self.samples[index].blocks * BLOCK_SAMPLES * ratio) / BLOCK_SAMPLES) * BLOCK_BYTES
+            for index in self.first.values()
+        )
+
+    def downsampling_ratio(self) -> "float|None":
+        """
+        Find the largest ratio every sample can be resampled by to fit.
+
+        Returns:
+            float|None: The ratio, 1.0 if the samples already fit, None if
+                no ratio makes them fit
+        """
+
+        if self.fits:
+            return 1.0
+
+        low: float = 0.0
+        high: float = 1.0
+
+        for _ in range(24):
+            middle: float = (low + high) / 2
+
+            if self.sized_to(middle) <= self.available:
+                low = middle
+            else:
+                high = middle
+
+        # Round down to a tenth of a percent, and only suggest rates that keep a sample.
+        ratio: float = math.floor(low * 1000) / 1000
+
+        return ratio if ratio > 0 and self.sized_to(ratio) <= self.available else None
+
+    def directory_data(self) -> bytes:
+        """
+        The source directory: start and loop address of every sample.
+
+        Raises:
+            ValueError: If a sample is placed past the end of ARAM
+        """
+
+        entries: List[int] = []
+
+        for sample, address in zip(self.samples, self.addresses):
+            entries += [address, address + (sample.loop_offset or 0)]
+
+        if any(entry > 0xFFFF for entry in entries):
+            raise ValueError(f"A sample is placed at ${max(entries):X}, past the end of ARAM")
+
+        return np.array(entries, dtype="<u2").tobytes()
+
+    def bank_data(self) -> bytes:
+        """
+        The directory and samples, as loaded at the directory address.
+
+        Raises:
+            ValueError: If a sample is placed past the end of ARAM
+        """
+
+        return self.directory_data() + b"".join(
+            self.samples[index].load() for index in self.first.values()
+        )
+
+    def layout(self) -> Dict[str, object]:
+        """The layout, for JSON."""
+
+        return {
+            "directory": self.directory,
+            "echo": self.echo if self.echo_delay else None,
+            "end": self.end,
+            "samples": [
+                {
+                    "name": sample.name,
+                    "source": str(sample.path),
+                    "address": address,
+                    "size": sample.size,
+                    "loop": None if sample.loop_offset is None else address + sample.loop_offset,
+                }
+                for sample, address in zip(self.samples, self.addresses)
+            ],
+        }
+
+
+def format_report(plan: AramPlan, assumed_rate: int = DSP_RATE) -> List[str]:
+    """
+    Format an ARAM plan as table lines.
+
+    Args:
+        plan: The plan
+        assumed_rate: Rate of the samples read from BRR files, for the suggestions
+
+    Returns:
+        List[str]: The lines, without line ends
+    """
+
+    lines: List[str] = [f"{'address':>7} {'size':>7} {'blocks':>6} {'loop':>6} {'rate':>6} {'share':>6}  sample"]
+
+    for index, (sample, address) in enumerate(zip(plan.samples, plan.addresses)):
+        loop: str = "-" if sample.loop_offset is None else str(sample.loop_offset)
+        rate: str = str(sample.rate) if sample.rate else "?"
+
+        if plan.is_duplicate(index):
+            share: str = "dup"
+        else:
+            share = f"{sample.size / max(1, plan.available):.1%}"
+
+        lines.append(
+            f"  ${address:04X} {sample.size:>7} {sample.blocks:>6} {loop:>6} {rate:>6} {share:>6}  {sample.name}"
+        )
+
+    duplicates: int = sum(1 for index in range(len(plan.samples)) if plan.is_duplicate(index))
+
+    lines.append(
+        f"Driver {plan.reserved} B, directory {plan.directory_bytes} B at ${plan.directory:04X}, "
+        f"samples {plan.used} B at ${plan.sample_start:04X}-${max(plan.sample_start, plan.end - 1):04X}"
+        + (f" ({duplicates} identical samples stored once)" if duplicates else "")
+        + (f", echo {ARAM_BYTES - plan.echo} B at ${plan.echo:04X}" if plan.echo_delay else "")
+    )
+
+    if plan.fits:
+        lines.append(f"{plan.used} of {plan.available} B of ARAM used by samples, {plan.echo - plan.end} B free")
+        return lines
+
+    lines.append(f"{plan.used} of {plan.available} B of ARAM used by samples - OVER BUDGET by {plan.end - plan.echo} B")
+
+    ratio: "float|None" = plan.downsampling_ratio()
+
+    if ratio is None:
+        lines.append("The samples cannot fit, even downsampled: remove samples or lower the echo delay")
+        return lines
+
+    lines.append(f"Downsample every sample to {ratio:.1%} of its rate to fit ({plan.sized_to(ratio)} B):")
+
+    for index, sample in enumerate(plan.samples):
+        if not plan.is_duplicate(index):
+            rate: int = sample.rate or assumed_rate
+            lines.append(f"  {sample.name}: {rate} -> {int(rate * ratio)} Hz")
+
+    return lines
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    """
+    Parse the arguments of the ARAM planner.
+
+    Args:
+        argv: The command line arguments
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        prog="snes-ide aram",
+        description="Report the audio RAM used by BRR samples and lay out a packed sound bank."
+    )
+
+    parser.add_argument("paths", type=Path, nargs="+", help="BRR or WAV files, or directories containing them")
+    parser.add_argument(
+        "--reserved", type=int, default=DRIVER_BYTES,
+        help=f"bytes used by the sound driver at the start of ARAM (default {DRIVER_BYTES}, SNESMOD)"
+    )
+    parser.add_argument(
+        "--echo", type=int, default=0, choices=range(16), metavar="EDL",
+        help="echo delay of the music, each step takes 2 KB (default 0)"
+    )
+    parser.add_argument(
+        "--rate", type=int, default=DSP_RATE,
+        help=f"sample rate assumed for BRR files in the suggestions (default {DSP_RATE})"
+    )
+    parser.add_argument(
+        "-o", "--output", type=Path,
+        help="write the packed bank (directory and samples) there, and its layout next to it as JSON"
+    )
+
+    return parser.parse_args(argv)
+
+
+def main(argv: "List[str]|None" = None) -> int:
+    """
+    Print the ARAM plan of BRR samples.
+
+    Args:
+        argv: The command line arguments, defaults to sys.argv[1:]
+
+    Returns:
+        int: 0 if the samples fit, -1 otherwise
+    """
+
+    args: argparse.Namespace = parse_args(sys.argv[1:] if argv is None else argv)
+
+    try:
+        samples: List[BankSample] = collect_samples(args.paths)
+
+    except (ValueError, OSError) as e:
+        print(f"Could not read the samples: {e}")
+        return -1
+
+    if not samples:
+        print("No BRR or WAV file found")
+        return -1
+
+    plan: AramPlan = AramPlan(samples, args.reserved, args.echo)
+
+    print("\n".join(format_report(plan, args.rate)))
+
+    if args.output is not None and not plan.fits:
+        print("Bank not written: the samples do not fit")
+        return -1
+
+    if args.output is not None:
+        try:
+            args.output.write_bytes(plan.bank_data())
+            args.output.with_suffix(".json").write_text(json.dumps(plan.layout(), indent=2))
+
+        except OSError as e:
+            print(f"Could not write the bank: {e}")
+            return -1
+
+        print(f"Bank written to {args.output}, to load at ${plan.directory:04X}, "
+              f"layout in {args.output.with_suffix('.json')}")
+
+    return 0 if plan.fits else -1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -18,35 +18,45 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QHBoxLayout,
-    QWidget, QListWidget, QCheckBox, QComboBox, QLineEdit,
+    QWidget, QListView, QCheckBox, QComboBox, QLineEdit,
     QPushButton, QLabel, QGroupBox, QMessageBox,
-    QListWidgetItem
+    QSpinBox, QFormLayout, QFileDialog
 )
 
-from PySide6.QtCore import Qt
+from PySide6.QtCore import (
+    Qt, QAbstractListModel, QModelIndex, QPersistentModelIndex, Signal
+)
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Set, Union
 from pathlib import Path
 import shutil
 import math
+import re
+
+from note_index import NoteIndex
+from sample_catalogue import SampleCatalogue, add_library, load_libraries
+from sample_synth import Envelope, SynthOptions, synthesize, write_sample
 
 
 class MusicalNote:
     """Represents a musical note with its properties."""
 
     def __init__(self, name: str, frequency: float, wave_type: str,
-                 midi_note: int, octave: int, is_sharp: bool, base_note: str) -> None:
+                 midi_note: int, octave: int, is_sharp: bool, base_note: str,
+                 path: "Path|None" = None, details: str = "") -> None:
         """
         Initialize a musical note.
 
         Args:
             name: Full note name (e.g., 'C#4')
             frequency: Frequency in Hz
-            wave_type: Type of waveform ('sine', 'square', 'triangle')
+            wave_type: Type of waveform ('sine', 'square', 'triangle', 'sawtooth')
             midi_note: MIDI note number
             octave: Octave number (1-7)
             is_sharp: Whether the note is sharp
             base_note: Base note without sharp (e.g., 'C' for 'C#')
+            path: Sample file of a library, None for synthesized notes
+            details: Metadata of the sample file, shown as a tooltip
         """
         self.name: str = name
         self.frequency: float = frequency
@@ -55,6 +65,8 @@ class MusicalNote:
         self.octave: int = octave
         self.is_sharp: bool = is_sharp
         self.base_note: str = base_note
+        self.path: "Path|None" = path
+        self.details: str = details
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert note to dictionary representation."""
@@ -65,23 +77,157 @@ class MusicalNote:
             'midi_note': self.midi_note,
             'octave': self.octave,
             'is_sharp': self.is_sharp,
-            'base_note': self.base_note
+            'base_note': self.base_note,
+            'path': self.path
         }
 
 
+class NoteListModel(QAbstractListModel):
+    """
+    Checkable list of the notes matching the filters.
+
+    Rows are positions in the note catalogue, so filtering only swaps the
+    row list; checked notes are kept in a set, which stay checked when the
+    filters change.
+    """
+
+    checkedCountChanged = Signal(int)
+
+    def __init__(self, notes: List[MusicalNote]) -> None:
+        """
+        Initialize the model, showing every note.
+
+        Args:
+            notes: The note catalogue
+        """
+        super().__init__()
+        self.notes: List[MusicalNote] = notes
+        self.rows: List[int] = list(range(len(notes)))
+        self.checked: Set[int] = set()
+
+    def rowCount(self, parent: Union[QModelIndex, QPersistentModelIndex] = QModelIndex()) -> int:
+        """Number of notes shown."""
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index: Union[QModelIndex, QPersistentModelIndex],
+             role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        """Text, check state and dictionary of a note."""
+        if not index.isValid() or index.row() >= len(self.rows):
+            return None
+
+        position: int = self.rows[index.row()]
+        note: MusicalNote = self.notes[position]
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if note.path is not None:
+                return f"{note.name} - {note.wave_type} - {note.path.name}"
+
+            return f"{note.name} - {note.wave_type} - {note.frequency} Hz"
+
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return note.details or None
+
+        if role == Qt.ItemDataRole.CheckStateRole:
+            return Qt.CheckState.Checked if position in self.checked else Qt.CheckState.Unchecked
+
+        if role == Qt.ItemDataRole.UserRole:
+            return note.to_dict()
+
+        return None
+
+    def flags(self, index: Union[QModelIndex, QPersistentModelIndex]) -> Qt.ItemFlag:
+        """Notes are checkable."""
+        return super().flags(index) | Qt.ItemFlag.ItemIsUserCheckable
+
+    def setData(self, index: Union[QModelIndex, QPersistentModelIndex], value: Any,
+                role: int = Qt.ItemDataRole.EditRole) -> bool:
+        """Check or uncheck a note."""
+        if role != Qt.ItemDataRole.CheckStateRole or not index.isValid():
+            return False
+
+        position: int = self.rows[index.row()]
+
+        if Qt.CheckState(value) == Qt.CheckState.Checked:
+            self.checked.add(position)
+        else:
+            self.checked.discard(position)
+
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.CheckStateRole])
+        self.checkedCountChanged.emit(len(self.checked))
+        return True
+
+    def set_notes(self, notes: List[MusicalNote]) -> None:
+        """
+        Replace the note catalogue, unchecking every note.
+
+        Args:
+            notes: The new note catalogue
+        """
+        self.beginResetModel()
+        self.notes = notes
+        self.rows = list(range(len(notes)))
+        self.checked = set()
+        self.endResetModel()
+        self.checkedCountChanged.emit(0)
+
+    def set_rows(self, rows: List[int]) -> None:
+        """
+        Show other notes.
+
+        Args:
+            rows: Positions of the notes to show, in order
+        """
+        self.beginResetModel()
+        self.rows = rows
+        self.endResetModel()
+        self.checkedCountChanged.emit(len(self.checked))
+
+    def set_shown_checked(self, checked: bool) -> None:
+        """
+        Check or uncheck every note shown.
+
+        Args:
+            checked: Whether to check them
+        """
+        if checked:
+            self.checked.update(self.rows)
+        else:
+            self.checked.difference_update(self.rows)
+
+        if self.rows:
+            self.dataChanged.emit(
+                self.index(0), self.index(len(self.rows) - 1), [Qt.ItemDataRole.CheckStateRole])
+
+        self.checkedCountChanged.emit(len(self.checked))
+
+    def checked_notes(self) -> List[MusicalNote]:
+        """The checked notes, in catalogue order."""
+        return [self.notes[position] for position in sorted(self.checked)]
+
+    def hidden_checked_count(self) -> int:
+        """Number of checked notes the filters hide."""
+        return len(self.checked.difference(self.rows))
+
+
 class NoteManager(QMainWindow):
     """
     A PySide6 application for managing and filtering musical notes.
 
-    This application allows users to browse, filter, and "download" (copy)
-    musical notes across different wave types, octaves, and frequencies.
+    This application allows users to browse, filter, and "download"
+    (synthesize) musical notes across different wave types, octaves, and
+    frequencies, as WAV or BRR samples, or to browse the sample libraries
+    through their catalogue.
     """
 
     def __init__(self) -> None:
         """Initialize the NoteManager application."""
         super().__init__()
-        self.notes: List[MusicalNote] = self._generate_notes()
-        self.filtered_notes: List[MusicalNote] = self.notes.copy()
+        self.synthesized_notes: List[MusicalNote] = self._generate_notes()
+        self.library_notes: "List[MusicalNote]|None" = None
+        self.notes: List[MusicalNote] = self.synthesized_notes
+        self.note_index: NoteIndex = NoteIndex(self.notes)
+        self.model: NoteListModel = NoteListModel(self.notes)
+        self.model.checkedCountChanged.connect(self._update_selection_count)
         self._init_ui()
 
     @staticmethod
@@ -107,7 +253,7 @@ class NoteManager(QMainWindow):
         notes: List[MusicalNote] = []
         note_names: list[str] = ['C', 'C#', 'D', 'D#',
                                  'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
-        wave_types: list[str] = ['sine', 'square', 'triangle']
+        wave_types: list[str] = ['sine', 'square', 'triangle', 'sawtooth']
 
         midi_start: int = 33
         midi_end: int = 116
@@ -134,10 +280,58 @@ class NoteManager(QMainWindow):
 
         return notes
 
+    def _library_roots(self) -> List[Path]:
+        """The bundled SampleLibrary and the libraries added by the user."""
+
+        return [Path(self.get_home_path()) / "libs" / "SampleLibrary"] + load_libraries()
+
+    def _load_library_notes(self) -> List[MusicalNote]:
+        """
+        Load the samples of the libraries from their catalogues.
+
+        Catalogues are refreshed, so only new or changed files are analysed;
+        samples without a known note are left out, as they cannot be filtered.
+
+        Returns:
+            List of MusicalNote objects, one per sample file
+        """
+        notes: List[MusicalNote] = []
+        note_names: list[str] = ['C', 'C#', 'D', 'D#',
+                                 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
+
+        for root in self._library_roots():
+            if not root.is_dir():
+                continue
+
+            catalogue: SampleCatalogue = SampleCatalogue.open(root)
+
+            for relative, entry in sorted(catalogue.entries.items()):
+                match: "re.Match[str]|None" = re.fullmatch(r"([A-G]#?)(-?\d)", entry.note or "")
+
+                if match is None:
+                    continue
+
+                octave: int = int(match.group(2))
+                midi_note: int = (octave + 1) * 12 + note_names.index(match.group(1))
+
+                notes.append(MusicalNote(
+                    name=entry.note or "",
+                    frequency=round(440.0 * math.pow(2, (midi_note - 69) / 12.0), 2),
+                    wave_type=entry.wave_type,
+                    midi_note=midi_note,
+                    octave=octave,
+                    is_sharp='#' in match.group(1),
+                    base_note=match.group(1).replace('#', ''),
+                    path=root / relative,
+                    details=f"{relative}\n{entry.describe()}"
+                ))
+
+        return notes
+
     def _init_ui(self) -> None:
         """Initialize the user interface."""
         self.setWindowTitle("Musical Note Manager")
-        self.setGeometry(100, 100, 1000, 700)
+        self.setGeometry(100, 100, 1250, 700)
 
         main_widget: QWidget = QWidget()
         main_layout: QHBoxLayout = QHBoxLayout()
@@ -148,6 +342,9 @@ class NoteManager(QMainWindow):
         list_panel: QWidget = self._create_list_panel()
         main_layout.addWidget(list_panel, 2)
 
+        self.synthesis_panel: QGroupBox = self._create_synthesis_panel()
+        main_layout.addWidget(self.synthesis_panel, 1)
+
         main_widget.setLayout(main_layout)
         self.setCentralWidget(main_widget)
 
@@ -163,6 +360,9 @@ class NoteManager(QMainWindow):
         panel: QGroupBox = QGroupBox("Filters")
         layout: QVBoxLayout = QVBoxLayout()
 
+        source_group: QGroupBox = self._create_source_selector()
+        layout.addWidget(source_group)
+
         wave_group: QGroupBox = self._create_wave_type_filter()
         layout.addWidget(wave_group)
 
@@ -186,6 +386,59 @@ class NoteManager(QMainWindow):
         panel.setLayout(layout)
         return panel
 
+    def _create_source_selector(self) -> QGroupBox:
+        """Create the selector of synthesized notes or library samples."""
+        source_group: QGroupBox = QGroupBox("Source")
+        source_layout: QVBoxLayout = QVBoxLayout()
+
+        self.source_combo: QComboBox = QComboBox()
+        self.source_combo.addItems(['Synthesized notes', 'Sample library'])
+        self.source_combo.currentTextChanged.connect(self._change_source)
+        source_layout.addWidget(self.source_combo)
+
+        self.add_library_btn: QPushButton = QPushButton("Add Library...")
+        self.add_library_btn.setToolTip("Index a directory of WAV and MIDI samples")
+        self.add_library_btn.clicked.connect(self._add_library)
+        source_layout.addWidget(self.add_library_btn)
+
+        source_group.setLayout(source_layout)
+        return source_group
+
+    def _change_source(self) -> None:
+        """Show the synthesized notes or the samples of the libraries."""
+        library: bool = self.source_combo.currentText() == 'Sample library'
+
+        if library and self.library_notes is None:
+            self.library_notes = self._load_library_notes()
+
+        self.notes = self.library_notes if library and self.library_notes is not None else self.synthesized_notes
+        self.note_index = NoteIndex(self.notes)
+        self.model.set_notes(self.notes)
+        self.synthesis_panel.setEnabled(not library)
+
+        self._apply_filters()
+
+    def _add_library(self) -> None:
+        """Ask for a sample library directory and show its samples."""
+        directory: str = QFileDialog.getExistingDirectory(self, "Add Sample Library")
+
+        if not directory:
+            return
+
+        try:
+            add_library(Path(directory))
+
+        except OSError as e:
+            QMessageBox.warning(self, "Warning", f"Failed to add the library: {e}")
+            return
+
+        self.library_notes = None
+
+        if self.source_combo.currentText() == 'Sample library':
+            self._change_source()
+        else:
+            self.source_combo.setCurrentText('Sample library')
+
     def _create_wave_type_filter(self) -> QGroupBox:
         """Create wave type filter group."""
         wave_group: QGroupBox = QGroupBox("Wave Type")
@@ -203,27 +456,39 @@ class NoteManager(QMainWindow):
         self.triangle_check.setChecked(True)
         self.triangle_check.toggled.connect(self._apply_filters)
 
+        self.sawtooth_check: QCheckBox = QCheckBox("Sawtooth")
+        self.sawtooth_check.setChecked(True)
+        self.sawtooth_check.toggled.connect(self._apply_filters)
+
+        self.other_check: QCheckBox = QCheckBox("Other")
+        self.other_check.setChecked(True)
+        self.other_check.setToolTip("Noise, MIDI and other library samples")
+        self.other_check.toggled.connect(self._apply_filters)
+
         wave_layout.addWidget(self.sine_check)
         wave_layout.addWidget(self.square_check)
         wave_layout.addWidget(self.triangle_check)
+        wave_layout.addWidget(self.sawtooth_check)
+        wave_layout.addWidget(self.other_check)
         wave_group.setLayout(wave_layout)
 
         return wave_group
 
     def _create_octave_filter(self) -> QGroupBox:
         """Create octave range filter group."""
-        octave_group: QGroupBox = QGroupBox("Octave Range (1-7)")
+        octave_group: QGroupBox = QGroupBox("Octave Range (0-8)")
         octave_layout: QVBoxLayout = QVBoxLayout()
 
         octave_layout.addWidget(QLabel("From:"))
         self.octave_from: QComboBox = QComboBox()
-        self.octave_from.addItems([str(i) for i in range(1, 8)])
+        self.octave_from.addItems([str(i) for i in range(0, 9)])
+        self.octave_from.setCurrentText('1')
         self.octave_from.currentTextChanged.connect(self._apply_filters)
         octave_layout.addWidget(self.octave_from)
 
         octave_layout.addWidget(QLabel("To:"))
         self.octave_to: QComboBox = QComboBox()
-        self.octave_to.addItems([str(i) for i in range(1, 8)])
+        self.octave_to.addItems([str(i) for i in range(0, 9)])
         self.octave_to.setCurrentText('7')
         self.octave_to.currentTextChanged.connect(self._apply_filters)
         octave_layout.addWidget(self.octave_to)
@@ -277,6 +542,98 @@ class NoteManager(QMainWindow):
         freq_group.setLayout(freq_layout)
         return freq_group
 
+    def _create_synthesis_panel(self) -> QGroupBox:
+        """
+        Create the panel of the options the notes are synthesized with.
+
+        Returns:
+            QGroupBox containing the synthesis controls
+        """
+        panel: QGroupBox = QGroupBox("Synthesis")
+        layout: QFormLayout = QFormLayout()
+
+        self.format_combo: QComboBox = QComboBox()
+        self.format_combo.addItems(['WAV', 'BRR'])
+        layout.addRow("Format:", self.format_combo)
+
+        self.rate_combo: QComboBox = QComboBox()
+        self.rate_combo.addItems(['8000', '11025', '16000', '22050', '32000'])
+        self.rate_combo.setCurrentText('32000')
+        layout.addRow("Sample rate (Hz):", self.rate_combo)
+
+        self.length_spin: QSpinBox = self._create_spin(10, 10000, 500)
+        layout.addRow("Length (ms):", self.length_spin)
+
+        self.duty_spin: QSpinBox = self._create_spin(1, 99, 50)
+        self.duty_spin.setToolTip("Part of the period the square wave is high")
+        layout.addRow("Square duty (%):", self.duty_spin)
+
+        self.volume_spin: QSpinBox = self._create_spin(1, 100, 80)
+        layout.addRow("Volume (%):", self.volume_spin)
+
+        self.attack_spin: QSpinBox = self._create_spin(0, 5000, 0)
+        layout.addRow("Attack (ms):", self.attack_spin)
+
+        self.decay_spin: QSpinBox = self._create_spin(0, 5000, 0)
+        layout.addRow("Decay (ms):", self.decay_spin)
+
+        self.sustain_spin: QSpinBox = self._create_spin(0, 100, 100)
+        layout.addRow("Sustain (%):", self.sustain_spin)
+
+        self.release_spin: QSpinBox = self._create_spin(0, 5000, 0)
+        layout.addRow("Release (ms):", self.release_spin)
+
+        self.band_limited_check: QCheckBox = QCheckBox("Band-limited")
+        self.band_limited_check.setChecked(True)
+        self.band_limited_check.setToolTip("Remove the harmonics the sample rate cannot hold")
+        layout.addRow(self.band_limited_check)
+
+        self.loop_check: QCheckBox = QCheckBox("Loop sustain")
+        self.loop_check.setToolTip(
+            "Loop from the end of the decay; the length becomes the most the sample takes, "
+            "the loop being as short as the pitch allows"
+        )
+        layout.addRow(self.loop_check)
+
+        panel.setLayout(layout)
+        return panel
+
+    @staticmethod
+    def _create_spin(minimum: int, maximum: int, value: int) -> QSpinBox:
+        """Create a spin box with a range and initial value."""
+        spin: QSpinBox = QSpinBox()
+        spin.setRange(minimum, maximum)
+        spin.setValue(value)
+        return spin
+
+    def _synthesis_options(self, wave_type: str) -> SynthOptions:
+        """
+        Get the synthesis options chosen in the synthesis panel.
+
+        Args:
+            wave_type: Waveform of the note
+
+        Returns:
+            SynthOptions for the note
+        """
+        envelope: Envelope = Envelope(
+            attack=self.attack_spin.value() / 1000,
+            decay=self.decay_spin.value() / 1000,
+            sustain=self.sustain_spin.value() / 100,
+            release=self.release_spin.value() / 1000
+        )
+
+        return SynthOptions(
+            waveform=wave_type,
+            rate=int(self.rate_combo.currentText()),
+            length=self.length_spin.value() / 1000,
+            duty=self.duty_spin.value() / 100,
+            volume=self.volume_spin.value() / 100,
+            band_limited=self.band_limited_check.isChecked(),
+            envelope=envelope,
+            loop=self.loop_check.isChecked()
+        )
+
     def _create_list_panel(self) -> QWidget:
         """
         Create the main list panel with notes and action buttons.
@@ -305,9 +662,11 @@ class NoteManager(QMainWindow):
 
         self.count_label: QLabel = QLabel("0 notes selected")
 
-        self.notes_list: QListWidget = QListWidget()
+        self.notes_list: QListView = QListView()
+        self.notes_list.setModel(self.model)
+        self.notes_list.setUniformItemSizes(True)
         self.notes_list.setSelectionMode(
-            QListWidget.SelectionMode.MultiSelection)
+            QListView.SelectionMode.MultiSelection)
 
         layout.addLayout(action_layout)
         layout.addWidget(self.count_label)
@@ -318,8 +677,6 @@ class NoteManager(QMainWindow):
 
     def _apply_filters(self) -> None:
         """Apply all active filters and update the notes list."""
-        self.filtered_notes = self.notes.copy()
-
         wave_types: list[str] = []
         if self.sine_check.isChecked():
             wave_types.append('sine')
@@ -330,135 +687,113 @@ class NoteManager(QMainWindow):
         if self.triangle_check.isChecked():
             wave_types.append('triangle')
 
-        self.filtered_notes = [
-            n for n in self.filtered_notes if n.wave_type in wave_types]
+        if self.sawtooth_check.isChecked():
+            wave_types.append('sawtooth')
 
-        octave_from: int = int(self.octave_from.currentText())
-        octave_to: int = int(self.octave_to.currentText())
-        self.filtered_notes = [
-            n for n in self.filtered_notes if octave_from <= n.octave <= octave_to]
+        if self.other_check.isChecked():
+            wave_types.extend(['noise', 'midi', 'other'])
 
         note_filter: str = self.note_combo.currentText()
-
-        if note_filter != 'All':
-            self.filtered_notes = [
-                n for n in self.filtered_notes if n.base_note == note_filter.replace('#', '')]
-
         sharp_filter: str = self.sharp_combo.currentText()
 
-        if sharp_filter == 'Only Sharps':
-            self.filtered_notes = [
-                n for n in self.filtered_notes if n.is_sharp]
-
-        elif sharp_filter == 'No Sharps':
-            self.filtered_notes = [
-                n for n in self.filtered_notes if not n.is_sharp]
-
-        try:
-            if self.freq_min.text():
-                freq_min: float = float(self.freq_min.text())
-                self.filtered_notes = [
-                    n for n in self.filtered_notes if n.frequency >= freq_min]
+        rows: List[int] = self.note_index.query(
+            wave_types,
+            int(self.octave_from.currentText()),
+            int(self.octave_to.currentText()),
+            base_note=None if note_filter == 'All' else note_filter.replace('#', ''),
+            sharp={'Only Sharps': True, 'No Sharps': False}.get(sharp_filter),
+            frequency_min=self._parse_frequency(self.freq_min),
+            frequency_max=self._parse_frequency(self.freq_max)
+        )
 
-        except ValueError:
-            pass
+        self.model.set_rows(rows)
+        self._update_selection_count()
 
+    @staticmethod
+    def _parse_frequency(field: QLineEdit) -> "float|None":
+        """Read a frequency field, None when empty or invalid."""
         try:
-            if self.freq_max.text():
-                freq_max: float = float(self.freq_max.text())
-                self.filtered_notes = [
-                    n for n in self.filtered_notes if n.frequency <= freq_max]
+            return float(field.text()) if field.text() else None
 
         except ValueError:
-            pass
-
-        self._update_notes_list()
-
-    def _update_notes_list(self) -> None:
-        """Update the notes list widget with filtered results."""
-        self.notes_list.clear()
+            return None
 
-        for note in self.filtered_notes:
-            item_text: str = f"{note.name} - {note.wave_type} - {note.frequency} Hz"
-            item: QListWidgetItem = QListWidgetItem(item_text)
-            item.setData(Qt.ItemDataRole.UserRole, note.to_dict())
-            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
-            item.setCheckState(Qt.CheckState.Unchecked)
+    def _selection_text(self) -> str:
+        """Count of selected notes, and of those hidden by the filters."""
+        hidden: int = self.model.hidden_checked_count()
 
-            self.notes_list.addItem(item)
-
-        self._update_selection_count()
+        return f"{len(self.model.checked)} notes selected" + (f", {hidden} hidden" if hidden else "")
 
     def _update_selection_count(self) -> None:
         """Update the count of selected notes."""
-
-        selected_count: int = 0
-
-        for i in range(self.notes_list.count()):
-
-            if self.notes_list.item(i).checkState() == Qt.CheckState.Checked:
-                selected_count += 1
-
-        self.count_label.setText(f"{selected_count} notes selected")
+        self.count_label.setText(self._selection_text())
 
     def _select_all(self) -> None:
         """Select all notes in the current filtered list."""
 
-        for i in range(self.notes_list.count()):
-            self.notes_list.item(i).setCheckState(Qt.CheckState.Checked)
-
-        self._update_selection_count()
+        self.model.set_shown_checked(True)
 
     def _deselect_all(self) -> None:
         """Deselect all notes in the current filtered list."""
 
-        for i in range(self.notes_list.count()):
-            self.notes_list.item(i).setCheckState(Qt.CheckState.Unchecked)
-
-        self._update_selection_count()
+        self.model.set_shown_checked(False)
 
     def _download_selected(self) -> None:
         """
-        Copy selected note files to the Downloads folder.
+        Synthesize the selected notes into the Downloads folder.
 
-        This method simulates file copying by creating text files with note information.
-        In a real implementation, replace with actual audio file copying.
+        Notes are written as WAV or BRR files with the options of the
+        synthesis panel; notes too high for the sample rate are skipped.
+        Library samples are copied as they are. Selected notes hidden by
+        the filters are downloaded too, once confirmed.
         """
 
         downloads_path: Path = Path.home() / "Downloads" / "MusicalNotes"
         downloads_path.mkdir(parents=True, exist_ok=True)
 
-        selected_notes: List[Dict[str, Any]] = []
-
-        for i in range(self.notes_list.count()):
-            item: QListWidgetItem = self.notes_list.item(i)
-
-            if item.checkState() == Qt.CheckState.Checked:
-                note_data: Any = item.data(Qt.ItemDataRole.UserRole)
-                selected_notes.append(note_data)
+        selected_notes: List[Dict[str, Any]] = [
+            note.to_dict() for note in self.model.checked_notes()
+        ]
 
         if not selected_notes:
             QMessageBox.warning(
                 self, "Warning", "No notes selected for download.")
             return
 
+        if self.model.hidden_checked_count():
+            answer: QMessageBox.StandardButton = QMessageBox.question(
+                self, "Download Hidden Notes",
+                f"{self._selection_text()} by the filters. Download them all?")
+
+            if answer != QMessageBox.StandardButton.Yes:
+                return
+
+        extension: str = self.format_combo.currentText().lower()
+        skipped: List[str] = []
+
         for note_data in selected_notes:
 
-            source_file: Path = (
-                Path(self.get_home_path()) / "libs" / "SampleLibrary" / "wave-samples" /
-                f"{note_data['name']}_{note_data['type']}.wav"
-            )
+            try:
+                if note_data['path'] is not None:
+                    shutil.copy2(note_data['path'], downloads_path / note_data['path'].name)
+                    continue
 
-            dest_file: Path = downloads_path / \
-                f"{note_data['name']}_{note_data['type']}.wav"
+                dest_file: Path = downloads_path / \
+                    f"{note_data['name']}_{note_data['type']}.{extension}"
 
-            shutil.copy2(source_file, dest_file)
+                write_sample(dest_file, synthesize(
+                    note_data['frequency'], self._synthesis_options(note_data['type'])))
 
-        QMessageBox.information(
-            self,
-            "Download Complete",
-            f"{len(selected_notes)} notes copied to:\n{downloads_path}"
-        )
+            except (ValueError, OSError) as e:
+                skipped.append(f"{note_data['name']} {note_data['type']}: {e}")
+
+        message: str = (
+            f"{len(selected_notes) - len(skipped)} notes written to:\n{downloads_path}")
+
+        if skipped:
+            message += f"\n\n{len(skipped)} skipped:\n" + "\n".join(skipped[:10])
+
+        QMessageBox.information(self, "Download Complete", message)
 
     def _clear_filters(self) -> None:
         """Reset all filters to their default values."""
@@ -466,6 +801,8 @@ class NoteManager(QMainWindow):
         self.sine_check.setChecked(True)
         self.square_check.setChecked(True)
         self.triangle_check.setChecked(True)
+        self.sawtooth_check.setChecked(True)
+        self.other_check.setChecked(True)
         self.octave_from.setCurrentText('1')
         self.octave_to.setCurrentText('7')
         self.note_combo.setCurrentText('All')
@@ -16,63 +16,43 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
-from subprocess import run, CalledProcessError
 from typing_extensions import Literal
+from typing import List
 from pathlib import Path
-import os
 
+from brr_batch import BrrResult, BrrStamps, get_snesbrr_path, run_batch, scan_wav_files
 from get_file_path import get_file_path
 
-def get_executable_path() -> str:
-    """
-    Get Script Path, by using the path of the script itself.
-    """
-
-    return str(Path(__file__).resolve().parent)
-
-
-def get_home_path() -> str:
-    """Get snes-ide home directory"""
-
-    return str(Path(get_executable_path()).parent)
-
 
 def convert() -> Literal[-1, 0]:
-    """Convert WAV files to BRR using snesbrr converter."""
-
-    snesbrr: Path
+    """Convert WAV files to BRR using snesbrr converter, in parallel."""
 
-    if os.name == "nt":
-        snesbrr = Path(get_home_path()) / "bin" / \
-            "pvsneslib" / "tools" / "snesbrr.exe"
+    snesbrr: Path = get_snesbrr_path()
 
-    elif os.name == "posix":
-        snesbrr = Path(get_home_path()) / "bin" / \
-            "pvsneslib" / "tools" / "snesbrr"
-
-    try:
-
-        if not snesbrr.exists():
-            print("snesbrr does not exist")
-            return -1
-
-        input_file: Path = Path(str(
-            get_file_path(
-                "Select a WAV file", [("WAV files", "*.wav")],
-                multiple=False, directory=False
-            )
-        ))
+    if not snesbrr.exists():
+        print("snesbrr does not exist")
+        return -1
 
-        if not input_file or not input_file.exists() or not str(input_file).endswith(".wav"):
+    selected = get_file_path(
+        "Select WAV files", [("WAV files", "*.wav")],
+        multiple=True, directory=False
+    )
 
-            print("Input file does not exist or is not a brr file")
-            return -1
+    wav_files: List[Path] = scan_wav_files(
+        [Path(path) for path in (selected if isinstance(selected, list) else [selected])]
+    )
 
-        run([snesbrr, "-e", input_file, str(input_file).split('.')[0] + ".brr"])
+    if not wav_files:
+        print("Input files do not exist or are not wav files")
+        return -1
 
-    except CalledProcessError as e:
+    results: List[BrrResult] = run_batch(
+        wav_files, snesbrr=snesbrr, on_result=lambda result: print(result.summary(), flush=True),
+        stamps=BrrStamps()
+    )
 
-        print(f"Error while executing snesbrr to convert your wav file: {e}")
+    if not all(result.ok for result in results):
+        print("Error while executing snesbrr to convert your wav files")
         return -1
 
     print("Success!")
@@ -0,0 +1,481 @@
+"""
+SNES-IDE - brr_batch.py
+Copyright (C) 2025 BrunoRNS
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Tuple
+from pathlib import Path
+import subprocess
+import threading
+import argparse
+import tempfile
+import json
+import time
+import sys
+import os
+
+from build_cache import get_cache_home, hash_file
+from toolchains import get_home_path
+
+
+# "native" encodes in-process with brr_codec, all files in a few vectorised
+# batches instead of a snesbrr process per file.
+BACKENDS: Tuple[str, ...] = ("snesbrr", "native")
+
+
+def get_snesbrr_path() -> Path:
+    """Get the bundled snesbrr executable"""
+
+    return (
+        Path(get_home_path()) / "bin" / "pvsneslib" / "devkitsnes" / "tools" /
+        ("snesbrr.exe" if os.name == "nt" else "snesbrr")
+    )
+
+
+def brr_path(wav: Path) -> Path:
+    """The BRR written for a WAV file, next to it."""
+
+    return wav.with_suffix(".brr")
+
+
+class BrrStamps:
+    """
+    Hashes of the WAV and BRR files of past conversions.
+
+    A WAV whose content and BRR are unchanged since its last conversion is
+    skipped even if its modification time changed.
+    """
+
+    def __init__(self, stamps_file: "Path|None" = None, force: bool = False) -> None:
+        """
+        Load the stamps.
+
+        Args:
+            stamps_file: JSON file of the stamps, defaults to <cache home>/brr/stamps.json
+            force: Treat every BRR as out of date, still recording the new stamps
+        """
+
+        self.stamps_file: Path = stamps_file or get_cache_home() / "brr" / "stamps.json"
+        self.force: bool = force
+        self.stamps: Dict[str, Dict[str, str]] = {}
+        self.lock: threading.Lock = threading.Lock()
+
+        try:
+            with open(self.stamps_file, "r") as stamps:
+                self.stamps = json.load(stamps)
+
+        except (OSError, ValueError):
+            self.stamps = {}
+
+    def is_current(self, wav: Path) -> bool:
+        """
+        Whether the BRR of a WAV is up to date.
+
+        Args:
+            wav: The WAV file
+
+        Returns:
+            bool: True if the BRR is newer than the WAV, or both are unchanged
+                since the last conversion
+        """
+
+        brr: Path = brr_path(wav)
+
+        if self.force or not brr.exists():
+            return False
+
+        if brr.stat().st_mtime >= wav.stat().st_mtime:
+            return True
+
+        with self.lock:
+            stamp: "Dict[str, str]|None" = self.stamps.get(str(wav.resolve()))
+
+        return stamp is not None and stamp.get("wav") == hash_file(wav) and stamp.get("brr") == hash_file(brr)
+
+    def record(self, wav: Path) -> None:
+        """Remember the hashes of a WAV and its freshly written BRR."""
+
+        stamp: Dict[str, str] = {"wav": hash_file(wav), "brr": hash_file(brr_path(wav))}
+
+        with self.lock:
+            self.stamps[str(wav.resolve())] = stamp
+
+    def save(self) -> None:
+        """Write the stamps, replacing the file atomically."""
+
+        self.stamps_file.parent.mkdir(parents=True, exist_ok=True)
+
+        with self.lock:
+            temporary: Path = self.stamps_file.with_name(self.stamps_file.name + ".tmp")
+            temporary.write_text(json.dumps(self.stamps))
+            os.replace(temporary, self.stamps_file)
+
+
+class BrrResult:
+    """Outcome of the conversion of one WAV file."""
+
+    def __init__(self, wav: Path, returncode: int, seconds: float, output: str,
+                 skipped: bool = False, native: bool = False) -> None:
+        """
+        Initialize a result.
+
+        Args:
+            wav: The WAV file
+            returncode: Exit code of snesbrr, -1 if it could not run
+            seconds: Wall time of the conversion
+            output: Combined stdout and stderr of snesbrr, or the report of the native encoder
+            skipped: Whether the BRR was already up to date
+            native: Whether the WAV was encoded by the native encoder
+        """
+
+        self.wav: Path = wav
+        self.returncode: int = returncode
+        self.seconds: float = seconds
+        self.output: str = output
+        self.skipped: bool = skipped
+        self.native: bool = native
+
+    @property
+    def ok(self) -> bool:
+        """Whether the BRR is up to date."""
+
+        return self.returncode == 0
+
+    def summary(self) -> str:
+        """One line report of the conversion."""
+
+        status: str = f"FAILED ({self.returncode})"
+
+        if self.ok:
+            status = "up to date" if self.skipped else "native" if self.native else "ok"
+
+        line: str = f"{status:<12} {self.seconds * 1000:8.1f} ms  {self.wav}"
+
+        if (self.native or not self.ok) and self.output.strip():
+            line += "\n    " + self.output.strip().splitlines()[-1]
+
+        return line
+
+
+def scan_wav_files(paths: List[Path]) -> List[Path]:
+    """
+    Collect WAV files from files and directories, skipping hidden paths.
+
+    Args:
+        paths: WAV files and directories, searched recursively
+
+    Returns:
+        List[Path]: The WAV files, in order, without duplicates
+    """
+
+    found: Dict[Path, None] = {}
+
+    for path in paths:
+        if path.is_dir():
+            for wav in sorted(path.rglob("*")):
+                if wav.suffix.lower() == ".wav" and wav.is_file() and \
+                        not any(part.startswith(".") for part in wav.relative_to(path).parts):
+                    found[wav] = None
+
+        elif path.suffix.lower() == ".wav":
+            found[path] = None
+
+    return list(found)
+
+
+def write_atomically(path: Path, data: bytes) -> None:
+    """Write a file through a temporary file in the same directory."""
+
+    descriptor, temporary = tempfile.mkstemp(prefix=f".{path.stem}.", suffix=path.suffix, dir=path.parent)
+
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(data)
+
+        os.replace(temporary, path)
+
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def convert_native(wav_files: List[Path], stamps: "BrrStamps|None" = None) -> "List[BrrResult]|None":
+    """
+    Encode WAV files in-process with the native BRR encoder.
+
+    Args:
+        wav_files: The WAV files, without colliding outputs
+        stamps: Stamps to skip up to date files with and to update, if any
+
+    Returns:
+        List[BrrResult]|None: The results, in the order of wav_files, None
+            if the native encoder is not available
+    """
+
+    try:
+        from brr_codec import BrrSample, WavSample, describe, encode_many, read_wav
+
+    except ImportError:
+        return None
+
+    started: float = time.perf_counter()
+
+    results: Dict[int, BrrResult] = {}
+    sources: List[WavSample] = []
+    pending: List[int] = []
+
+    for index, wav in enumerate(wav_files):
+        if not wav.exists():
+            results[index] = BrrResult(wav, -1, 0.0, f"{wav} does not exist")
+
+        elif stamps is not None and stamps.is_current(wav):
+            results[index] = BrrResult(wav, 0, 0.0, "", skipped=True)
+
+        else:
+            try:
+                sources.append(read_wav(wav))
+                pending.append(index)
+
+            except (ValueError, OSError) as e:
+                results[index] = BrrResult(wav, -1, 0.0, str(e))
+
+    encoded: List[BrrSample] = encode_many(
+        [source.samples for source in sources], [source.loop_start for source in sources]
+    )
+
+    # The files are encoded together, each is given an equal share of the time.
+    seconds: float = (time.perf_counter() - started) / max(1, len(pending))
+
+    for index, sample in zip(pending, encoded):
+        wav: Path = wav_files[index]
+
+        try:
+            write_atomically(brr_path(wav), sample.data)
+
+            if stamps is not None:
+                stamps.record(wav)
+
+        except OSError as e:
+            results[index] = BrrResult(wav, -1, seconds, str(e))
+            continue
+
+        results[index] = BrrResult(wav, 0, seconds, describe(sample), native=True)
+
+    return [results[index] for index in range(len(wav_files))]
+
+
+def convert_wav(snesbrr: Path, wav: Path, stamps: "BrrStamps|None" = None) -> BrrResult:
+    """
+    Convert one WAV file to BRR next to it.
+
+    snesbrr writes a temporary file in the same directory, which replaces
+    the BRR only once complete, so an interrupted run never leaves a
+    truncated BRR behind.
+
+    Args:
+        snesbrr: Path to the snesbrr executable
+        wav: The WAV file
+        stamps: Stamps to skip up to date files with and to update, if any
+
+    Returns:
+        BrrResult: The outcome of the conversion
+    """
+
+    started: float = time.perf_counter()
+
+    if not wav.exists():
+        return BrrResult(wav, -1, 0.0, f"{wav} does not exist")
+
+    if stamps is not None and stamps.is_current(wav):
+        return BrrResult(wav, 0, time.perf_counter() - started, "", skipped=True)
+
+    descriptor, temporary = tempfile.mkstemp(prefix=f".{wav.stem}.", suffix=".brr", dir=wav.parent)
+    os.close(descriptor)
+
+    try:
+        process: subprocess.CompletedProcess = subprocess.run(
+            [str(snesbrr), "-e", str(wav), temporary],
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, errors="replace"
+        )
+
+        if process.returncode == 0:
+            os.replace(temporary, brr_path(wav))
+
+            if stamps is not None:
+                stamps.record(wav)
+
+    except OSError as e:
+        return BrrResult(wav, -1, time.perf_counter() - started, str(e))
+
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+    return BrrResult(wav, process.returncode, time.perf_counter() - started, process.stdout)
+
+
+def run_batch(wav_files: List[Path], jobs: "int|None" = None, snesbrr: "Path|None" = None,
+              on_result: "Callable[[BrrResult], None]|None" = None,
+              stamps: "BrrStamps|None" = None, backend: str = "snesbrr") -> List[BrrResult]:
+    """
+    Convert many WAV files, running up to `jobs` snesbrr processes at once.
+
+    Files whose BRR would overwrite each other (e.g. kick.wav and kick.WAV)
+    are not converted.
+
+    Args:
+        wav_files: The WAV files
+        jobs: Maximum number of concurrent conversions, defaults to the CPU count
+        snesbrr: Path to snesbrr, defaults to the bundled one
+        on_result: Called from the pool threads as each conversion finishes
+        stamps: Stamps of past conversions, saved after the batch; None converts everything
+        backend: One of BACKENDS, native falls back to snesbrr without NumPy
+
+    Returns:
+        List[BrrResult]: The results, in the order of wav_files
+    """
+
+    snesbrr = snesbrr or get_snesbrr_path()
+    jobs = max(1, jobs or os.cpu_count() or 1)
+
+    results: Dict[int, BrrResult] = {}
+    outputs: Dict[Path, Path] = {}
+    pending: List[int] = []
+
+    for index, wav in enumerate(wav_files):
+        output: Path = brr_path(wav).resolve()
+
+        if output in outputs:
+            results[index] = BrrResult(wav, -1, 0.0, f"output collides with {outputs[output].name}")
+
+            if on_result is not None:
+                on_result(results[index])
+
+            continue
+
+        outputs[output] = wav
+        pending.append(index)
+
+    native: "List[BrrResult]|None" = None
+
+    if backend == "native":
+        native = convert_native([wav_files[index] for index in pending], stamps)
+
+    if native is not None:
+        for index, result in zip(pending, native):
+            results[index] = result
+
+            if on_result is not None:
+                on_result(result)
+
+        pending = []
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            pool.submit(convert_wav, snesbrr, wav_files[index], stamps): index for index in pending
+        }
+
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+
+            if on_result is not None:
+                on_result(results[futures[future]])
+
+    if stamps is not None:
+        try:
+            stamps.save()
+
+        except OSError as e:
+            print(f"Failed to save the BRR stamps: {e}")
+
+    return [results[index] for index in range(len(wav_files))]
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    """
+    Parse the arguments of the batch BRR converter.
+
+    Args:
+        argv: The command line arguments
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        prog="snes-ide brr-batch",
+        description="Convert many WAV files to BRR with snesbrr in parallel."
+    )
+
+    parser.add_argument("paths", type=Path, nargs="+", help="WAV files or directories containing them")
+    parser.add_argument(
+        "-j", "--jobs", type=int,
+        help="number of concurrent conversions, defaults to the CPU count"
+    )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="convert every file, even when its BRR is up to date"
+    )
+    parser.add_argument(
+        "--backend", choices=BACKENDS, default="snesbrr",
+        help="encoder to use; native encodes in-process with brr_codec and reports the SNR of every file"
+    )
+
+    return parser.parse_args(argv)
+
+
+def main(argv: "List[str]|None" = None) -> int:
+    """
+    Convert WAV files and directories from the command line.
+
+    Args:
+        argv: The command line arguments, defaults to sys.argv[1:]
+
+    Returns:
+        int: 0 if every file was converted, -1 otherwise
+    """
+
+    args: argparse.Namespace = parse_args(sys.argv[1:] if argv is None else argv)
+
+    if args.backend == "snesbrr" and not get_snesbrr_path().exists():
+        print(f"snesbrr not found at: {get_snesbrr_path()}")
+        return -1
+
+    wav_files: List[Path] = scan_wav_files(args.paths)
+
+    if not wav_files:
+        print("No WAV file found")
+        return -1
+
+    started: float = time.perf_counter()
+
+    results: List[BrrResult] = run_batch(
+        wav_files, args.jobs, on_result=lambda result: print(result.summary(), flush=True),
+        stamps=BrrStamps(force=args.force), backend=args.backend
+    )
+
+    failed: int = sum(1 for result in results if not result.ok)
+    skipped: int = sum(1 for result in results if result.skipped)
+
+    print(f"{len(results) - failed}/{len(results)} files up to date ({skipped} skipped) "
+          f"in {time.perf_counter() - started:.2f} s")
+
+    return -1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,673 @@
+"""
+SNES-IDE - brr_codec.py
+Copyright (C) 2025 BrunoRNS
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from typing import Dict, List, Tuple
+from pathlib import Path
+import argparse
+import struct
+import math
+import time
+import sys
+
+import numpy as np
+
+
+# Samples and bytes of a BRR block: a header and 16 4-bit samples.
+BLOCK_SAMPLES: int = 16
+BLOCK_BYTES: int = 9
+
+# Header flags of the last block, and whether it jumps back to the loop.
+END_FLAG: int = 0x01
+LOOP_FLAG: int = 0x02
+
+# Shifts 13-15 only decode to 0 or -2048, they are never worth it.
+SHIFTS: int = 13
+FILTERS: int = 4
+
+# Sample rate of the S-DSP, used when decoding to WAV.
+DSP_RATE: int = 32000
+
+
+class WavSample:
+    """Mono 16-bit samples read from a WAV file."""
+
+    def __init__(self, samples: np.ndarray, rate: int, loop_start: "int|None" = None,
+                 channels: int = 1) -> None:
+        """
+        Initialize a WAV sample.
+
+        Args:
+            samples: The samples, int16
+            rate: Sample rate in Hz
+            loop_start: First sample of the loop, which runs to the end, if any
+            channels: Channels of the file, mixed down in the samples
+        """
+
+        self.samples: np.ndarray = samples
+        self.rate: int = rate
+        self.loop_start: "int|None" = loop_start
+        self.channels: int = channels
+
+
+def read_wav(path: Path) -> WavSample:
+    """
+    Read a PCM or float WAV file, mixed down to mono 16-bit.
+
+    The first loop of a "smpl" chunk is kept: the samples after its end
+    are dropped, as a BRR loop always runs to the last block.
+
+    Args:
+        path: The WAV file
+
+    Returns:
+        WavSample: The samples
+
+    Raises:
+        ValueError: If the file is not a WAV file or uses an unsupported encoding
+        OSError: If the file cannot be read
+    """
+
+    data: bytes = path.read_bytes()
+
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError(f"{path.name} is not a WAV file")
+
+    chunks: Dict[bytes, bytes] = {}
+    position: int = 12
+
+    while position + 8 <= len(data):
+        size: int = int.from_bytes(data[position + 4:position + 8], "little")
+        chunks.setdefault(data[position:position + 4], data[position + 8:position + 8 + size])
+        position += 8 + size + (size & 1)
+
+    if b"fmt " not in chunks or b"data" not in chunks:
+        raise ValueError(f"{path.name} has no format or data chunk")
+
+    if len(chunks[b"fmt "]) < 16:
+        raise ValueError(f"{path.name} has a truncated format chunk")
+
+    encoding, channels, rate, _, _, bits = struct.unpack("<HHIIHH", chunks[b"fmt "][:16])
+
+    if channels < 1:
+        raise ValueError(f"{path.name} has no audio channel")
+
+    if bits < 8 or bits % 8:
+        raise ValueError(f"{path.name}: unsupported sample size of {bits} bits")
+
+    if encoding == 0xFFFE and len(chunks[b"fmt "]) >= 26:
+        encoding = int.from_bytes(chunks[b"fmt "][24:26], "little")
+
+    width: int = bits // 8
+    raw: bytes = chunks[b"data"][:len(chunks[b"data"]) // (width * channels) * width * channels]
+
+    samples: np.ndarray
+
+    if encoding == 1 and bits == 8:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float64) - 128) * 256
+
+    elif encoding == 1 and bits in (16, 24, 32):
+        octets: np.ndarray = np.frombuffer(raw, dtype=np.uint8).reshape(-1, width)
+        # Keep the two most significant bytes, sign extended.
+        samples = octets[:, -2].astype(np.float64) + octets[:, -1].astype(np.int8) * 256.0
+
+    elif encoding == 3 and bits in (32, 64):
+        samples = np.frombuffer(raw, dtype=f"<f{width}").astype(np.float64) * 32767
+
+    else:
+        raise ValueError(f"{path.name}: unsupported WAV encoding {encoding} with {bits} bits")
+
+    mono: np.ndarray = samples.reshape(-1, channels).mean(axis=1)
+    loop_start: "int|None" = None
+
+    if b"smpl" in chunks and len(chunks[b"smpl"]) >= 60 and int.from_bytes(chunks[b"smpl"][28:32], "little"):
+        start, end = struct.unpack("<II", chunks[b"smpl"][44:52])
+
+        if start <= end < len(mono):
+            loop_start = start
+            mono = mono[:end + 1]
+
+    return WavSample(np.clip(np.rint(mono), -32768, 32767).astype(np.int16), rate, loop_start, channels)
+
+
+def write_wav(path: Path, samples: np.ndarray, rate: int, loop_start: "int|None" = None) -> None:
+    """
+    Write mono 16-bit samples to a WAV file.
+
+    Args:
+        path: The WAV file
+        samples: The samples, int16
+        rate: Sample rate in Hz
+        loop_start: First sample of a loop running to the end, stored in a "smpl" chunk
+    """
+
+    data: bytes = samples.astype("<i2").tobytes()
+
+    chunks: bytes = b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, rate, rate * 2, 2, 16)
+
+    if loop_start is not None:
+        # Sampler header (sample period in ns, unity note 60, one loop) then the forward loop.
+        chunks += b"smpl" + struct.pack(
+            "<I9I6I", 60, 0, 0, 1_000_000_000 // rate, 60, 0, 0, 0, 1, 0,
+            0, 0, loop_start, len(samples) - 1, 0, 0
+        )
+
+    chunks += b"data" + struct.pack("<I", len(data)) + data + b"\0" * (len(data) & 1)
+
+    path.write_bytes(b"RIFF" + struct.pack("<I", 4 + len(chunks)) + b"WAVE" + chunks)
+
+
+def align_loop(samples: np.ndarray, loop_start: int) -> Tuple[np.ndarray, int, float]:
+    """
+    Fit a loop on BRR blocks.
+
+    The loop is resampled to the nearest multiple of 16 samples (the intro
+    by the same ratio), then silence is added before the sample so the
+    loop starts on a block.
+
+    Args:
+        samples: The samples, int16, looping from loop_start to the end
+        loop_start: First sample of the loop
+
+    Returns:
+        Tuple[np.ndarray, int, float]: The samples, the loop start and the
+            resampling ratio (1.0 if the loop already was a multiple of 16);
+            the sample must be played that many times faster to keep its pitch
+
+    Raises:
+        ValueError: If the loop is empty
+    """
+
+    length: int = len(samples) - loop_start
+
+    if loop_start < 0 or length <= 0:
+        raise ValueError(f"Loop start {loop_start} is outside of the {len(samples)} samples")
+
+    target: int = max(BLOCK_SAMPLES, round(length / BLOCK_SAMPLES) * BLOCK_SAMPLES)
+    ratio: float = target / length
+
+    if target != length:
+        intro: int = round(loop_start * ratio)
+
+        # The loop wraps around, so its last samples interpolate towards its first.
+        source: np.ndarray = np.concatenate([samples, samples[loop_start:loop_start + 1]]).astype(np.float64)
+
+        positions: np.ndarray = np.concatenate([
+            np.arange(intro) * (loop_start / intro if intro else 0.0),
+            loop_start + np.arange(target) * (length / target)
+        ])
+
+        samples = np.rint(np.interp(positions, np.arange(len(source)), source)).astype(np.int16)
+        loop_start = intro
+
+    padding: int = -loop_start % BLOCK_SAMPLES
+
+    return np.concatenate([np.zeros(padding, dtype=np.int16), samples]), loop_start + padding, ratio
+
+
+def encode_blocks(signals: np.ndarray, plain: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Encode signals of the same length to BRR blocks.
+
+    Every block is encoded with all filters and shifts at once, keeping the
+    one decoding closest to the signal; the search runs for all signals
+    together, so a batch costs about as much as one signal.
+
+    Args:
+        signals: The samples, int16, shape (count, blocks * 16)
+        plain: Blocks that must use filter 0 because their history is not
+            known (first and loop blocks), bool, shape (count, blocks)
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: The headers (shift and
+            filter, without flags) shape (count, blocks), the 4-bit samples
+            shape (count, blocks, 16) and the decoded samples, int16, shape
+            (count, blocks * 16)
+    """
+
+    count: int = signals.shape[0]
+    blocks: int = signals.shape[1] // BLOCK_SAMPLES
+    rows: np.ndarray = np.arange(count)
+
+    shifts: np.ndarray = np.arange(SHIFTS, dtype=np.int32)
+    steps: np.ndarray = (1 << shifts) / 2.0
+
+    headers: np.ndarray = np.zeros((count, blocks), dtype=np.uint8)
+    nibbles: np.ndarray = np.zeros((count, blocks, BLOCK_SAMPLES), dtype=np.int32)
+    decoded: np.ndarray = np.zeros((count, blocks * BLOCK_SAMPLES), dtype=np.int16)
+
+    # Decoder history of the chosen candidate, shared by all candidates of the next block.
+    last: np.ndarray = np.zeros(count, dtype=np.int32)
+    before: np.ndarray = np.zeros(count, dtype=np.int32)
+
+    candidate_nibbles: np.ndarray = np.zeros((count, FILTERS, SHIFTS, BLOCK_SAMPLES), dtype=np.int32)
+    candidate_output: np.ndarray = np.zeros((count, FILTERS, SHIFTS, BLOCK_SAMPLES), dtype=np.int32)
+    prediction: np.ndarray = np.zeros((count, FILTERS, SHIFTS), dtype=np.int32)
+
+    for block in range(blocks):
+        p1: np.ndarray = np.broadcast_to(last[:, None, None], (count, FILTERS, SHIFTS)).copy()
+        p2: np.ndarray = np.broadcast_to(before[:, None, None], (count, FILTERS, SHIFTS)).copy()
+        error: np.ndarray = np.zeros((count, FILTERS, SHIFTS), dtype=np.float64)
+
+        for index in range(BLOCK_SAMPLES):
+            target: np.ndarray = signals[:, block * BLOCK_SAMPLES + index].astype(np.int32)[:, None, None]
+
+            # Filters of the S-DSP, on the 15-bit values before the final doubling.
+            half: np.ndarray = p2 >> 1
+            prediction[:, 1] = (p1[:, 1] >> 1) + ((-p1[:, 1]) >> 5)
+            prediction[:, 2] = p1[:, 2] - half[:, 2] + (half[:, 2] >> 4) + ((p1[:, 2] * -3) >> 6)
+            prediction[:, 3] = p1[:, 3] - half[:, 3] + ((p1[:, 3] * -13) >> 7) + ((half[:, 3] * 3) >> 4)
+
+            rounded: np.ndarray = np.rint((target / 2.0 - prediction) / steps).astype(np.int32)
+
+            # The rounded nibble and its neighbours, as doubling the decoded
+            # value wraps past 15 bits and a smaller step can be closer.
+            nibble: np.ndarray = np.zeros_like(rounded)
+            output: np.ndarray = np.zeros_like(rounded)
+            distance: np.ndarray = np.full(rounded.shape, np.inf)
+
+            for offset in (0, -1, 1):
+                trial: np.ndarray = np.clip(rounded + offset, -8, 7)
+
+                value: np.ndarray = np.clip(prediction + ((trial << shifts) >> 1), -32768, 32767)
+                value = ((value << 1) + 32768 & 0xFFFF) - 32768
+
+                trial_distance: np.ndarray = (value - target).astype(np.float64) ** 2
+                better: np.ndarray = trial_distance < distance
+
+                nibble = np.where(better, trial, nibble)
+                output = np.where(better, value, output)
+                distance = np.minimum(distance, trial_distance)
+
+            error += distance
+
+            candidate_nibbles[..., index] = nibble
+            candidate_output[..., index] = output
+
+            p2 = p1
+            p1 = output
+
+        error = error.reshape(count, FILTERS * SHIFTS)
+        error[plain[:, block], SHIFTS:] = np.inf
+
+        best: np.ndarray = error.argmin(axis=1)
+
+        headers[:, block] = ((best % SHIFTS) << 4) | ((best // SHIFTS) << 2)
+        nibbles[:, block] = candidate_nibbles.reshape(count, FILTERS * SHIFTS, BLOCK_SAMPLES)[rows, best]
+
+        chosen: np.ndarray = candidate_output.reshape(count, FILTERS * SHIFTS, BLOCK_SAMPLES)[rows, best]
+        decoded[:, block * BLOCK_SAMPLES:(block + 1) * BLOCK_SAMPLES] = chosen
+
+        last = chosen[:, -1]
+        before = chosen[:, -2]
+
+    return headers, nibbles, decoded
+
+
+def pack_blocks(headers: np.ndarray, nibbles: np.ndarray, loop: bool) -> bytes:
+    """
+    Write BRR blocks, flagging the last one.
+
+    Args:
+        headers: Shift and filter of every block, shape (blocks,)
+        nibbles: The 4-bit samples, shape (blocks, 16)
+        loop: Whether the sample loops
+
+    Returns:
+        bytes: The BRR data
+    """
+
+    data: np.ndarray = np.zeros((len(headers), BLOCK_BYTES), dtype=np.uint8)
+
+    data[:, 0] = headers
+    data[-1, 0] |= END_FLAG | (LOOP_FLAG if loop else 0)
+
+    codes: np.ndarray = (nibbles & 0xF).astype(np.uint8)
+    data[:, 1:] = (codes[:, 0::2] << 4) | codes[:, 1::2]
+
+    return data.tobytes()
+
+
+class BrrSample:
+    """A sample encoded to BRR, with what it decodes to."""
+
+    def __init__(self, data: bytes, source: np.ndarray, decoded: np.ndarray,
+                 loop_block: "int|None", ratio: float) -> None:
+        """
+        Initialize an encoded sample.
+
+        Args:
+            data: The BRR data
+            source: The samples encoded, after loop alignment, int16
+            decoded: The samples the S-DSP plays, int16
+            loop_block: Block the sample loops to, if any
+            ratio: Resampling ratio of the loop alignment
+        """
+
+        self.data: bytes = data
+        self.source: np.ndarray = source
+        self.decoded: np.ndarray = decoded
+        self.loop_block: "int|None" = loop_block
+        self.ratio: float = ratio
+
+    @property
+    def loop_offset(self) -> "int|None":
+        """Byte offset of the loop, for the sample directory."""
+
+        return None if self.loop_block is None else self.loop_block * BLOCK_BYTES
+
+    @property
+    def filters(self) -> List[int]:
+        """Number of blocks using each filter."""
+
+        used: np.ndarray = (np.frombuffer(self.data, dtype=np.uint8)[::BLOCK_BYTES] >> 2) & 3
+
+        return np.bincount(used, minlength=FILTERS).tolist()
+
+    @property
+    def snr(self) -> float:
+        """Signal to noise ratio of the decoded samples in dB, inf if lossless."""
+
+        return signal_to_noise(self.source, self.decoded)
+
+
+def signal_to_noise(source: np.ndarray, decoded: np.ndarray) -> float:
+    """
+    Compare decoded samples to their source.
+
+    Args:
+        source: The original samples
+        decoded: The decoded samples, as many as the source
+
+    Returns:
+        float: The signal to noise ratio in dB, inf without noise
+    """
+
+    signal: float = float(np.sum(source.astype(np.float64) ** 2))
+    noise: float = float(np.sum((source.astype(np.float64) - decoded) ** 2))
+
+    if noise == 0:
+        return math.inf
+
+    return 10 * math.log10(max(signal, 1.0) / noise)
+
+
+def encode_many(samples: List[np.ndarray], loop_starts: "List[int|None]|None" = None) -> List[BrrSample]:
+    """
+    Encode many samples to BRR in a few vectorised batches.
+
+    Samples are grouped by length, padded with silence to whole blocks.
+
+    Args:
+        samples: The samples, int16
+        loop_starts: First sample of the loop of every sample, None if it does not loop
+
+    Returns:
+        List[BrrSample]: The encoded samples, in order
+
+    Raises:
+        ValueError: If a loop start is outside of its sample
+    """
+
+    loop_starts = loop_starts or [None] * len(samples)
+
+    prepared: List[Tuple[np.ndarray, "int|None", float]] = []
+
+    for signal, loop_start in zip(samples, loop_starts):
+        signal = np.asarray(signal, dtype=np.int16)
+
+        if loop_start is None:
+            ratio: float = 1.0
+        else:
+            signal, loop_start, ratio = align_loop(signal, loop_start)
+
+        padding: int = -len(signal) % BLOCK_SAMPLES or (BLOCK_SAMPLES if not len(signal) else 0)
+        prepared.append((np.concatenate([signal, np.zeros(padding, dtype=np.int16)]), loop_start, ratio))
+
+    # Batches of samples within a factor of two in length.
+    batches: Dict[int, List[int]] = {}
+
+    for index, (signal, _, _) in enumerate(prepared):
+        batches.setdefault((len(signal) // BLOCK_SAMPLES - 1).bit_length(), []).append(index)
+
+    encoded: Dict[int, BrrSample] = {}
+
+    for indices in batches.values():
+        blocks: int = max(len(prepared[index][0]) for index in indices) // BLOCK_SAMPLES
+
+        signals: np.ndarray = np.zeros((len(indices), blocks * BLOCK_SAMPLES), dtype=np.int16)
+        plain: np.ndarray = np.zeros((len(indices), blocks), dtype=bool)
+        plain[:, 0] = True
+
+        for row, index in enumerate(indices):
+            signal, loop_start, _ = prepared[index]
+            signals[row, :len(signal)] = signal
+
+            if loop_start is not None:
+                plain[row, loop_start // BLOCK_SAMPLES] = True
+
+        headers, nibbles, decoded = encode_blocks(signals, plain)
+
+        for row, index in enumerate(indices):
+            signal, loop_start, ratio = prepared[index]
+            length: int = len(signal) // BLOCK_SAMPLES
+
+            encoded[index] = BrrSample(
+                pack_blocks(headers[row, :length], nibbles[row, :length], loop_start is not None),
+                signal, decoded[row, :len(signal)].copy(),
+                None if loop_start is None else loop_start // BLOCK_SAMPLES, ratio
+            )
+
+    return [encoded[index] for index in range(len(prepared))]
+
+
+def encode(samples: np.ndarray, loop_start: "int|None" = None) -> BrrSample:
+    """
+    Encode one sample to BRR.
+
+    Args:
+        samples: The samples, int16
+        loop_start: First sample of the loop, None if it does not loop
+
+    Returns:
+        BrrSample: The encoded sample
+    """
+
+    return encode_many([samples], [loop_start])[0]
+
+
+def decode(data: bytes) -> np.ndarray:
+    """
+    Decode BRR data the way the S-DSP does, up to the block with the end flag.
+
+    Args:
+        data: The BRR data
+
+    Returns:
+        np.ndarray: The decoded samples, int16
+    """
+
+    output: List[int] = []
+    p1: int = 0
+    p2: int = 0
+
+    length: int = len(data) // BLOCK_BYTES
+
+    for block in range(length):
+        header: int = data[block * BLOCK_BYTES]
+        shift: int = header >> 4
+        filter_: int = (header >> 2) & 3
+
+        for octet in data[block * BLOCK_BYTES + 1:(block + 1) * BLOCK_BYTES]:
+            for nibble in (octet >> 4, octet & 0xF):
+                s: int = nibble - 16 if nibble >= 8 else nibble
+
+                s = (s << shift) >> 1 if shift <= 12 else (-2048 if s < 0 else 0)
+
+                half: int = p2 >> 1
+
+                if filter_ == 1:
+                    s += (p1 >> 1) + ((-p1) >> 5)
+                elif filter_ == 2:
+                    s += p1 - half + (half >> 4) + ((p1 * -3) >> 6)
+                elif filter_ == 3:
+                    s += p1 - half + ((p1 * -13) >> 7) + ((half * 3) >> 4)
+
+                s = min(32767, max(-32768, s))
+                s = ((s << 1) + 32768 & 0xFFFF) - 32768
+
+                output.append(s)
+                p2, p1 = p1, s
+
+        if header & END_FLAG:
+            break
+
+    return np.array(output, dtype=np.int16)
+
+
+def describe(encoded: BrrSample) -> str:
+    """One line report of an encoded sample."""
+
+    line: str = (f"{encoded.snr:6.1f} dB {len(encoded.data):>7} B  filters "
+                 + "/".join(str(used) for used in encoded.filters))
+
+    if encoded.loop_offset is not None:
+        line += f"  loop at byte {encoded.loop_offset}"
+
+    if encoded.ratio != 1.0:
+        line += f" (resampled x{encoded.ratio:.4f})"
+
+    return line
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    """
+    Parse the arguments of the BRR codec.
+
+    Args:
+        argv: The command line arguments
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        prog="snes-ide brr",
+        description="Encode WAV files to BRR and decode BRR files, without snesbrr."
+    )
+
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    encoder: argparse.ArgumentParser = commands.add_parser(
+        "encode", help="encode WAV files, writing the .brr next to them"
+    )
+    encoder.add_argument("paths", type=Path, nargs="+", help="WAV files or directories containing them")
+    encoder.add_argument(
+        "-l", "--loop", type=int,
+        help="first sample of the loop, defaults to the loop of the WAV \"smpl\" chunk"
+    )
+
+    decoder: argparse.ArgumentParser = commands.add_parser("decode", help="decode a BRR file to WAV")
+    decoder.add_argument("brr", type=Path, help="BRR file")
+    decoder.add_argument("-o", "--output", type=Path, help="WAV file, defaults to the BRR with a .wav extension")
+    decoder.add_argument(
+        "-r", "--rate", type=int, default=DSP_RATE,
+        help=f"sample rate of the WAV file (default {DSP_RATE})"
+    )
+
+    return parser.parse_args(argv)
+
+
+def main(argv: "List[str]|None" = None) -> int:
+    """
+    Run the BRR codec from the command line.
+
+    Args:
+        argv: The command line arguments, defaults to sys.argv[1:]
+
+    Returns:
+        int: 0 on success, -1 on failure
+    """
+
+    args: argparse.Namespace = parse_args(sys.argv[1:] if argv is None else argv)
+
+    if args.command == "decode":
+        try:
+            samples: np.ndarray = decode(args.brr.read_bytes())
+            write_wav(args.output or args.brr.with_suffix(".wav"), samples, args.rate)
+
+        except OSError as e:
+            print(f"Could not decode {args.brr}: {e}")
+            return -1
+
+        print(f"{len(samples)} samples written to {args.output or args.brr.with_suffix('.wav')}")
+        return 0
+
+    from brr_batch import scan_wav_files, write_atomically
+
+    wav_files: List[Path] = scan_wav_files(args.paths)
+
+    if not wav_files:
+        print("No WAV file found")
+        return -1
+
+    started: float = time.perf_counter()
+    failed: int = 0
+
+    sources: List[WavSample] = []
+    readable: List[Path] = []
+
+    for wav in wav_files:
+        try:
+            sources.append(read_wav(wav))
+            readable.append(wav)
+
+        except (ValueError, OSError) as e:
+            print(f"FAILED {wav}: {e}")
+            failed += 1
+
+    try:
+        encoded: List[BrrSample] = encode_many(
+            [source.samples for source in sources],
+            [source.loop_start if args.loop is None else args.loop for source in sources]
+        )
+
+    except ValueError as e:
+        print(f"Could not encode: {e}")
+        return -1
+
+    for wav, sample in zip(readable, encoded):
+        try:
+            write_atomically(wav.with_suffix(".brr"), sample.data)
+
+        except OSError as e:
+            print(f"FAILED {wav}: {e}")
+            failed += 1
+            continue
+
+        print(f"{describe(sample)}  {wav}")
+
+    finite: List[float] = [sample.snr for sample in encoded if math.isfinite(sample.snr)]
+
+    print(f"{len(wav_files) - failed}/{len(wav_files)} files encoded in {time.perf_counter() - started:.2f} s"
+          + (f", mean SNR {sum(finite) / len(finite):.1f} dB" if finite else ""))
+
+    return -1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
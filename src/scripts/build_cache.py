@@ -0,0 +1,433 @@
+"""
+SNES-IDE - build_cache.py
+Copyright (C) 2025 BrunoRNS
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from typing import Dict, List, Set, Tuple
+from pathlib import Path
+import hashlib
+import shutil
+import json
+import time
+import os
+import re
+
+
+def get_cache_home() -> Path:
+    """
+    Get the shared snes-ide cache directory.
+
+    SNES_IDE_CACHE_DIR overrides the location, otherwise XDG_CACHE_HOME
+    or ~/.cache is used.
+
+    Returns:
+        Path: The cache directory (not created)
+    """
+
+    if os.environ.get("SNES_IDE_CACHE_DIR"):
+        return Path(os.environ["SNES_IDE_CACHE_DIR"])
+
+    return Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "snes-ide"
+
+
+def hash_file(path: Path) -> str:
+    """
+    Calculate the SHA-256 digest of a file's content.
+
+    Args:
+        path: Path to the file to hash
+
+    Returns:
+        str: Hex digest of the file
+    """
+
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def hash_values(*values: str) -> str:
+    """Combine several strings into one SHA-256 hex digest."""
+
+    digest = hashlib.sha256()
+
+    for value in values:
+        digest.update(value.encode("utf-8"))
+        digest.update(b"\0")
+
+    return digest.hexdigest()
+
+
+class BuildCache:
+    """
+    Content-hash build cache for PVSnesLib projects.
+
+    The outputs of every rule of snes_rules are grouped with the inputs they
+    depend on: a C file with its .ps/.asm/.obj, an image with its .pic/.pal/.map,
+    a WAV with its .brr, a hand-written .asm with its .obj and the whole
+    project with the ROM. The key of a group is the hash of its inputs, the
+    Makefile and the toolchain, so make only runs the rules whose inputs
+    really changed, whatever the file timestamps say after a copy or checkout.
+    """
+
+    STATE_FILE: str = ".snes-ide-build.json"
+
+    HEADER_SUFFIXES: Tuple[str, ...] = (".h", ".inc")
+    IMAGE_SUFFIXES: Tuple[str, ...] = (".bmp", ".png")
+    IMAGE_OUTPUTS: Tuple[str, ...] = (
+        ".pic", ".pal", ".map", ".pc7", ".mp7", ".til", ".m16", ".b16", ".o16", ".t16"
+    )
+    AUDIO_SUFFIXES: Tuple[str, ...] = (".wav",)
+    MODULE_SUFFIXES: Tuple[str, ...] = (".it",)
+    DATA_SUFFIXES: Tuple[str, ...] = (".bin", ".dat", ".raw")
+    ROM_OUTPUTS: Tuple[str, ...] = (".sfc", ".sym")
+
+    def __init__(self, project: Path, pvsneslib_home: Path, cache_dir: "Path|None" = None) -> None:
+        """
+        Initialize the cache for a project.
+
+        Args:
+            project: The PvSnesLib project directory (containing the Makefile)
+            pvsneslib_home: The PVSNESLIB_HOME used to build the project
+            cache_dir: Where outputs are stored, defaults to <cache home>/build
+        """
+
+        self.project: Path = project.resolve()
+        self.pvsneslib_home: Path = pvsneslib_home
+        self.cache_dir: Path = cache_dir or get_cache_home() / "build"
+        self.groups: Dict[str, Tuple[str, List[Path]]] = {}
+
+    def toolchain_fingerprint(self) -> str:
+        """
+        Fingerprint the toolchain by its version file and binaries' size and mtime.
+
+        Returns:
+            str: Hex digest identifying the toolchain
+        """
+
+        values: List[str] = [os.environ.get("PVSNESLIB_DEBUG", "0")]
+
+        version_file: Path = self.pvsneslib_home / "pvsneslib" / "pvsneslib_version.txt"
+
+        if version_file.exists():
+            values.append(version_file.read_text(errors="replace"))
+
+        for tools_dir in ("bin", "tools"):
+            directory: Path = self.pvsneslib_home / "devkitsnes" / tools_dir
+
+            if not directory.exists():
+                continue
+
+            for tool in sorted(directory.iterdir()):
+                if tool.is_file():
+                    stat = tool.stat()
+                    values.append(f"{tool.name}:{stat.st_size}:{int(stat.st_mtime)}")
+
+        snes_rules: Path = self.pvsneslib_home / "devkitsnes" / "snes_rules"
+
+        if snes_rules.exists():
+            values.append(snes_rules.read_text(errors="replace"))
+
+        return hash_values(*values)
+
+    def project_files(self) -> List[Path]:
+        """
+        List the project files, skipping hidden directories.
+
+        Returns:
+            List[Path]: Files of the project, sorted
+        """
+
+        files: List[Path] = []
+
+        for path in self.project.rglob("*"):
+            relative: Path = path.relative_to(self.project)
+
+            if any(part.startswith(".") for part in relative.parts):
+                continue
+
+            if path.is_file():
+                files.append(path)
+
+        return sorted(files)
+
+    def makefile_variable(self, name: str) -> "str|None":
+        """Read a simple variable assignment of the project's Makefile, if any."""
+
+        makefile: Path = self.project / "Makefile"
+
+        if not makefile.exists():
+            return None
+
+        found = re.search(rf"^\s*(?:export\s+)?{name}\s*:?=\s*(\S+)",
+                          makefile.read_text(errors="replace"), re.MULTILINE)
+
+        return found.group(1) if found else None
+
+    def soundbank_outputs(self) -> List[Path]:
+        """Files generated by smconv from the project's SOUNDBANK, if any."""
+
+        soundbank: "str|None" = self.makefile_variable("SOUNDBANK")
+
+        return [
+            self.project / f"{soundbank}{s}" for s in (".asm", ".h", ".bnk", ".obj")
+        ] if soundbank else []
+
+    def rom_outputs(self, files: List[Path]) -> List[Path]:
+        """Files written by the linker: the ROM, its symbols and the linkfile."""
+
+        romname: "str|None" = self.makefile_variable("ROMNAME")
+        rom_outputs: List[Path] = [f for f in files if f.suffix in self.ROM_OUTPUTS]
+        rom_outputs += [self.project / f"{romname}{s}" for s in self.ROM_OUTPUTS] if romname else []
+
+        return sorted(set(rom_outputs)) + [self.project / "linkfile"]
+
+    def generated_files(self, files: List[Path]) -> Set[Path]:
+        """
+        Find which files of the project are written by the build.
+
+        Args:
+            files: Files of the project, as returned by project_files()
+
+        Returns:
+            Set[Path]: The build outputs, existing or not
+        """
+
+        generated: Set[Path] = {
+            f for f in files if f.suffix in (".obj", ".ps", ".asp", ".dbg")
+        }
+
+        for c_file in [f for f in files if f.suffix == ".c"]:
+            generated.update({c_file.with_suffix(s) for s in (".ps", ".asp", ".asm", ".obj")})
+
+        for image in [f for f in files if f.suffix.lower() in self.IMAGE_SUFFIXES]:
+            generated.update({image.with_suffix(s) for s in self.IMAGE_OUTPUTS})
+
+        for wav in [f for f in files if f.suffix.lower() in self.AUDIO_SUFFIXES]:
+            generated.add(wav.with_suffix(".brr"))
+
+        generated.update(self.soundbank_outputs())
+        generated.update(self.rom_outputs(files))
+
+        return generated
+
+    def collect_groups(self) -> Dict[str, Tuple[str, List[Path]]]:
+        """
+        Compute the key and candidate outputs of every output group.
+
+        Returns:
+            Dict[str, Tuple[str, List[Path]]]: Group name to (key, outputs)
+        """
+
+        files: List[Path] = self.project_files()
+
+        c_files: List[Path] = [f for f in files if f.suffix == ".c"]
+        generated: Set[Path] = self.generated_files(files)
+
+        soundbank: "str|None" = self.makefile_variable("SOUNDBANK")
+        soundbank_outputs: List[Path] = self.soundbank_outputs()
+        rom_outputs: List[Path] = self.rom_outputs(files)
+
+        inputs: List[Path] = [f for f in files if f not in generated]
+        digests: Dict[Path, str] = {f: hash_file(f) for f in inputs}
+
+        def digest_of(paths: List[Path]) -> List[str]:
+            return [f"{p.relative_to(self.project).as_posix()}={digests[p]}" for p in paths]
+
+        makefile: Path = self.project / "Makefile"
+        common: List[str] = [self.toolchain_fingerprint()]
+        common += digest_of([makefile]) if makefile in digests else []
+
+        headers: List[str] = digest_of(
+            [f for f in inputs if f.suffix.lower() in self.HEADER_SUFFIXES])
+
+        modules: List[str] = digest_of(
+            [f for f in inputs if f.suffix.lower() in self.MODULE_SUFFIXES])
+
+        # The SOUNDBANK header is generated, so C files including it depend on
+        # the modules it is made from (their order comes from the Makefile).
+        if soundbank:
+            headers += [f"soundbank={soundbank}", *modules]
+
+        groups: Dict[str, Tuple[str, List[Path]]] = {}
+
+        for c_file in c_files:
+            groups[f"c:{c_file.relative_to(self.project).as_posix()}"] = (
+                hash_values(*common, *headers, *digest_of([c_file])),
+                [c_file.with_suffix(s) for s in (".ps", ".asm", ".obj")]
+            )
+
+        for image in [f for f in inputs if f.suffix.lower() in self.IMAGE_SUFFIXES]:
+            groups[f"gfx:{image.relative_to(self.project).as_posix()}"] = (
+                hash_values(*common, *digest_of([image])),
+                [image.with_suffix(s) for s in self.IMAGE_OUTPUTS]
+            )
+
+        for wav in [f for f in inputs if f.suffix.lower() in self.AUDIO_SUFFIXES]:
+            groups[f"brr:{wav.relative_to(self.project).as_posix()}"] = (
+                hash_values(*common, *digest_of([wav])),
+                [wav.with_suffix(".brr")]
+            )
+
+        if soundbank and modules:
+            groups["soundbank"] = (hash_values(*common, *modules), soundbank_outputs)
+
+        # Hand-written assembly may .incbin any asset, so it depends on all of them.
+        assets: List[str] = digest_of([
+            f for f in inputs if f.suffix.lower() in
+            self.IMAGE_SUFFIXES + self.AUDIO_SUFFIXES + self.MODULE_SUFFIXES +
+            self.DATA_SUFFIXES + self.HEADER_SUFFIXES + (".asm",)
+        ])
+
+        for asm in [f for f in inputs if f.suffix == ".asm"]:
+            groups[f"asm:{asm.relative_to(self.project).as_posix()}"] = (
+                hash_values(*common, *assets, *digest_of([asm])),
+                [asm.with_suffix(".obj")]
+            )
+
+        groups["rom"] = (
+            hash_values(*common, *digest_of(inputs)),
+            rom_outputs
+        )
+
+        return groups
+
+    def entry_dir(self, key: str) -> Path:
+        """Directory of the cache entry for a key."""
+
+        return self.cache_dir / key[:2] / key
+
+    def load_state(self) -> Dict[str, str]:
+        """Load the group keys of the last successful build of the project."""
+
+        try:
+            with open(self.project / self.STATE_FILE, "r") as state_file:
+                return dict(json.load(state_file).get("groups", {}))
+
+        except Exception:
+            return {}
+
+    def restore(self) -> int:
+        """
+        Prepare the project tree before running make.
+
+        Outputs of groups whose key did not change since the last build are kept,
+        outputs found in the cache are restored, and stale outputs of changed
+        groups are removed. Kept and restored outputs get the current time as
+        mtime, so make's timestamp logic agrees with the content hashes.
+
+        Returns:
+            int: Number of output files restored from the cache
+        """
+
+        self.groups = self.collect_groups()
+        state: Dict[str, str] = self.load_state()
+
+        now: float = time.time()
+        restored: int = 0
+        fresh: List[Path] = []
+
+        for name, (key, outputs) in self.groups.items():
+            existing: List[Path] = [o for o in outputs if o.exists()]
+            entry: Path = self.entry_dir(key)
+
+            if state.get(name) == key and existing:
+                fresh.extend(existing)
+
+            elif (entry / "manifest.json").exists():
+                with open(entry / "manifest.json", "r") as manifest_file:
+                    manifest: Dict[str, str] = json.load(manifest_file)
+
+                for stale in existing:
+                    stale.unlink()
+
+                for relative, stored in manifest.items():
+                    target: Path = self.project / relative
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copyfile(entry / stored, target)
+                    fresh.append(target)
+                    restored += 1
+
+                os.utime(entry / "manifest.json")
+
+            else:
+                for stale in existing:
+                    stale.unlink()
+
+        for path in fresh:
+            os.utime(path, (now, now))
+
+        print(f"Build cache: {restored} output files restored, "
+              f"{len(fresh) - restored} up to date")
+
+        return restored
+
+    def store(self) -> int:
+        """
+        Save the outputs of every group after a successful make.
+
+        Returns:
+            int: Number of new cache entries
+        """
+
+        if not self.groups:
+            self.groups = self.collect_groups()
+
+        stored: int = 0
+        state: Dict[str, str] = {}
+
+        for name, (key, outputs) in self.groups.items():
+            existing: List[Path] = [o for o in outputs if o.exists()]
+
+            if not existing:
+                continue
+
+            state[name] = key
+            entry: Path = self.entry_dir(key)
+
+            if (entry / "manifest.json").exists():
+                continue
+
+            temp_entry: Path = entry.with_name(f"{key}.tmp{os.getpid()}")
+            temp_entry.mkdir(parents=True, exist_ok=True)
+
+            manifest: Dict[str, str] = {}
+
+            for index, output in enumerate(existing):
+                stored_name: str = f"{index:03d}{output.suffix}"
+                shutil.copyfile(output, temp_entry / stored_name)
+                manifest[output.relative_to(self.project).as_posix()] = stored_name
+
+            with open(temp_entry / "manifest.json", "w") as manifest_file:
+                json.dump(manifest, manifest_file, indent=2)
+
+            try:
+                os.replace(temp_entry, entry)
+                stored += 1
+
+            except OSError:
+                shutil.rmtree(temp_entry, ignore_errors=True)
+
+        with open(self.project / self.STATE_FILE, "w") as state_file:
+            json.dump({"version": 1, "groups": state}, state_file, indent=2)
+
+        print(f"Build cache: {stored} new entries stored in {self.cache_dir}")
+
+        return stored
@@ -0,0 +1,101 @@
+"""
+SNES-IDE - build_cli.py
+Copyright (C) 2025 BrunoRNS
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from typing import List
+from pathlib import Path
+import argparse
+import sys
+import os
+
+from toolchains import TOOLCHAINS, detect_toolchain
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    """
+    Parse the arguments of the build command.
+
+    Args:
+        argv: The arguments after "build"
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        prog="snes-ide build",
+        description="Build a SNES project without opening the IDE."
+    )
+
+    parser.add_argument(
+        "project", type=Path,
+        help="project directory (or the JAR output of a JavaSnes project)"
+    )
+    parser.add_argument(
+        "--toolchain", choices=sorted(TOOLCHAINS),
+        help="toolchain of the project, detected from its files by default"
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int,
+        help="number of parallel make jobs, defaults to the CPU count"
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="do not restore or store outputs in the build cache"
+    )
+
+    return parser.parse_args(argv)
+
+
+def main(argv: "List[str]|None" = None) -> int:
+    """
+    Build a project from the command line, without PySide6 or file dialogs.
+
+    Args:
+        argv: The arguments after "build", defaults to sys.argv[1:]
+
+    Returns:
+        int: 0 on success, -1 on failure
+    """
+
+    args: argparse.Namespace = parse_args(sys.argv[1:] if argv is None else argv)
+
+    project: Path = args.project.resolve()
+
+    if not project.exists():
+        print(f"Project not found: {project}")
+        return -1
+
+    toolchain: "str|None" = args.toolchain or detect_toolchain(project)
+
+    if toolchain is None:
+        print(f"Could not detect the toolchain of {project}, use --toolchain")
+        return -1
+
+    if args.jobs is not None:
+        os.environ["SNES_IDE_MAKE_JOBS"] = str(args.jobs)
+
+    if args.no_cache:
+        os.environ["SNES_IDE_BUILD_CACHE"] = "0"
+
+    print(f"Building {project} with {toolchain}...", flush=True)
+
+    return TOOLCHAINS[toolchain](project)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
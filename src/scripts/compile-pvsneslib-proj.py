@@ -17,64 +17,21 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 from typing_extensions import NoReturn
-from subprocess import CompletedProcess
 from pathlib import Path
-import subprocess
-import os
 
 from get_file_path import get_file_path
-
-def get_executable_path() -> str:
-    """
-    Get the path of the directory containing the script executable.
-
-    Returns:
-        str: Path of the executable directory
-    """
-
-    return str(Path(__file__).resolve().parent)
-
-
-def get_home_path() -> str:
-    """Get snes-ide home directory"""
-
-    return str(Path(get_executable_path()).parent)
+from toolchains import build_pvsneslib
 
 
 def main() -> NoReturn:
     """Main logic of the compilation of the pvsneslib project"""
 
-    home_path = get_home_path()
-
-    pvsneslib_home: Path = Path(home_path) / "bin" / "pvsneslib"
-
-    os.environ["PVSNESLIB_HOME"] = str(pvsneslib_home)
-
     pvsneslib_proj: Path = Path(str(get_file_path(
         "Select PvSnesLib project directory", file_types=[("Directories", "*")],
         multiple=False, directory=True
     )))
 
-    if not (pvsneslib_proj / "Makefile").exists():
-        print("No Makefile to build project found, exiting...")
-        exit(-1)
-
-    make: Path = Path(home_path) / "bin" / "make" / \
-        ("make" if os.name == "posix" else "make.exe")
-
-    make_output: CompletedProcess[str]
-
-    make_output = subprocess.run(
-        [str(make)], cwd=pvsneslib_proj, shell=True, capture_output=True,
-        env=os.environ, text=True
-    )
-
-    if make_output.returncode != 0:
-        print(
-            f"Error while compiling the software {make_output.stderr}, exiting...")
-        exit(-1)
-
-    exit(0)
+    exit(build_pvsneslib(pvsneslib_proj))
 
 
 if __name__ == "__main__":
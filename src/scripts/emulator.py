@@ -0,0 +1,105 @@
+"""
+SNES-IDE - emulator.py
+Copyright (C) 2025 BrunoRNS
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from typing import List
+from pathlib import Path
+import subprocess
+import platform
+
+from toolchains import get_home_path
+
+
+def get_emulator_path() -> Path:
+    """Get the bundled SNES emulator of the current platform"""
+
+    snes_emulator: Path = Path(get_home_path()) / "bin" / "snes-emulator"
+
+    if platform.system().lower() == "windows":
+        return snes_emulator / "lakesnes.exe"
+
+    elif platform.system().lower() == "darwin":
+        return snes_emulator / "bsnes.app"
+
+    return snes_emulator / "lakesnes"
+
+
+def emulator_command(rom_path: Path) -> List[str]:
+    """
+    Build the command line that opens a ROM in the bundled emulator.
+
+    Args:
+        rom_path: The .sfc file to open
+
+    Returns:
+        List[str]: The command line
+    """
+
+    if platform.system().lower() == "darwin":
+        return ["open", "-a", str(get_emulator_path()), str(rom_path)]
+
+    return [str(get_emulator_path()), str(rom_path)]
+
+
+class EmulatorSession:
+    """
+    Keep one emulator open on a ROM, restarting it when the ROM is rebuilt.
+
+    On macOS the app is opened through "open", which hands the new ROM to the
+    running bsnes instead of giving us a process to restart.
+    """
+
+    def __init__(self) -> None:
+        """Initialize a session with no emulator running."""
+
+        self.process: "subprocess.Popen|None" = None
+
+    def is_running(self) -> bool:
+        """Whether the emulator started by this session is still open."""
+
+        return self.process is not None and self.process.poll() is None
+
+    def stop(self) -> None:
+        """Close the emulator started by this session, if it is still open."""
+
+        if not self.is_running():
+            return
+
+        self.process.terminate()
+
+        try:
+            self.process.wait(timeout=3)
+
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+    def launch(self, rom_path: Path) -> None:
+        """
+        Open a ROM, replacing the emulator already open.
+
+        Args:
+            rom_path: The .sfc file to open
+        """
+
+        self.stop()
+
+        if platform.system().lower() == "darwin":
+            subprocess.run(emulator_command(rom_path), check=False)
+            return
+
+        self.process = subprocess.Popen(emulator_command(rom_path))
@@ -18,14 +18,103 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                                QGridLayout, QTabWidget, QGroupBox, QLabel, QLineEdit, 
-                               QPushButton, QCheckBox, QComboBox, QMessageBox, QFileDialog)
-from PySide6.QtCore import Qt, QProcess
+                               QPushButton, QCheckBox, QComboBox, QMessageBox, QFileDialog,
+                               QScrollArea)
+from PySide6.QtCore import Qt, QProcess, QThread, QTimer, Signal
+from PySide6.QtGui import QImage, QPixmap
 from subprocess import CalledProcessError
-from typing import List
+from typing import Dict, List, Tuple
 from pathlib import Path
 import os
 import sys
 
+from gfx_batch import BACKENDS, BatchItem, BatchResult, get_gfx4snes_path, run_batch, scan_directory
+from gfx_cache import GfxCache, is_enabled, snapshot_outputs, written_outputs
+from tile_encoder import UnsupportedOptions, convert_file
+from tile_preview import Preview, PreviewRenderer
+from shared_tileset import SharedTileset, build_shared_tileset, write_shared_tileset
+from vram_budget import BG_MODE_LAYERS, Asset, BudgetReport, analyze, collect_assets, format_report, format_size
+import numpy as np
+
+
+class BatchThread(QThread):
+    """Run a batch conversion off the GUI thread, reporting every file."""
+
+    fileConverted = Signal(str)
+    batchFinished = Signal(int, int)
+
+    def __init__(self, items: List[BatchItem], backend: str, flip_reduction: bool) -> None:
+        """
+        Initialize the thread.
+
+        Args:
+            items: The images to convert
+            backend: One of gfx_batch.BACKENDS
+            flip_reduction: Merge H/V flipped tiles, with the native backend only
+        """
+        super().__init__()
+        self.items: List[BatchItem] = items
+        self.backend: str = backend
+        self.flip_reduction: bool = flip_reduction
+
+    def run(self) -> None:
+        """Convert the images and emit the number of converted and failed files."""
+        results: List[BatchResult] = run_batch(
+            self.items, on_result=lambda result: self.fileConverted.emit(result.summary()),
+            cache=GfxCache() if is_enabled() else None,
+            backend=self.backend, flip_reduction=self.flip_reduction
+        )
+
+        failed: int = sum(1 for result in results if not result.ok)
+        self.batchFinished.emit(len(results) - failed, failed)
+
+
+class PreviewThread(QThread):
+    """Encode and render a preview off the GUI thread."""
+
+    previewReady = Signal(object)
+    previewFailed = Signal(str)
+
+    def __init__(self, renderer: PreviewRenderer, image: Path, args: List[str], flip_reduction: bool) -> None:
+        """
+        Initialize the thread.
+
+        Args:
+            renderer: Renderer keeping the image and tile layouts between previews
+            image: The PNG or BMP file
+            args: gfx4snes arguments
+            flip_reduction: Merge H/V flipped tiles
+        """
+        super().__init__()
+        self.renderer: PreviewRenderer = renderer
+        self.image: Path = image
+        self.args: List[str] = args
+        self.flip_reduction: bool = flip_reduction
+
+    def run(self) -> None:
+        """Render the preview and emit it, or the reason it is unavailable."""
+        try:
+            self.previewReady.emit(self.renderer.render(self.image, self.args, self.flip_reduction))
+        except (UnsupportedOptions, OSError) as e:
+            self.previewFailed.emit(str(e))
+
+
+def to_pixmap(rgb: np.ndarray, scale: int) -> QPixmap:
+    """
+    Convert RGB pixels to a pixmap, scaled without smoothing.
+
+    Args:
+        rgb: Pixels, shape (height, width, 3)
+        scale: Zoom factor
+
+    Returns:
+        QPixmap: The scaled image
+    """
+    rgb = np.ascontiguousarray(rgb.repeat(scale, axis=0).repeat(scale, axis=1))
+    height, width = rgb.shape[:2]
+
+    return QPixmap.fromImage(QImage(rgb.data, width, height, width * 3, QImage.Format_RGB888).copy())
+
 
 class TileConverterGUI(QMainWindow):
     """
@@ -39,7 +128,7 @@ class TileConverterGUI(QMainWindow):
         """Initialize the main application window and UI components."""
         super().__init__()
         self.setWindowTitle("Tile Converter")
-        self.setGeometry(100, 100, 600, 700)
+        self.setGeometry(100, 100, 600, 900)
         
         # Initialize variables
         self.input_file: str = ""
@@ -52,10 +141,33 @@ class TileConverterGUI(QMainWindow):
         
         self.setup_ui(main_layout)
         
+        # Cache entry to fill when the running conversion succeeds
+        self.gfx_cache: "GfxCache|None" = GfxCache() if is_enabled() else None
+        self.pending_cache_key: "str|None" = None
+        self.pending_input: Path = Path()
+        self.pending_outputs: Dict[Path, Tuple[int, int]] = {}
+
         # Initialize process for running commands
         self.process = QProcess()
         self.process.finished.connect(self.on_process_finished)
 
+        # Preview, re-rendered shortly after the last option change
+        self.preview_renderer = PreviewRenderer()
+        self.preview_thread: "PreviewThread|None" = None
+        self.preview_pending: bool = False
+
+        self.preview_timer = QTimer(self)
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.setInterval(150)
+        self.preview_timer.timeout.connect(self.update_preview)
+
+        for checkbox in self.findChildren(QCheckBox):
+            checkbox.toggled.connect(self.schedule_preview)
+        for combo in self.findChildren(QComboBox):
+            combo.currentTextChanged.connect(self.schedule_preview)
+        for edit in self.findChildren(QLineEdit):
+            edit.textChanged.connect(self.schedule_preview)
+
     def setup_ui(self, main_layout: QVBoxLayout) -> None:
         """Set up all UI components and layout."""
         self.create_file_section(main_layout)
@@ -69,10 +181,28 @@ class TileConverterGUI(QMainWindow):
         self.create_palette_tab()
         self.create_misc_tab()
 
-        # Convert button
+        self.create_preview_section(main_layout)
+
+        # Convert buttons
+        buttons_layout = QHBoxLayout()
+
         convert_btn = QPushButton("Convert")
         convert_btn.clicked.connect(self.convert)
-        main_layout.addWidget(convert_btn)
+        buttons_layout.addWidget(convert_btn)
+
+        self.convert_folder_btn = QPushButton("Convert Folder...")
+        self.convert_folder_btn.clicked.connect(self.convert_folder)
+        buttons_layout.addWidget(self.convert_folder_btn)
+
+        tileset_btn = QPushButton("Shared Tileset...")
+        tileset_btn.clicked.connect(self.shared_tileset)
+        buttons_layout.addWidget(tileset_btn)
+
+        vram_btn = QPushButton("VRAM Report...")
+        vram_btn.clicked.connect(self.vram_report)
+        buttons_layout.addWidget(vram_btn)
+
+        main_layout.addLayout(buttons_layout)
 
     def create_file_section(self, parent_layout: QVBoxLayout) -> None:
         """Create file input section."""
@@ -98,6 +228,27 @@ class TileConverterGUI(QMainWindow):
 
         parent_layout.addWidget(file_group)
 
+    def create_preview_section(self, parent_layout: QVBoxLayout) -> None:
+        """Create the preview of the converted image and its palette."""
+        preview_group = QGroupBox("Preview")
+        preview_layout = QVBoxLayout(preview_group)
+
+        self.preview_label = QLabel("Select an image to preview its conversion")
+        self.preview_label.setAlignment(Qt.AlignCenter)
+
+        preview_scroll = QScrollArea()
+        preview_scroll.setWidgetResizable(True)
+        preview_scroll.setWidget(self.preview_label)
+        preview_layout.addWidget(preview_scroll, 1)
+
+        self.palette_label = QLabel()
+        preview_layout.addWidget(self.palette_label)
+
+        self.preview_info = QLabel()
+        preview_layout.addWidget(self.preview_info)
+
+        parent_layout.addWidget(preview_group, 1)
+
     def create_tiles_tab(self) -> None:
         """Create tiles options tab."""
         tiles_widget = QWidget()
@@ -236,6 +387,21 @@ class TileConverterGUI(QMainWindow):
         self.quiet_mode = QCheckBox("Quiet mode")
         misc_layout.addWidget(self.quiet_mode)
 
+        backend_layout = QHBoxLayout()
+        backend_layout.addWidget(QLabel("Encoder:"))
+        self.backend_combo = QComboBox()
+        self.backend_combo.addItems(BACKENDS)
+        self.backend_combo.setToolTip(
+            "native converts in-process with the same output as gfx4snes,\n"
+            "which is still used for the options it does not support"
+        )
+        backend_layout.addWidget(self.backend_combo)
+        backend_layout.addStretch()
+        misc_layout.addLayout(backend_layout)
+
+        self.flip_reduction = QCheckBox("Merge flipped tiles (native encoder only)")
+        misc_layout.addWidget(self.flip_reduction)
+
         version_btn = QPushButton("Display Version Information")
         version_btn.clicked.connect(self.show_version)
         misc_layout.addWidget(version_btn)
@@ -243,6 +409,61 @@ class TileConverterGUI(QMainWindow):
         misc_layout.addStretch()
         self.notebook.addTab(misc_widget, "Misc Options")
 
+    def schedule_preview(self) -> None:
+        """Re-render the preview once the options stop changing."""
+        self.preview_timer.start()
+
+    def update_preview(self) -> None:
+        """Render the preview in the background with the current options."""
+        if self.preview_thread is not None and self.preview_thread.isRunning():
+            self.preview_pending = True
+            return
+
+        image = Path(self.file_entry.text())
+
+        if not image.is_file():
+            return
+
+        self.preview_pending = False
+
+        self.preview_thread = PreviewThread(
+            self.preview_renderer, image, self.build_command_line(), self.flip_reduction.isChecked()
+        )
+        self.preview_thread.previewReady.connect(self.on_preview_ready)
+        self.preview_thread.previewFailed.connect(self.on_preview_failed)
+        self.preview_thread.finished.connect(self.on_preview_finished)
+        self.preview_thread.start()
+
+    def on_preview_ready(self, preview: Preview) -> None:
+        """Show a rendered preview."""
+        height, width = preview.rgb.shape[:2]
+        self.preview_label.setPixmap(to_pixmap(preview.rgb, max(1, min(4, 512 // max(width, height, 1)))))
+
+        # 16 colors per row, one row per 16 colors palette
+        colors = max(16, -(-len(preview.encoded.pal) // 32) * 16)
+        self.palette_label.setPixmap(to_pixmap(preview.cgram[:colors].reshape(-1, 16, 3), 12))
+
+        encoded = preview.encoded
+        report = analyze([
+            Asset(self.file_entry.text(), encoded.pic, encoded.tilemap, encoded.pal, preview.options.bits_per_pixel)
+        ]).assets[0]
+
+        self.preview_info.setText(
+            preview.summary() + f"\n{report.unique_tiles} unique tiles, VRAM: " +
+            ", ".join(f"mode {mode} {format_size(report.vram[mode])}" for mode in BG_MODE_LAYERS)
+        )
+
+    def on_preview_failed(self, reason: str) -> None:
+        """Explain why no preview can be shown."""
+        self.preview_label.setText(f"Preview unavailable: {reason}")
+        self.palette_label.clear()
+        self.preview_info.clear()
+
+    def on_preview_finished(self) -> None:
+        """Render again if the options changed while the last preview was rendering."""
+        if self.preview_pending:
+            self.update_preview()
+
     def browse_file(self) -> None:
         """Open file dialog to select input file."""
         file_types = "Bitmap files (*.bmp);;PNG files (*.png);;All files (*.*)"
@@ -287,6 +508,15 @@ class TileConverterGUI(QMainWindow):
             QMessageBox.critical(self, "Error", "Input file does not exist")
             return False
 
+        return self.validate_options()
+
+    def validate_options(self) -> bool:
+        """
+        Validate the numeric conversion options.
+
+        Returns:
+            bool: True if all options are valid, False otherwise
+        """
         try:
             tile_offset = int(self.tile_offset_edit.text())
             if not (0 <= tile_offset <= 2047):
@@ -306,12 +536,12 @@ class TileConverterGUI(QMainWindow):
 
         return True
 
-    def build_command_line(self) -> List[str]:
+    def build_options(self) -> List[str]:
         """
-        Build command line arguments based on GUI selections.
+        Build the gfx4snes options selected in the GUI, without the input file.
 
         Returns:
-            List[str]: The constructed command line arguments
+            List[str]: The options, one argument per element
         """
         args: List[str] = []
 
@@ -320,7 +550,7 @@ class TileConverterGUI(QMainWindow):
 
         block_size = self.block_size_combo.currentText()
         if block_size != "8":
-            args.append(f"-s {block_size}")
+            args += ["-s", block_size]
 
         if self.packed_format.isChecked():
             args.append("-k")
@@ -332,13 +562,13 @@ class TileConverterGUI(QMainWindow):
             block_width = self.block_width_edit.text()
             block_height = self.block_height_edit.text()
             if block_width != "8":
-                args.append(f"-W {block_width}")
+                args += ["-W", block_width]
             if block_height != "8":
-                args.append(f"-H {block_height}")
+                args += ["-H", block_height]
 
         tile_offset = self.tile_offset_edit.text()
         if tile_offset != "0":
-            args.append(f"-f {tile_offset}")
+            args += ["-f", tile_offset]
 
         if self.include_map.isChecked():
             args.append("-m")
@@ -354,7 +584,7 @@ class TileConverterGUI(QMainWindow):
 
         mode_format = self.mode_format_combo.currentText()
         if mode_format != "1":
-            args.append(f"-M {mode_format}")
+            args += ["-M", mode_format]
 
         if self.rearrange_palette.isChecked():
             args.append("-a")
@@ -364,32 +594,68 @@ class TileConverterGUI(QMainWindow):
 
         palette_entry = self.palette_entry_edit.text()
         if palette_entry != "0":
-            args.append(f"-e {palette_entry}")
+            args += ["-e", palette_entry]
 
         colors_output = self.colors_output_edit.text()
         if colors_output != "16":
-            args.append(f"-o {colors_output}")
+            args += ["-o", colors_output]
 
         if self.include_palette.isChecked():
             args.append("-p")
 
         colors_used = self.colors_used_combo.currentText()
         if colors_used != "16":
-            args.append(f"-u {colors_used}")
-
-        args.append(f"-i \"{self.file_entry.text()}\"")
-        args.append(f"-t {self.file_type_combo.currentText()}")
+            args += ["-u", colors_used]
 
         if self.quiet_mode.isChecked():
             args.append("-q")
 
         return args
 
+    def build_command_line(self) -> List[str]:
+        """
+        Build command line arguments based on GUI selections.
+
+        Returns:
+            List[str]: The constructed command line arguments
+        """
+        return self.build_options() + [
+            "-i", self.file_entry.text(), "-t", self.file_type_combo.currentText()
+        ]
+
+    def convert_native(self) -> bool:
+        """
+        Convert the image in-process with the native encoder.
+
+        Returns:
+            bool: False if gfx4snes is needed for the selected options
+        """
+        try:
+            outputs = convert_file(
+                Path(self.file_entry.text()), self.build_command_line(), self.flip_reduction.isChecked()
+            )
+        except UnsupportedOptions as e:
+            print(f"{e}, using gfx4snes", flush=True)
+            return False
+        except OSError as e:
+            QMessageBox.critical(self, "Conversion failed", f"Failed to convert image to SNES format.\nError: {e}")
+            return True
+
+        QMessageBox.information(
+            self,
+            "Conversion finished",
+            "Converted by the native encoder:\n" + "\n".join(path.name for path in outputs)
+        )
+        return True
+
     def convert(self) -> None:
         """Execute the conversion with selected parameters."""
         if not self.validate_inputs():
             return
 
+        if self.backend_combo.currentText() == "native" and self.convert_native():
+            return
+
         try:
             gfx4snes = (
                 Path(self.get_home_path()) / "bin" /
@@ -410,6 +676,30 @@ class TileConverterGUI(QMainWindow):
         command_line = self.build_command_line()
         full_command = [str(gfx4snes)] + command_line
 
+        input_file = Path(self.file_entry.text())
+        self.pending_cache_key = None
+
+        if self.gfx_cache is not None:
+            try:
+                self.pending_cache_key = self.gfx_cache.key(gfx4snes, input_file, command_line)
+            except (ValueError, OSError):
+                self.pending_cache_key = None
+
+        if self.pending_cache_key is not None:
+            restored = self.gfx_cache.restore(self.pending_cache_key, input_file)
+
+            if restored is not None:
+                QMessageBox.information(
+                    self,
+                    "Conversion finished",
+                    "Unchanged image and options, restored from cache:\n" +
+                    "\n".join(path.name for path in restored)
+                )
+                return
+
+            self.pending_input = input_file
+            self.pending_outputs = snapshot_outputs(input_file)
+
         QMessageBox.information(
             self,
             "Conversion started",
@@ -424,6 +714,13 @@ class TileConverterGUI(QMainWindow):
     def on_process_finished(self, exit_code: int, exit_status: QProcess.ExitStatus) -> None:
         """Handle process completion."""
         if exit_code == 0:
+            if self.gfx_cache is not None and self.pending_cache_key is not None:
+                self.gfx_cache.store(
+                    self.pending_cache_key,
+                    written_outputs(self.pending_input, self.pending_outputs)
+                )
+                self.gfx_cache.evict()
+
             QMessageBox.information(
                 self,
                 "Conversion finished",
@@ -437,6 +734,123 @@ class TileConverterGUI(QMainWindow):
                 f"Failed to convert image to SNES format.\nError: {error_output}"
             )
 
+    def convert_folder(self) -> None:
+        """Convert every PNG/BMP of a folder with the selected options, in parallel."""
+        if not self.validate_options():
+            return
+
+        backend = self.backend_combo.currentText()
+
+        if backend == "gfx4snes" and not get_gfx4snes_path().exists():
+            QMessageBox.critical(self, "Error", f"gfx4snes not found at: {get_gfx4snes_path()}")
+            return
+
+        directory = QFileDialog.getExistingDirectory(self, "Select folder of images to convert")
+
+        if not directory:
+            return
+
+        items: List[BatchItem] = scan_directory(Path(directory), self.build_options())
+
+        if not items:
+            QMessageBox.critical(self, "Error", f"No PNG or BMP file found in {directory}")
+            return
+
+        print(f"Converting {len(items)} images from {directory}...", flush=True)
+
+        self.convert_folder_btn.setEnabled(False)
+
+        self.batch_thread = BatchThread(items, backend, self.flip_reduction.isChecked())
+        self.batch_thread.fileConverted.connect(lambda line: print(line, flush=True))
+        self.batch_thread.batchFinished.connect(self.on_batch_finished)
+        self.batch_thread.start()
+
+    def on_batch_finished(self, converted: int, failed: int) -> None:
+        """Report the outcome of a folder conversion."""
+        self.convert_folder_btn.setEnabled(True)
+
+        if failed:
+            QMessageBox.critical(
+                self,
+                "Conversion failed",
+                f"{converted} images converted, {failed} failed.\n"
+                "See the output log for the failing files."
+            )
+        else:
+            QMessageBox.information(
+                self,
+                "Conversion finished",
+                f"{converted} images converted successfully!"
+            )
+
+    def shared_tileset(self) -> None:
+        """Convert every PNG/BMP of a folder to one shared tileset, with a map and palette per image."""
+        if not self.validate_options():
+            return
+
+        directory = QFileDialog.getExistingDirectory(self, "Select folder of images sharing a tileset")
+
+        if not directory:
+            return
+
+        items: List[BatchItem] = scan_directory(Path(directory), self.build_options())
+
+        if not items:
+            QMessageBox.critical(self, "Error", f"No PNG or BMP file found in {directory}")
+            return
+
+        output = Path(directory) / "tileset.pic"
+
+        try:
+            tileset: SharedTileset = build_shared_tileset(
+                items, int(self.tile_offset_edit.text()), self.flip_reduction.isChecked()
+            )
+            write_shared_tileset(tileset, output)
+        except (ValueError, OSError) as e:
+            QMessageBox.critical(self, "Error", f"Could not build the shared tileset: {e}")
+            return
+
+        lines = tileset.report()
+        print("\n".join(lines), flush=True)
+
+        QMessageBox.information(
+            self,
+            "Shared Tileset",
+            f"{lines[-1]}\n\nTileset written to {output}, maps and palettes next to the images."
+        )
+
+    def vram_report(self) -> None:
+        """Report the tiles, palettes and VRAM used by the converted graphics of a folder."""
+        directory = QFileDialog.getExistingDirectory(self, "Select folder of converted graphics")
+
+        if not directory:
+            return
+
+        try:
+            assets = collect_assets([Path(directory)], self.preview_bits_per_pixel())
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Error", f"Could not read the converted graphics: {e}")
+            return
+
+        if not assets:
+            QMessageBox.critical(self, "Error", f"No .pic file found in {directory}")
+            return
+
+        budget: BudgetReport = analyze(assets)
+        lines = format_report(budget)
+
+        print("\n".join(lines), flush=True)
+
+        QMessageBox.information(
+            self,
+            "VRAM Report",
+            "\n".join(lines[len(budget.assets) + 1:]) + "\n\nSee the output log for every file."
+        )
+
+    def preview_bits_per_pixel(self) -> int:
+        """Depth of the tiles converted with the selected number of colors."""
+        return {"4": 2, "256": 8}.get(self.colors_used_combo.currentText(), 4)
+
     @staticmethod
     def get_executable_path() -> str:
         """
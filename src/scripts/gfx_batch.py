@@ -0,0 +1,473 @@
+"""
+SNES-IDE - gfx_batch.py
+Copyright (C) 2025 BrunoRNS
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Tuple
+from pathlib import Path
+import subprocess
+import argparse
+import shlex
+import json
+import time
+import sys
+import os
+
+from gfx_cache import GfxCache, is_enabled, snapshot_outputs, written_outputs
+from toolchains import get_home_path
+
+
+IMAGE_SUFFIXES: Tuple[str, ...] = (".png", ".bmp")
+
+# Options used by the PvSnesLib templates for a 16 colors background.
+DEFAULT_OPTIONS: List[str] = ["-s", "8", "-o", "16", "-u", "16", "-p", "-m"]
+
+# "native" converts in-process with tile_encoder, falling back to gfx4snes
+# for the options it does not support.
+BACKENDS: Tuple[str, ...] = ("gfx4snes", "native")
+
+
+def get_gfx4snes_path() -> Path:
+    """Get the bundled gfx4snes executable"""
+
+    return (
+        Path(get_home_path()) / "bin" / "pvsneslib" / "devkitsnes" / "tools" /
+        ("gfx4snes.exe" if os.name == "nt" else "gfx4snes")
+    )
+
+
+def parse_options(options: "str|List[str]") -> List[str]:
+    """
+    Normalise gfx4snes options given as a command line string or a list.
+
+    Args:
+        options: e.g. "-s 8 -o 16 -p" or ["-s", "8", "-o", "16", "-p"]
+
+    Returns:
+        List[str]: One argument per element
+    """
+
+    if isinstance(options, str):
+        return shlex.split(options)
+
+    return [str(option) for option in options]
+
+
+class BatchItem:
+    """One image to convert and the gfx4snes options to convert it with."""
+
+    def __init__(self, image: Path, options: List[str]) -> None:
+        """
+        Initialize a batch item.
+
+        Args:
+            image: The PNG or BMP file
+            options: gfx4snes options, without -i and -t
+        """
+
+        self.image: Path = image
+        self.options: List[str] = options
+
+    def command_line(self) -> List[str]:
+        """
+        Get the gfx4snes arguments converting this image from its own directory.
+
+        Returns:
+            List[str]: The arguments, one per element
+        """
+
+        args: List[str] = list(self.options)
+
+        if "-t" not in args and "--file-type" not in args:
+            args += ["-t", self.image.suffix[1:].lower()]
+
+        return args + ["-i", self.image.name]
+
+
+class BatchResult:
+    """Outcome of the conversion of one BatchItem."""
+
+    def __init__(self, item: BatchItem, returncode: int, seconds: float, output: str,
+                 cached: bool = False, native: bool = False) -> None:
+        """
+        Initialize a batch result.
+
+        Args:
+            item: The converted item
+            returncode: Exit code of gfx4snes, -1 if it could not run
+            seconds: Wall time of the conversion
+            output: Combined stdout and stderr of gfx4snes
+            cached: Whether the outputs were restored from the gfx cache
+            native: Whether the image was converted by the native encoder
+        """
+
+        self.item: BatchItem = item
+        self.returncode: int = returncode
+        self.seconds: float = seconds
+        self.output: str = output
+        self.cached: bool = cached
+        self.native: bool = native
+
+    @property
+    def ok(self) -> bool:
+        """Whether the conversion succeeded."""
+
+        return self.returncode == 0
+
+    def summary(self) -> str:
+        """One line report of the conversion."""
+
+        status: str = f"FAILED ({self.returncode})"
+
+        if self.ok:
+            status = "cached" if self.cached else "native" if self.native else "ok"
+
+        line: str = f"{status:<12} {self.seconds * 1000:8.1f} ms  {self.item.image}"
+
+        if not self.ok and self.output.strip():
+            line += "\n    " + self.output.strip().splitlines()[-1]
+
+        return line
+
+
+def scan_directory(directory: Path, options: List[str]) -> List[BatchItem]:
+    """
+    Collect the PNG and BMP files of a directory tree, skipping hidden paths.
+
+    Args:
+        directory: Root of the tree
+        options: gfx4snes options applied to every image
+
+    Returns:
+        List[BatchItem]: The images, sorted by path
+    """
+
+    return [
+        BatchItem(image, list(options)) for image in sorted(directory.rglob("*"))
+        if image.suffix.lower() in IMAGE_SUFFIXES and image.is_file()
+        and not any(part.startswith(".") for part in image.relative_to(directory).parts)
+    ]
+
+
+def load_manifest(manifest_path: Path) -> List[BatchItem]:
+    """
+    Load a batch manifest.
+
+    The manifest is a JSON object with default "options" and a "files" list;
+    each file is a path relative to the manifest, or an object with a "path"
+    and its own "options" replacing the defaults:
+
+        {
+            "options": "-s 8 -o 16 -u 16 -p -m",
+            "files": ["tiles.png", {"path": "font.bmp", "options": "-s 8 -o 2 -u 16 -p"}]
+        }
+
+    Args:
+        manifest_path: Path to the manifest file
+
+    Returns:
+        List[BatchItem]: The images in manifest order
+
+    Raises:
+        ValueError: If the manifest is malformed
+    """
+
+    with open(manifest_path, "r") as manifest_file:
+        manifest: Dict[str, Any] = json.load(manifest_file)
+
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("files"), list):
+        raise ValueError(f"{manifest_path} has no \"files\" list")
+
+    default_options: List[str] = parse_options(manifest.get("options", DEFAULT_OPTIONS))
+    items: List[BatchItem] = []
+
+    for entry in manifest["files"]:
+        if isinstance(entry, str):
+            entry = {"path": entry}
+
+        if not isinstance(entry, dict) or "path" not in entry:
+            raise ValueError(f"Invalid entry in {manifest_path}: {entry!r}")
+
+        options: List[str] = parse_options(entry.get("options", default_options))
+        items.append(BatchItem(manifest_path.parent / entry["path"], options))
+
+    return items
+
+
+def convert_native(item: BatchItem, flip_reduction: bool = False) -> "BatchResult|None":
+    """
+    Convert one image in-process with the native tile encoder.
+
+    Args:
+        item: The image and its options
+        flip_reduction: Also merge H/V flipped tiles, which gfx4snes does not
+
+    Returns:
+        BatchResult|None: The outcome of the conversion, None if gfx4snes is
+            needed for these options or this image
+    """
+
+    started: float = time.perf_counter()
+
+    try:
+        from tile_encoder import UnsupportedOptions, convert_file
+
+    except ImportError:
+        return None
+
+    try:
+        convert_file(item.image, item.command_line(), flip_reduction)
+
+    except UnsupportedOptions:
+        return None
+
+    except OSError as e:
+        return BatchResult(item, -1, time.perf_counter() - started, str(e))
+
+    return BatchResult(item, 0, time.perf_counter() - started, "", native=True)
+
+
+def convert_item(gfx4snes: Path, item: BatchItem, cache: "GfxCache|None" = None,
+                 backend: str = "gfx4snes", flip_reduction: bool = False) -> BatchResult:
+    """
+    Convert one image, writing the outputs next to it.
+
+    Args:
+        gfx4snes: Path to the gfx4snes executable
+        item: The image and its options
+        cache: Cache to restore the outputs from and store them in, if any
+        backend: One of BACKENDS
+        flip_reduction: Merge H/V flipped tiles, with the native backend only
+
+    Returns:
+        BatchResult: The outcome of the conversion
+    """
+
+    started: float = time.perf_counter()
+
+    if not item.image.exists():
+        return BatchResult(item, -1, 0.0, f"{item.image} does not exist")
+
+    if backend == "native":
+        result: "BatchResult|None" = convert_native(item, flip_reduction)
+
+        if result is not None:
+            return result
+
+    key: "str|None" = None
+
+    if cache is not None:
+        try:
+            key = cache.key(gfx4snes, item.image, item.command_line())
+
+        except ValueError:
+            key = None
+
+        if key is not None and cache.restore(key, item.image) is not None:
+            return BatchResult(item, 0, time.perf_counter() - started, "", cached=True)
+
+    before = snapshot_outputs(item.image)
+
+    try:
+        process: subprocess.CompletedProcess = subprocess.run(
+            [str(gfx4snes)] + item.command_line(), cwd=item.image.parent,
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+            errors="replace"
+        )
+
+    except OSError as e:
+        return BatchResult(item, -1, time.perf_counter() - started, str(e))
+
+    if process.returncode == 0 and cache is not None and key is not None:
+        cache.store(key, written_outputs(item.image, before))
+
+    return BatchResult(item, process.returncode, time.perf_counter() - started, process.stdout)
+
+
+def run_batch(items: List[BatchItem], jobs: "int|None" = None, gfx4snes: "Path|None" = None,
+              on_result: "Callable[[BatchResult], None]|None" = None,
+              cache: "GfxCache|None" = None, backend: str = "gfx4snes",
+              flip_reduction: bool = False) -> List[BatchResult]:
+    """
+    Convert many images, running up to `jobs` gfx4snes processes at once.
+
+    Every pool thread only waits on its own gfx4snes process, so the
+    conversions use all the cores without a Python process per worker.
+    Images whose outputs would overwrite each other (same name in the same
+    directory, e.g. tiles.png and tiles.bmp) are not converted.
+
+    Args:
+        items: The images to convert
+        jobs: Maximum number of concurrent conversions, defaults to the CPU count
+        gfx4snes: Path to gfx4snes, defaults to the bundled one
+        on_result: Called from the pool threads as each conversion finishes
+        cache: Cache of converted outputs, evicted down to its size after the batch
+        backend: One of BACKENDS
+        flip_reduction: Merge H/V flipped tiles, with the native backend only
+
+    Returns:
+        List[BatchResult]: The results, in the order of items
+    """
+
+    gfx4snes = gfx4snes or get_gfx4snes_path()
+    jobs = max(1, jobs or os.cpu_count() or 1)
+
+    results: Dict[int, BatchResult] = {}
+    outputs: Dict[Path, Path] = {}
+    pending: List[int] = []
+
+    for index, item in enumerate(items):
+        output: Path = item.image.with_suffix("").resolve()
+
+        if output in outputs:
+            results[index] = BatchResult(
+                item, -1, 0.0, f"outputs collide with {outputs[output].name}")
+
+            if on_result is not None:
+                on_result(results[index])
+
+            continue
+
+        outputs[output] = item.image
+        pending.append(index)
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            pool.submit(
+                convert_item, gfx4snes, items[index], cache, backend, flip_reduction
+            ): index for index in pending
+        }
+
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+
+            if on_result is not None:
+                on_result(results[futures[future]])
+
+    if cache is not None:
+        cache.evict()
+
+    return [results[index] for index in range(len(items))]
+
+
+def collect_items(source: Path, options: "List[str]|None" = None) -> List[BatchItem]:
+    """
+    Collect the images of a directory or a manifest file.
+
+    Args:
+        source: A directory of images or a JSON manifest
+        options: Options for the images of a directory, defaults to DEFAULT_OPTIONS
+
+    Returns:
+        List[BatchItem]: The images to convert
+    """
+
+    if source.is_dir():
+        return scan_directory(source, options if options is not None else DEFAULT_OPTIONS)
+
+    return load_manifest(source)
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    """
+    Parse the arguments of the batch converter.
+
+    Args:
+        argv: The command line arguments
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        prog="snes-ide gfx-batch",
+        description="Convert many PNG/BMP images with gfx4snes in parallel."
+    )
+
+    parser.add_argument("source", type=Path, help="directory of images or JSON manifest")
+    parser.add_argument(
+        "-j", "--jobs", type=int,
+        help="number of concurrent conversions, defaults to the CPU count"
+    )
+    parser.add_argument(
+        "--options", default=" ".join(DEFAULT_OPTIONS),
+        help="gfx4snes options for the images of a directory "
+             f"(default \"{' '.join(DEFAULT_OPTIONS)}\")"
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="always run gfx4snes, without restoring outputs from the gfx cache"
+    )
+    parser.add_argument(
+        "--backend", choices=BACKENDS, default="gfx4snes",
+        help="converter to use; native encodes in-process with the same output "
+             "as gfx4snes, which is still used for the options it does not support"
+    )
+    parser.add_argument(
+        "--flip-reduction", action="store_true",
+        help="with the native backend, also merge tiles that are flipped copies of each other"
+    )
+
+    return parser.parse_args(argv)
+
+
+def main(argv: "List[str]|None" = None) -> int:
+    """
+    Convert a directory or manifest of images from the command line.
+
+    Args:
+        argv: The command line arguments, defaults to sys.argv[1:]
+
+    Returns:
+        int: 0 if every image was converted, -1 otherwise
+    """
+
+    args: argparse.Namespace = parse_args(sys.argv[1:] if argv is None else argv)
+
+    if not args.source.exists():
+        print(f"Not found: {args.source}")
+        return -1
+
+    try:
+        items: List[BatchItem] = collect_items(args.source, parse_options(args.options))
+
+    except (ValueError, OSError) as e:
+        print(f"Invalid manifest: {e}")
+        return -1
+
+    if not items:
+        print(f"No PNG or BMP file found in {args.source}")
+        return -1
+
+    started: float = time.perf_counter()
+
+    results: List[BatchResult] = run_batch(
+        items, args.jobs, on_result=lambda result: print(result.summary(), flush=True),
+        cache=None if args.no_cache or not is_enabled() else GfxCache(),
+        backend=args.backend, flip_reduction=args.flip_reduction
+    )
+
+    failed: int = sum(1 for result in results if not result.ok)
+
+    print(f"{len(results) - failed}/{len(results)} images converted "
+          f"in {time.perf_counter() - started:.2f} s")
+
+    return -1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
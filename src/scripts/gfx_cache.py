@@ -0,0 +1,433 @@
+"""
+SNES-IDE - gfx_cache.py
+Copyright (C) 2025 BrunoRNS
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from typing import Dict, List, Tuple
+from pathlib import Path
+import subprocess
+import shutil
+import shlex
+import json
+import sys
+import os
+import re
+
+from build_cache import get_cache_home, hash_file, hash_values
+
+
+# Files gfx4snes writes next to the image, depending on the options.
+OUTPUT_SUFFIXES: Tuple[str, ...] = (
+    ".pic", ".pal", ".map", ".pc7", ".mp7", ".til", ".m16", ".b16", ".o16", ".t16"
+)
+
+VALUE_OPTIONS: Dict[str, str] = {
+    "--til-size": "-s", "--tile-width": "-W", "--tile-height": "-H",
+    "--map-offset": "-f", "--map-mode": "-M", "--pal-entry": "-e",
+    "--pal-col-output": "-o", "--pal-col-use": "-u",
+    "--file-input": "-i", "--file-type": "-t",
+}
+
+FLAG_OPTIONS: Dict[str, str] = {
+    "--til-blank": "-b", "--til-pack": "-k", "--til-lzpack": "-z",
+    "--map-output": "-m", "--map-highpriority": "-g", "--map-32x32": "-y",
+    "--map-noreduction": "-R", "--pal-rearrange": "-a", "--pal-rounded": "-d",
+    "--pal-output": "-p", "--quiet": "-q", "--version": "-v", "--help": "-h",
+}
+
+# Values gfx4snes uses when the option is missing; they do not change the key.
+DEFAULT_VALUES: Dict[str, str] = {"-s": "8", "-M": "1", "-f": "0", "-e": "0", "-t": "png"}
+
+DEFAULT_MAX_MB: int = 256
+
+
+def parse_gfx4snes_args(args: List[str]) -> Tuple[List[Tuple[str, str]], "str|None"]:
+    """
+    Parse a gfx4snes command line into normalised (option, value) pairs.
+
+    Long options become short ones, bundled flags ("-pm") and attached values
+    ("-s16", "--til-size=16") are split, options with their default value and
+    -q are dropped, and the pairs are sorted, so equivalent command lines give
+    the same pairs.
+
+    Args:
+        args: The gfx4snes arguments
+
+    Returns:
+        Tuple[List[Tuple[str, str]], str|None]: The pairs without -i, and the input image
+
+    Raises:
+        ValueError: On an option gfx4snes does not know or a missing value
+    """
+
+    short_values: List[str] = list(VALUE_OPTIONS.values())
+    short_flags: List[str] = list(FLAG_OPTIONS.values())
+
+    pairs: Dict[str, str] = {}
+    image: "str|None" = None
+    index: int = 0
+
+    while index < len(args):
+        arg: str = args[index]
+        index += 1
+
+        option: str
+        value: "str|None" = None
+
+        if arg.startswith("--"):
+            name, _, attached = arg.partition("=")
+
+            if name in FLAG_OPTIONS:
+                pairs[FLAG_OPTIONS[name]] = ""
+                continue
+
+            if name not in VALUE_OPTIONS:
+                raise ValueError(f"Unknown gfx4snes option {arg}")
+
+            option, value = VALUE_OPTIONS[name], (attached or None)
+
+        elif arg.startswith("-") and len(arg) > 1:
+            position: int = 1
+
+            while position < len(arg) and f"-{arg[position]}" in short_flags:
+                pairs[f"-{arg[position]}"] = ""
+                position += 1
+
+            if position == len(arg):
+                continue
+
+            option = f"-{arg[position]}"
+
+            if option not in short_values:
+                raise ValueError(f"Unknown gfx4snes option {arg}")
+
+            value = arg[position + 1:].strip() or None
+
+        else:
+            raise ValueError(f"Unexpected gfx4snes argument {arg}")
+
+        if value is None:
+            if index >= len(args):
+                raise ValueError(f"gfx4snes option {option} requires a value")
+
+            value = args[index].strip()
+            index += 1
+
+        if option == "-i":
+            image = value
+
+        else:
+            pairs[option] = value
+
+    normalised: List[Tuple[str, str]] = sorted(
+        (option, value) for option, value in pairs.items()
+        if option != "-q" and DEFAULT_VALUES.get(option) != value
+    )
+
+    return normalised, image
+
+
+def snapshot_outputs(image: Path) -> Dict[Path, Tuple[int, int]]:
+    """Record the size and mtime of the existing outputs of an image."""
+
+    snapshot: Dict[Path, Tuple[int, int]] = {}
+
+    for suffix in OUTPUT_SUFFIXES:
+        output: Path = image.with_suffix(suffix)
+
+        if output.exists():
+            stat = output.stat()
+            snapshot[output] = (stat.st_size, stat.st_mtime_ns)
+
+    return snapshot
+
+
+def written_outputs(image: Path, before: Dict[Path, Tuple[int, int]]) -> List[Path]:
+    """
+    Find the outputs of an image written since a snapshot.
+
+    Args:
+        image: The converted image
+        before: snapshot_outputs() taken before the conversion
+
+    Returns:
+        List[Path]: The new or rewritten outputs
+    """
+
+    after: Dict[Path, Tuple[int, int]] = snapshot_outputs(image)
+
+    return sorted(path for path, stat in after.items() if before.get(path) != stat)
+
+
+class GfxCache:
+    """
+    Content-addressed cache of gfx4snes outputs with size-bounded LRU eviction.
+
+    The key of a conversion is the hash of the image, the normalised options
+    and the gfx4snes binary, so the same picture converted the same way in any
+    project or directory is only reduced once. Every hit refreshes the entry's
+    mtime, which is the LRU order used by evict().
+    """
+
+    MANIFEST: str = "manifest.json"
+
+    def __init__(self, cache_dir: "Path|None" = None, max_bytes: "int|None" = None) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Where entries are stored, defaults to <cache home>/gfx
+            max_bytes: Size limit of the cache, defaults to SNES_IDE_GFX_CACHE_MB
+                (256 MB)
+        """
+
+        self.cache_dir: Path = cache_dir or get_cache_home() / "gfx"
+
+        if max_bytes is None:
+            try:
+                max_bytes = int(os.environ.get("SNES_IDE_GFX_CACHE_MB", DEFAULT_MAX_MB)) * 1024 * 1024
+
+            except ValueError:
+                max_bytes = DEFAULT_MAX_MB * 1024 * 1024
+
+        self.max_bytes: int = max_bytes
+
+    def key(self, gfx4snes: Path, image: Path, args: List[str]) -> str:
+        """
+        Compute the key of a conversion.
+
+        Args:
+            gfx4snes: The gfx4snes executable
+            image: The input image
+            args: The gfx4snes arguments (-i is ignored)
+
+        Returns:
+            str: Hex digest identifying the conversion
+
+        Raises:
+            ValueError: If the arguments cannot be normalised
+        """
+
+        pairs, _ = parse_gfx4snes_args(args)
+
+        tool: str = gfx4snes.name
+
+        if gfx4snes.exists():
+            stat = gfx4snes.stat()
+            tool += f":{stat.st_size}:{int(stat.st_mtime)}"
+
+        return hash_values("gfx4snes", tool, json.dumps(pairs), hash_file(image))
+
+    def entry_dir(self, key: str) -> Path:
+        """Directory of the cache entry for a key."""
+
+        return self.cache_dir / key[:2] / key
+
+    def restore(self, key: str, image: Path) -> "List[Path]|None":
+        """
+        Copy the cached outputs of a conversion next to the image.
+
+        Args:
+            key: The key of the conversion
+            image: The input image
+
+        Returns:
+            List[Path]|None: The restored outputs, None on a cache miss
+        """
+
+        entry: Path = self.entry_dir(key)
+
+        try:
+            with open(entry / self.MANIFEST, "r") as manifest_file:
+                suffixes: List[str] = json.load(manifest_file)["outputs"]
+
+            restored: List[Path] = []
+
+            for suffix in suffixes:
+                shutil.copyfile(entry / f"output{suffix}", image.with_suffix(suffix))
+                restored.append(image.with_suffix(suffix))
+
+            os.utime(entry / self.MANIFEST)
+
+        except (OSError, ValueError, KeyError):
+            return None
+
+        return restored
+
+    def store(self, key: str, outputs: List[Path]) -> bool:
+        """
+        Save the outputs of a successful conversion.
+
+        Args:
+            key: The key of the conversion
+            outputs: The files written by gfx4snes
+
+        Returns:
+            bool: True if a new entry was stored
+        """
+
+        entry: Path = self.entry_dir(key)
+
+        if not outputs or (entry / self.MANIFEST).exists():
+            return False
+
+        temp_entry: Path = entry.with_name(f"{key}.tmp{os.getpid()}")
+        temp_entry.mkdir(parents=True, exist_ok=True)
+
+        try:
+            for output in outputs:
+                shutil.copyfile(output, temp_entry / f"output{output.suffix}")
+
+            with open(temp_entry / self.MANIFEST, "w") as manifest_file:
+                json.dump({"outputs": [output.suffix for output in outputs]}, manifest_file)
+
+            os.replace(temp_entry, entry)
+
+        except OSError:
+            shutil.rmtree(temp_entry, ignore_errors=True)
+            return False
+
+        return True
+
+    def evict(self) -> int:
+        """
+        Remove the least recently used entries until the cache fits max_bytes.
+
+        Returns:
+            int: Number of removed entries
+        """
+
+        entries: List[Tuple[float, int, Path]] = []
+        total: int = 0
+
+        for manifest in self.cache_dir.glob(f"*/*/{self.MANIFEST}"):
+            try:
+                size: int = sum(f.stat().st_size for f in manifest.parent.iterdir())
+                entries.append((manifest.stat().st_mtime, size, manifest.parent))
+
+            except OSError:
+                continue
+
+            total += size
+
+        removed: int = 0
+
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            removed += 1
+
+        return removed
+
+
+def is_enabled() -> bool:
+    """Whether the gfx cache is enabled (SNES_IDE_GFX_CACHE=0 disables it)."""
+
+    return os.environ.get("SNES_IDE_GFX_CACHE", "1") != "0"
+
+
+def get_real_gfx4snes() -> Path:
+    """The gfx4snes the wrapper runs: the one of PVSNESLIB_HOME, else the bundled one."""
+
+    executable: str = "gfx4snes.exe" if os.name == "nt" else "gfx4snes"
+
+    if os.environ.get("PVSNESLIB_HOME"):
+        return Path(os.environ["PVSNESLIB_HOME"]) / "devkitsnes" / "tools" / executable
+
+    return Path(__file__).resolve().parent.parent / "bin" / "pvsneslib" / "devkitsnes" / "tools" / executable
+
+
+def gfxconv_override(project: Path) -> List[str]:
+    """
+    Get the make argument routing a project's gfx4snes calls through the cache.
+
+    snes_rules sets GFXCONV with :=, which a command line variable overrides.
+    Projects assigning GFXCONV themselves are left alone.
+
+    Args:
+        project: Directory containing the Makefile
+
+    Returns:
+        List[str]: ["GFXCONV=<wrapper command>"], or [] when not applicable
+    """
+
+    makefile: Path = project / "Makefile"
+
+    if not is_enabled() or not makefile.exists():
+        return []
+
+    if re.search(r"^\s*(?:export\s+)?GFXCONV\s*[:?+!]?=",
+                 makefile.read_text(errors="replace"), re.MULTILINE):
+        return []
+
+    command: List[str] = [sys.executable, str(Path(__file__).resolve())]
+
+    if os.name == "nt":
+        return ["GFXCONV=" + subprocess.list2cmdline(command)]
+
+    return ["GFXCONV=" + " ".join(shlex.quote(part) for part in command)]
+
+
+def main(argv: "List[str]|None" = None) -> int:
+    """
+    Run gfx4snes through the cache, taking the same arguments as gfx4snes.
+
+    Args:
+        argv: The gfx4snes arguments, defaults to sys.argv[1:]
+
+    Returns:
+        int: The exit code of gfx4snes, 0 on a cache hit
+    """
+
+    args: List[str] = sys.argv[1:] if argv is None else argv
+    gfx4snes: Path = get_real_gfx4snes()
+
+    try:
+        pairs, image_name = parse_gfx4snes_args(args)
+
+    except ValueError:
+        pairs, image_name = [], None
+
+    if not is_enabled() or image_name is None or ("-v", "") in pairs or ("-h", "") in pairs:
+        return subprocess.run([str(gfx4snes)] + args).returncode
+
+    image: Path = Path(image_name)
+    cache: GfxCache = GfxCache()
+
+    if not image.exists():
+        return subprocess.run([str(gfx4snes)] + args).returncode
+
+    key: str = cache.key(gfx4snes, image, args)
+    restored: "List[Path]|None" = cache.restore(key, image)
+
+    if restored is not None:
+        print(f"gfx cache: restored {', '.join(path.name for path in restored)}")
+        return 0
+
+    before: Dict[Path, Tuple[int, int]] = snapshot_outputs(image)
+    returncode: int = subprocess.run([str(gfx4snes)] + args).returncode
+
+    if returncode == 0:
+        cache.store(key, written_outputs(image, before))
+
+    return returncode
+
+
+if __name__ == "__main__":
+    sys.exit(main())
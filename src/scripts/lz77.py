@@ -0,0 +1,447 @@
+"""
+SNES-IDE - lz77.py
+Copyright (C) 2025 BrunoRNS
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from typing import List, Tuple
+from pathlib import Path
+import argparse
+import time
+import sys
+
+import numpy as np
+
+
+# Stream format of gfx4snes -z, read by PVSnesLib's LzssDecodeVram: a 0x10
+# byte and the 24 bits little endian decompressed size, then groups of 8
+# items led by a flag byte, most significant bit first. A clear bit is a
+# literal byte, a set bit a 2 bytes match: length - 3 in the high nibble,
+# distance - 1 in the low 12 bits.
+LZ77_TYPE: int = 0x10
+MIN_LENGTH: int = 3
+MAX_LENGTH: int = 18
+WINDOW: int = 4096
+
+# Matches at distance 1 read back the byte being written, which a decoder
+# writing VRAM a word at a time cannot do; gfx4snes never emits them.
+MIN_DISTANCE: int = 2
+
+# Cost of the items in bits, flag bit included.
+LITERAL_BITS: int = 9
+MATCH_BITS: int = 17
+
+# Estimated 65816 cycles of a byte-wise decoder: fetching a flag byte,
+# copying a literal, decoding a match and copying each of its bytes.
+CYCLES_PER_FLAG: int = 30
+CYCLES_PER_LITERAL: int = 35
+CYCLES_PER_MATCH: int = 60
+CYCLES_PER_COPIED_BYTE: int = 25
+
+# Master clock cycles of a CPU cycle from ROM/WRAM, of a DMA byte, and of
+# the NTSC vertical blank (lines 225 to 261, 1364 master cycles each).
+MASTER_CYCLES_PER_CPU_CYCLE: int = 8
+MASTER_CYCLES_PER_DMA_BYTE: int = 8
+VBLANK_MASTER_CYCLES: int = 1364 * 37
+
+
+def longest_matches(data: bytes, min_distance: int = MIN_DISTANCE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find the longest match available at every position.
+
+    Every distance of the window is compared with the whole input at once:
+    the run of equal bytes starting at each position is its match length
+    at that distance. Any shorter length is available at the same distance.
+
+    Args:
+        data: The input
+        min_distance: Smallest distance allowed
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Length (0 if none reaches MIN_LENGTH)
+            and distance of the longest match, closest distance on ties
+    """
+
+    source: np.ndarray = np.frombuffer(data, dtype=np.uint8)
+    size: int = len(source)
+
+    lengths: np.ndarray = np.zeros(size, dtype=np.int32)
+    distances: np.ndarray = np.zeros(size, dtype=np.int32)
+    indices: np.ndarray = np.arange(size, dtype=np.int32)
+
+    for distance in range(min_distance, min(WINDOW, size - 1) + 1):
+        # equal[k]: byte k + distance repeats the byte distance before it.
+        equal: np.ndarray = source[distance:] == source[:-distance]
+        count: int = len(equal)
+
+        if not (equal[:-2] & equal[1:-1] & equal[2:]).any():
+            continue
+
+        # Run of equal bytes from k: up to the next difference or the end.
+        next_difference: np.ndarray = np.where(equal, np.int32(count), indices[:count])
+        next_difference = np.minimum.accumulate(next_difference[::-1])[::-1]
+
+        runs: np.ndarray = np.minimum(next_difference - indices[:count], MAX_LENGTH)
+
+        better: np.ndarray = runs > lengths[distance:]
+        lengths[distance:][better] = runs[better]
+        distances[distance:][better] = distance
+
+    lengths[lengths < MIN_LENGTH] = 0
+
+    return lengths, distances
+
+
+def parse(data: bytes, optimal: bool = True, min_distance: int = MIN_DISTANCE) -> List[Tuple[int, int]]:
+    """
+    Split the input into literals and matches.
+
+    The optimal parse minimises the encoded size by dynamic programming from
+    the end of the input; the greedy one always takes the longest match.
+
+    Args:
+        data: The input
+        optimal: Use the optimal parse instead of the greedy one
+        min_distance: Smallest distance allowed
+
+    Returns:
+        List[Tuple[int, int]]: (length, distance) items, distance 0 for a literal
+    """
+
+    lengths, distances = longest_matches(data, min_distance)
+    size: int = len(data)
+
+    items: List[Tuple[int, int]] = []
+
+    if not optimal:
+        position: int = 0
+
+        while position < size:
+            length: int = int(lengths[position])
+            items.append((length, int(distances[position])) if length else (1, 0))
+            position += max(1, length)
+
+        return items
+
+    longest: List[int] = lengths.tolist()
+    cost: List[int] = [0] * (size + 1)
+    step: List[int] = [1] * (size + 1)
+
+    for position in range(size - 1, -1, -1):
+        best: int = cost[position + 1] + LITERAL_BITS
+        best_length: int = 1
+
+        for length in range(MIN_LENGTH, longest[position] + 1):
+            if cost[position + length] + MATCH_BITS < best:
+                best = cost[position + length] + MATCH_BITS
+                best_length = length
+
+        cost[position] = best
+        step[position] = best_length
+
+    position = 0
+
+    while position < size:
+        length = step[position]
+        items.append((length, int(distances[position]) if length > 1 else 0))
+        position += length
+
+    return items
+
+
+def encode(data: bytes, items: List[Tuple[int, int]]) -> bytes:
+    """
+    Write parsed items as an LZ77 stream.
+
+    Args:
+        data: The input
+        items: Its parse
+
+    Returns:
+        bytes: The stream, padded to a multiple of 4 bytes
+    """
+
+    output: bytearray = bytearray([LZ77_TYPE, len(data) & 0xFF, (len(data) >> 8) & 0xFF, (len(data) >> 16) & 0xFF])
+    position: int = 0
+
+    for group in range(0, len(items), 8):
+        flag_index: int = len(output)
+        output.append(0)
+
+        for bit, (length, distance) in enumerate(items[group:group + 8]):
+            if distance:
+                output[flag_index] |= 0x80 >> bit
+                output += bytes([((length - MIN_LENGTH) << 4) | ((distance - 1) >> 8), (distance - 1) & 0xFF])
+
+            else:
+                output.append(data[position])
+
+            position += length
+
+    output += bytes(-len(output) % 4)
+
+    return bytes(output)
+
+
+def compress(data: bytes, optimal: bool = True) -> bytes:
+    """
+    Compress data in the LZ77 format of gfx4snes -z.
+
+    Args:
+        data: The input, at most 16 MB
+        optimal: Use the optimal parse instead of the greedy one
+
+    Returns:
+        bytes: The compressed stream
+    """
+
+    return encode(data, parse(data, optimal))
+
+
+def decompress(stream: bytes) -> bytes:
+    """
+    Decompress an LZ77 stream.
+
+    Args:
+        stream: The compressed stream
+
+    Returns:
+        bytes: The decompressed data
+
+    Raises:
+        ValueError: If the stream is not valid LZ77
+    """
+
+    if len(stream) < 4 or stream[0] != LZ77_TYPE:
+        raise ValueError("Not an LZ77 stream")
+
+    size: int = stream[1] | (stream[2] << 8) | (stream[3] << 16)
+    output: bytearray = bytearray()
+    position: int = 4
+
+    try:
+        while len(output) < size:
+            flags: int = stream[position]
+            position += 1
+
+            for bit in range(8):
+                if len(output) >= size:
+                    break
+
+                if not flags & (0x80 >> bit):
+                    output.append(stream[position])
+                    position += 1
+                    continue
+
+                length: int = (stream[position] >> 4) + MIN_LENGTH
+                distance: int = (((stream[position] & 0x0F) << 8) | stream[position + 1]) + 1
+                position += 2
+
+                if distance > len(output):
+                    raise ValueError(f"Match distance {distance} before the start of the data")
+
+                for _ in range(length):
+                    output.append(output[-distance])
+
+    except IndexError:
+        raise ValueError("Truncated LZ77 stream")
+
+    return bytes(output[:size])
+
+
+def decode_cycles(items: List[Tuple[int, int]]) -> int:
+    """
+    Estimate the 65816 cycles needed to decompress parsed items.
+
+    Args:
+        items: The parse of the data
+
+    Returns:
+        int: Estimated CPU cycles
+    """
+
+    matches: List[int] = [length for length, distance in items if distance]
+
+    return (
+        -(-len(items) // 8) * CYCLES_PER_FLAG
+        + (len(items) - len(matches)) * CYCLES_PER_LITERAL
+        + len(matches) * CYCLES_PER_MATCH
+        + sum(matches) * CYCLES_PER_COPIED_BYTE
+    )
+
+
+class Benchmark:
+    """Compression of one file and the time it costs on the SNES."""
+
+    def __init__(self, path: Path, size: int, greedy_size: int, optimal_size: int,
+                 cycles: int, seconds: float) -> None:
+        """
+        Initialize a benchmark result.
+
+        Args:
+            path: The file
+            size: Its size
+            greedy_size: Size compressed with the greedy parse
+            optimal_size: Size compressed with the optimal parse
+            cycles: Estimated decompression cycles of the optimal stream
+            seconds: Time spent compressing it on this machine
+        """
+
+        self.path: Path = path
+        self.size: int = size
+        self.greedy_size: int = greedy_size
+        self.optimal_size: int = optimal_size
+        self.cycles: int = cycles
+        self.seconds: float = seconds
+
+    @property
+    def ratio(self) -> float:
+        """Optimal compressed size over the original size."""
+
+        return self.optimal_size / self.size if self.size else 1.0
+
+    @property
+    def decode_vblanks(self) -> float:
+        """Estimated decompression time, in NTSC vertical blanks."""
+
+        return self.cycles * MASTER_CYCLES_PER_CPU_CYCLE / VBLANK_MASTER_CYCLES
+
+    @property
+    def dma_vblanks(self) -> float:
+        """Time to DMA the uncompressed data, in NTSC vertical blanks."""
+
+        return self.size * MASTER_CYCLES_PER_DMA_BYTE / VBLANK_MASTER_CYCLES
+
+    def summary(self) -> str:
+        """One line report of the benchmark."""
+
+        saved: int = self.size - self.optimal_size
+
+        return (
+            f"{self.size:>7} {self.greedy_size:>7} {self.optimal_size:>7} {self.ratio:>6.1%} "
+            f"{self.cycles:>9} {self.decode_vblanks:>7.2f} {self.dma_vblanks:>6.2f} "
+            f"{self.seconds * 1000:>8.1f}  "
+            + (f"{self.path} (saves {saved} B)" if saved > 0 else f"{self.path} (not worth it)")
+        )
+
+
+BENCHMARK_HEADER: str = (
+    f"{'size':>7} {'greedy':>7} {'optimal':>7} {'ratio':>6} {'cycles':>9} "
+    f"{'decode':>7} {'dma':>6} {'ms':>8}  file (decode/dma in VBlanks)"
+)
+
+
+def benchmark(path: Path) -> Benchmark:
+    """
+    Compress a file both ways and estimate its decompression time.
+
+    Args:
+        path: The file
+
+    Returns:
+        Benchmark: The result
+    """
+
+    data: bytes = path.read_bytes()
+
+    started: float = time.perf_counter()
+    items: List[Tuple[int, int]] = parse(data, optimal=True)
+    optimal: bytes = encode(data, items)
+    seconds: float = time.perf_counter() - started
+
+    greedy: bytes = compress(data, optimal=False)
+
+    return Benchmark(path, len(data), len(greedy), len(optimal), decode_cycles(items), seconds)
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    """
+    Parse the arguments of the LZ77 tool.
+
+    Args:
+        argv: The command line arguments
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        prog="snes-ide lz77",
+        description="LZ77 codec compatible with gfx4snes -z and PVSnesLib's LzssDecodeVram."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    compress_parser: argparse.ArgumentParser = commands.add_parser("compress", help="compress a file")
+    compress_parser.add_argument("input", type=Path)
+    compress_parser.add_argument("-o", "--output", type=Path, help="defaults to the input with .lz added")
+    compress_parser.add_argument("--greedy", action="store_true", help="faster greedy parse, larger output")
+
+    decompress_parser: argparse.ArgumentParser = commands.add_parser("decompress", help="decompress a file")
+    decompress_parser.add_argument("input", type=Path)
+    decompress_parser.add_argument("-o", "--output", type=Path, help="defaults to the input without .lz")
+
+    bench_parser: argparse.ArgumentParser = commands.add_parser(
+        "bench", help="report ratio and estimated decompression time of files"
+    )
+    bench_parser.add_argument("paths", type=Path, nargs="+", help="files, or directories of .pic files")
+
+    return parser.parse_args(argv)
+
+
+def main(argv: "List[str]|None" = None) -> int:
+    """
+    Compress, decompress or benchmark files from the command line.
+
+    Args:
+        argv: The command line arguments, defaults to sys.argv[1:]
+
+    Returns:
+        int: 0 on success, -1 on failure
+    """
+
+    args: argparse.Namespace = parse_args(sys.argv[1:] if argv is None else argv)
+
+    try:
+        if args.command == "compress":
+            output: Path = args.output or args.input.with_name(args.input.name + ".lz")
+            output.write_bytes(compress(args.input.read_bytes(), not args.greedy))
+            print(f"{args.input} -> {output} ({output.stat().st_size} of {args.input.stat().st_size} B)")
+
+        elif args.command == "decompress":
+            output = args.output or (args.input.with_suffix("") if args.input.suffix == ".lz"
+                                     else args.input.with_name(args.input.name + ".out"))
+            output.write_bytes(decompress(args.input.read_bytes()))
+            print(f"{args.input} -> {output}")
+
+        else:
+            files: List[Path] = []
+
+            for path in args.paths:
+                files += sorted(path.rglob("*.pic")) if path.is_dir() else [path]
+
+            print(BENCHMARK_HEADER)
+
+            for path in files:
+                print(benchmark(path).summary(), flush=True)
+
+    except (ValueError, OSError) as e:
+        print(f"LZ77 {args.command} failed: {e}")
+        return -1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
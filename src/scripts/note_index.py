@@ -0,0 +1,113 @@
+"""
+SNES-IDE - note_index.py
+Copyright (C) 2025 BrunoRNS
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from typing import Any, Dict, Hashable, Iterable, List, Sequence, Set
+import bisect
+
+
+class NoteIndex:
+    """
+    Indexes of a note catalogue, answering filter queries without scanning it.
+
+    Notes are any objects with wave_type, octave, base_note, is_sharp and
+    frequency attributes; they are referred to by their position.
+    """
+
+    def __init__(self, notes: Sequence[Any]) -> None:
+        """
+        Build the indexes.
+
+        Args:
+            notes: The notes
+        """
+
+        self.count: int = len(notes)
+
+        self.by_wave_type: Dict[Hashable, Set[int]] = self._group(notes, "wave_type")
+        self.by_octave: Dict[Hashable, Set[int]] = self._group(notes, "octave")
+        self.by_base_note: Dict[Hashable, Set[int]] = self._group(notes, "base_note")
+        self.by_sharp: Dict[Hashable, Set[int]] = self._group(notes, "is_sharp")
+
+        self.by_frequency: List[int] = sorted(range(self.count), key=lambda index: notes[index].frequency)
+        self.frequencies: List[float] = [notes[index].frequency for index in self.by_frequency]
+
+    @staticmethod
+    def _group(notes: Sequence[Any], attribute: str) -> Dict[Hashable, Set[int]]:
+        """Map every value of an attribute to the notes having it."""
+
+        groups: Dict[Hashable, Set[int]] = {}
+
+        for index, note in enumerate(notes):
+            groups.setdefault(getattr(note, attribute), set()).add(index)
+
+        return groups
+
+    @staticmethod
+    def _union(groups: Dict[Hashable, Set[int]], keys: Iterable[Hashable]) -> Set[int]:
+        """The notes of several values of an attribute."""
+
+        found: Set[int] = set()
+
+        for key in keys:
+            found |= groups.get(key, set())
+
+        return found
+
+    def query(self, wave_types: Iterable[str], octave_from: int, octave_to: int,
+              base_note: "str|None" = None, sharp: "bool|None" = None,
+              frequency_min: "float|None" = None, frequency_max: "float|None" = None) -> List[int]:
+        """
+        Find the notes matching every filter.
+
+        Args:
+            wave_types: Wave types to keep
+            octave_from: Lowest octave to keep
+            octave_to: Highest octave to keep
+            base_note: Base note (without sharp) to keep, None for all
+            sharp: Keep only sharps (True) or naturals (False), None for both
+            frequency_min: Lowest frequency to keep, None for no limit
+            frequency_max: Highest frequency to keep, None for no limit
+
+        Returns:
+            List[int]: Positions of the matching notes, in catalogue order
+        """
+
+        candidates: List[Set[int]] = [
+            self._union(self.by_wave_type, wave_types),
+            self._union(self.by_octave, (
+                octave for octave in self.by_octave if octave_from <= octave <= octave_to  # type: ignore
+            )),
+        ]
+
+        if base_note is not None:
+            candidates.append(self.by_base_note.get(base_note, set()))
+
+        if sharp is not None:
+            candidates.append(self.by_sharp.get(sharp, set()))
+
+        if frequency_min is not None or frequency_max is not None:
+            start: int = 0 if frequency_min is None else bisect.bisect_left(self.frequencies, frequency_min)
+            end: int = self.count if frequency_max is None else bisect.bisect_right(self.frequencies, frequency_max)
+
+            candidates.append(set(self.by_frequency[start:end]))
+
+        candidates.sort(key=len)
+
+        matches: Set[int] = candidates[0].intersection(*candidates[1:])
+
+        return sorted(matches)
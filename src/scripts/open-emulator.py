@@ -18,56 +18,29 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from subprocess import run, CalledProcessError
 from typing_extensions import NoReturn
+from typing import List
 from pathlib import Path
-import platform
 
 from get_file_path import get_file_path
-
-
-def get_executable_path() -> Path:
-    """Returns the path of the executable"""
-
-    return Path(__file__).resolve().parent
-
-
-def get_home_path() -> str:
-    """Get snes-ide home directory"""
-
-    return str(Path(get_executable_path()).parent)
+from emulator import emulator_command, get_emulator_path
 
 
 def main() -> NoReturn:
     """Main logic to open a snes emulator in snes-ide"""
 
-    home_path: Path = Path(get_home_path())
-
-    snes_emulator: Path = home_path / "bin" / "snes-emulator"
-
-    if platform.system().lower() == "windows":
-        snes_emulator = snes_emulator / "lakesnes.exe"
-
-    elif platform.system().lower() == "darwin":
-        snes_emulator = snes_emulator / "bsnes.app"
-
-    else:
-        snes_emulator = snes_emulator / "lakesnes"
-
     rom_path: Path = Path(str(get_file_path(
         "Select your ROM", [("ROM files", "*.sfc")], multiple=False,
         directory=False
     )))
 
-    try:
-
-        if platform.system().lower() == "darwin":
-            run(["open", "-a", str(snes_emulator), str(rom_path)], check=True)
+    command: List[str] = emulator_command(rom_path)
 
-        else:
-            run([str(snes_emulator), str(rom_path)], check=True)
+    try:
+        run(command, check=True)
 
     except CalledProcessError as e:
 
-        print(f"Error while executing {snes_emulator}: {e}")
+        print(f"Error while executing {get_emulator_path()}: {e}")
         exit(-1)
 
     exit(0)
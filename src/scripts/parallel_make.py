@@ -0,0 +1,153 @@
+"""
+SNES-IDE - parallel_make.py
+Copyright (C) 2025 BrunoRNS
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from typing import List, Tuple
+from pathlib import Path
+import os
+import re
+
+
+SERIAL_MARKER: str = "snes-ide: no-parallel"
+
+
+def get_make_jobs() -> int:
+    """
+    Get the number of parallel make jobs.
+
+    SNES_IDE_MAKE_JOBS overrides the default, which is the CPU count.
+
+    Returns:
+        int: Number of jobs, at least 1
+    """
+
+    try:
+        jobs: int = int(os.environ.get("SNES_IDE_MAKE_JOBS", "0"))
+
+    except ValueError:
+        jobs = 0
+
+    return max(1, jobs or os.cpu_count() or 1)
+
+
+def jobserver_fds() -> Tuple[int, ...]:
+    """
+    Get the jobserver pipe of a parent make, when the build runs under make -j.
+
+    The child make has to inherit these descriptors to join the jobserver;
+    the named fifo and Windows semaphore styles only need MAKEFLAGS.
+
+    A make recipe that is not recursive closes the pipe but leaves MAKEFLAGS
+    set, so descriptors that are not open are not passed.
+
+    Returns:
+        Tuple[int, ...]: File descriptors to pass to the child make
+    """
+
+    if os.name == "nt":
+        return ()
+
+    found = re.search(r"--jobserver-(?:auth|fds)=(\d+),(\d+)", os.environ.get("MAKEFLAGS", ""))
+
+    if not found:
+        return ()
+
+    fds: Tuple[int, ...] = (int(found.group(1)), int(found.group(2)))
+
+    try:
+        for fd in fds:
+            os.fstat(fd)
+
+    except OSError:
+        return ()
+
+    return fds
+
+
+def inherits_jobserver() -> bool:
+    """Whether MAKEFLAGS carries the jobserver of a parent make, still reachable."""
+
+    makeflags: str = os.environ.get("MAKEFLAGS", "")
+
+    if "--jobserver" not in makeflags:
+        return False
+
+    # A pipe jobserver is only usable while its descriptors are open.
+    return os.name == "nt" or not re.search(r"--jobserver-(?:auth|fds)=\d+,\d+", makeflags) \
+        or bool(jobserver_fds())
+
+
+def is_parallel_safe(makefile: Path) -> bool:
+    """
+    Detect Makefiles that must not be built with -j.
+
+    A Makefile is treated as serial-only when it declares .NOTPARALLEL for
+    every target, carries the "snes-ide: no-parallel" marker, or cleans as a
+    prerequisite of its default goal.
+
+    Args:
+        makefile: Path to the Makefile
+
+    Returns:
+        bool: True if the Makefile can be built in parallel
+    """
+
+    if not makefile.exists():
+        return True
+
+    text: str = makefile.read_text(errors="replace")
+
+    if SERIAL_MARKER in text:
+        return False
+
+    if re.search(r"^\.NOTPARALLEL\s*:\s*$", text, re.MULTILINE):
+        return False
+
+    if re.search(r"^all\s*:[^=\n]*\bclean\w*\b", text, re.MULTILINE):
+        return False
+
+    return True
+
+
+def make_command(make: Path, project: Path, jobs: "int|None" = None) -> List[str]:
+    """
+    Build the make command line for a project.
+
+    Prerequisites of "all" keep their order (PVSnesLib Makefiles convert the
+    bitmaps before linking the ROM that includes them), while everything below
+    them runs with -j. Under a parent make the jobserver is inherited instead.
+
+    Args:
+        make: Path to the make executable
+        project: Directory containing the Makefile
+        jobs: Number of jobs, defaults to get_make_jobs()
+
+    Returns:
+        List[str]: The command line
+    """
+
+    command: List[str] = [str(make)]
+
+    if inherits_jobserver():
+        return command
+
+    jobs = jobs if jobs is not None else get_make_jobs()
+
+    if jobs <= 1 or not is_parallel_safe(project / "Makefile"):
+        return command
+
+    return command + [f"-j{jobs}", "--output-sync=target", "--eval=.NOTPARALLEL: all"]
@@ -0,0 +1,283 @@
+"""
+SNES-IDE - project_watcher.py
+Copyright (C) 2025 BrunoRNS
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from typing import Dict, Set, Tuple
+from pathlib import Path
+import ctypes.util
+import platform
+import ctypes
+import select
+import struct
+import time
+import os
+
+
+def is_hidden(root: Path, path: Path) -> bool:
+    """Whether a path is inside a hidden file or directory of root."""
+
+    try:
+        relative: Path = path.relative_to(root)
+
+    except ValueError:
+        return True
+
+    return any(part.startswith(".") for part in relative.parts)
+
+
+class PollingWatcher:
+    """
+    Detect file changes under a directory by comparing size and mtime snapshots.
+
+    Used where inotify is not available (Windows, macOS).
+    """
+
+    POLL_INTERVAL: float = 0.25
+
+    def __init__(self, root: Path) -> None:
+        """
+        Initialize the watcher and take the first snapshot.
+
+        Args:
+            root: Directory to watch, recursively
+        """
+
+        self.root: Path = root.resolve()
+        self.snapshot: Dict[Path, Tuple[int, int]] = self.take_snapshot()
+
+    def take_snapshot(self) -> Dict[Path, Tuple[int, int]]:
+        """Get the size and mtime of every visible file under root."""
+
+        snapshot: Dict[Path, Tuple[int, int]] = {}
+
+        for directory, dirs, files in os.walk(self.root):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+
+            for name in files:
+                if name.startswith("."):
+                    continue
+
+                path: Path = Path(directory) / name
+
+                try:
+                    stat = path.stat()
+
+                except OSError:
+                    continue
+
+                snapshot[path] = (stat.st_size, stat.st_mtime_ns)
+
+        return snapshot
+
+    def changes(self, timeout: "float|None") -> Set[Path]:
+        """
+        Wait for files to be created, modified or deleted.
+
+        Args:
+            timeout: Seconds to wait, None to wait until something changes
+
+        Returns:
+            Set[Path]: Changed paths, empty if the timeout expired
+        """
+
+        deadline: "float|None" = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            snapshot: Dict[Path, Tuple[int, int]] = self.take_snapshot()
+
+            changed: Set[Path] = {
+                path for path in snapshot.keys() | self.snapshot.keys()
+                if snapshot.get(path) != self.snapshot.get(path)
+            }
+
+            self.snapshot = snapshot
+
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+            time.sleep(self.POLL_INTERVAL if deadline is None else
+                       max(0.0, min(self.POLL_INTERVAL, deadline - time.monotonic())))
+
+    def close(self) -> None:
+        """Release the watcher."""
+
+
+class InotifyWatcher:
+    """
+    Detect file changes under a directory with Linux inotify, through libc.
+
+    Every visible directory gets a watch, and directories created later are
+    added as their events arrive.
+    """
+
+    IN_CLOSE_WRITE: int = 0x00000008
+    IN_MOVED_FROM: int = 0x00000040
+    IN_MOVED_TO: int = 0x00000080
+    IN_CREATE: int = 0x00000100
+    IN_DELETE: int = 0x00000200
+    IN_Q_OVERFLOW: int = 0x00004000
+    IN_ISDIR: int = 0x40000000
+    IN_CLOEXEC: int = 0o2000000
+
+    WATCH_MASK: int = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    EVENT_HEADER: struct.Struct = struct.Struct("iIII")
+
+    def __init__(self, root: Path) -> None:
+        """
+        Initialize inotify and watch every visible directory under root.
+
+        Args:
+            root: Directory to watch, recursively
+
+        Raises:
+            OSError: If inotify is not available
+        """
+
+        self.root: Path = root.resolve()
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+
+        self.fd: int = self.libc.inotify_init1(self.IN_CLOEXEC)
+
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.watches: Dict[int, Path] = {}
+        self.add_tree(self.root)
+
+    def add_watch(self, directory: Path) -> None:
+        """Watch a single directory."""
+
+        wd: int = self.libc.inotify_add_watch(
+            self.fd, os.fsencode(str(directory)), self.WATCH_MASK
+        )
+
+        if wd >= 0:
+            self.watches[wd] = directory
+
+    def add_tree(self, directory: Path) -> None:
+        """Watch a directory and its visible subdirectories."""
+
+        for current, dirs, _ in os.walk(directory):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            self.add_watch(Path(current))
+
+    def changes(self, timeout: "float|None") -> Set[Path]:
+        """
+        Wait for files to be created, written, moved or deleted.
+
+        Args:
+            timeout: Seconds to wait, None to wait until something changes
+
+        Returns:
+            Set[Path]: Changed paths, empty if the timeout expired
+        """
+
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+
+        if not readable:
+            return set()
+
+        data: bytes = os.read(self.fd, 64 * 1024)
+        changed: Set[Path] = set()
+        offset: int = 0
+
+        while offset + self.EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+
+            name: str = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & self.IN_Q_OVERFLOW:
+                changed.add(self.root)
+                continue
+
+            if wd not in self.watches or not name:
+                continue
+
+            path: Path = self.watches[wd] / name
+
+            if is_hidden(self.root, path):
+                continue
+
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    self.add_tree(path)
+                    changed.update(p for p in path.rglob("*") if p.is_file())
+
+                continue
+
+            if mask & self.IN_CREATE:
+                # The content arrives with the IN_CLOSE_WRITE that follows.
+                continue
+
+            changed.add(path)
+
+        return changed
+
+    def close(self) -> None:
+        """Release the inotify descriptor."""
+
+        os.close(self.fd)
+
+
+def create_watcher(root: Path) -> "InotifyWatcher|PollingWatcher":
+    """
+    Create the best watcher available on this platform.
+
+    Args:
+        root: Directory to watch, recursively
+
+    Returns:
+        InotifyWatcher|PollingWatcher: The watcher
+    """
+
+    if platform.system().lower() == "linux":
+        try:
+            return InotifyWatcher(root)
+
+        except (OSError, AttributeError, TypeError) as e:
+            print(f"inotify unavailable, polling for changes instead: {e}")
+
+    return PollingWatcher(root)
+
+
+def wait_for_changes(watcher: "InotifyWatcher|PollingWatcher", debounce: float) -> Set[Path]:
+    """
+    Block until files change, then until no change happened for debounce seconds.
+
+    Editors often save through several writes and renames; they are all
+    reported as one batch.
+
+    Args:
+        watcher: The watcher to read
+        debounce: Quiet period, in seconds, that ends a batch
+
+    Returns:
+        Set[Path]: Every path changed during the batch
+    """
+
+    changed: Set[Path] = watcher.changes(None)
+
+    while True:
+        more: Set[Path] = watcher.changes(debounce)
+
+        if not more:
+            return changed
+
+        changed |= more
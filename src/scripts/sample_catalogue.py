@@ -0,0 +1,660 @@
+"""
+SNES-IDE - sample_catalogue.py
+Copyright (C) 2025 BrunoRNS
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+from pathlib import Path
+import argparse
+import struct
+import json
+import math
+import time
+import sys
+import os
+import re
+
+import numpy as np
+
+from build_cache import get_cache_home, hash_values
+from sample_synth import NOTE_NAMES
+
+
+# Bumped when entries change, so old indexes are rebuilt.
+INDEX_VERSION: int = 1
+
+SAMPLE_SUFFIXES: Tuple[str, ...] = (".wav", ".mid", ".midi")
+
+# Wave types recognised in file names, e.g. "A#1_senoid.wav".
+WAVE_TYPE_NAMES: Dict[str, str] = {
+    "sine": "sine", "sin": "sine", "senoid": "sine",
+    "square": "square", "sqr": "square", "pulse": "square",
+    "triangle": "triangle", "tri": "triangle",
+    "sawtooth": "sawtooth", "saw": "sawtooth",
+    "noise": "noise",
+}
+
+# Seconds of audio searched for a pitch, and the autocorrelation a pitch needs.
+PITCH_WINDOW: float = 1.0
+PITCH_CLARITY: float = 0.5
+
+
+def note_name(midi_note: int) -> str:
+    """Name of a MIDI note, such as "A4" for 69."""
+
+    return f"{NOTE_NAMES[midi_note % 12]}{midi_note // 12 - 1}"
+
+
+def midi_note_of(frequency: float) -> int:
+    """MIDI note closest to a frequency."""
+
+    return round(69 + 12 * math.log2(frequency / 440.0))
+
+
+def note_of_name(stem: str) -> "str|None":
+    """Find a note name such as "C#4" in a file name."""
+
+    match = re.search(r"(?<![A-Za-z])([A-G]#?)(-?\d)(?!\d)", stem)
+
+    return None if match is None else match.group(1) + match.group(2)
+
+
+def wave_type_of_name(stem: str) -> str:
+    """Find the wave type in a file name, "other" if there is none."""
+
+    for word in re.split(r"[^a-z]+", stem.lower()):
+        if word in WAVE_TYPE_NAMES:
+            return WAVE_TYPE_NAMES[word]
+
+    return "other"
+
+
+def detect_pitch(samples: np.ndarray, rate: int) -> "float|None":
+    """
+    Detect the fundamental frequency of a sample by autocorrelation.
+
+    Args:
+        samples: The samples, mono
+        rate: Sample rate in Hz
+
+    Returns:
+        float|None: The frequency in Hz, None for silence or unpitched sounds
+    """
+
+    signal: np.ndarray = samples[:max(2, int(rate * PITCH_WINDOW))].astype(np.float64)
+    signal -= signal.mean()
+
+    if len(signal) < 4 or not np.any(signal):
+        return None
+
+    size: int = 1 << (2 * len(signal) - 1).bit_length()
+    spectrum: np.ndarray = np.fft.rfft(signal, size)
+    correlation: np.ndarray = np.fft.irfft(spectrum * np.conj(spectrum), size)[:len(signal)]
+
+    # Normalised by the overlap, so long lags are not penalised.
+    correlation = correlation / correlation[0] * len(signal) / (len(signal) - np.arange(len(signal)))
+
+    # Skip the main lobe, up to the first negative value.
+    negative: np.ndarray = np.flatnonzero(correlation < 0)
+
+    if not len(negative):
+        return None
+
+    start: int = int(negative[0])
+    end: int = len(signal) * 3 // 4
+
+    if end <= start + 1:
+        return None
+
+    peak: int = start + int(np.argmax(correlation[start:end]))
+
+    if correlation[peak] < PITCH_CLARITY:
+        return None
+
+    # The first lag nearly as correlated as the peak, avoiding octave errors.
+    lag: int = start + int(np.flatnonzero(correlation[start:end] >= 0.8 * correlation[peak])[0])
+
+    while lag + 1 < end and correlation[lag + 1] > correlation[lag]:
+        lag += 1
+
+    # Parabolic interpolation of the peak.
+    shift: float = 0.0
+
+    if 0 < lag < len(correlation) - 1:
+        left, middle, right = correlation[lag - 1], correlation[lag], correlation[lag + 1]
+        denominator: float = left - 2 * middle + right
+
+        if denominator:
+            shift = 0.5 * (left - right) / denominator
+
+    return rate / (lag + shift)
+
+
+def read_midi(path: Path) -> Tuple[float, List[int], int]:
+    """
+    Read the notes and length of a standard MIDI file.
+
+    Args:
+        path: The MIDI file
+
+    Returns:
+        Tuple[float, List[int], int]: Duration in seconds, the notes played
+            in order and the number of channels used
+
+    Raises:
+        ValueError: If the file is not a MIDI file
+        OSError: If the file cannot be read
+    """
+
+    data: bytes = path.read_bytes()
+
+    if data[:4] != b"MThd" or len(data) < 14:
+        raise ValueError(f"{path.name} is not a MIDI file")
+
+    _, tracks, division = struct.unpack(">HHH", data[8:14])
+
+    position: int = 8 + int.from_bytes(data[4:8], "big")
+    tempos: List[Tuple[int, int]] = []
+    notes: List[int] = []
+    channels: set = set()
+    end: int = 0
+
+    def variable_length(track: bytes, index: int) -> Tuple[int, int]:
+        value: int = 0
+
+        while index < len(track):
+            value = (value << 7) | (track[index] & 0x7F)
+            index += 1
+
+            if not track[index - 1] & 0x80:
+                break
+
+        return value, index
+
+    for _ in range(tracks):
+        if data[position:position + 4] != b"MTrk":
+            break
+
+        size: int = int.from_bytes(data[position + 4:position + 8], "big")
+        track: bytes = data[position + 8:position + 8 + size]
+        position += 8 + size
+
+        index: int = 0
+        tick: int = 0
+        status: int = 0
+
+        while index < len(track):
+            delta, index = variable_length(track, index)
+            tick += delta
+
+            if index >= len(track):
+                break
+
+            if track[index] == 0xFF:
+                kind: int = track[index + 1] if index + 1 < len(track) else 0
+                length, index = variable_length(track, index + 2)
+
+                if kind == 0x51 and length == 3:
+                    tempos.append((tick, int.from_bytes(track[index:index + 3], "big")))
+
+                index += length
+                continue
+
+            if track[index] in (0xF0, 0xF7):
+                length, index = variable_length(track, index + 1)
+                index += length
+                continue
+
+            if track[index] & 0x80:
+                status = track[index]
+                index += 1
+
+            parameters: bytes = track[index:index + (1 if status & 0xF0 in (0xC0, 0xD0) else 2)]
+            index += len(parameters)
+
+            if status & 0xF0 == 0x90 and len(parameters) == 2 and parameters[1]:
+                notes.append(parameters[0])
+                channels.add(status & 0x0F)
+
+        end = max(end, tick)
+
+    if division & 0x8000:
+        frames: int = 256 - (division >> 8)
+        duration: float = end / (frames * (division & 0xFF) or 1)
+
+    else:
+        # Sum the ticks between tempo changes, at 120 BPM until the first one.
+        duration = 0.0
+        last_tick: int = 0
+        tempo: int = 500000
+
+        for change_tick, change_tempo in sorted(tempos):
+            if change_tick >= end:
+                break
+
+            duration += (change_tick - last_tick) * tempo / 1e6 / (division or 1)
+            last_tick, tempo = change_tick, change_tempo
+
+        duration += (end - last_tick) * tempo / 1e6 / (division or 1)
+
+    return duration, notes, len(channels)
+
+
+class SampleEntry:
+    """Metadata of a sample file of a library."""
+
+    def __init__(self, path: str, kind: str, size: int, mtime_ns: int, duration: float,
+                 rate: "int|None" = None, channels: int = 1, peak: "float|None" = None,
+                 rms: "float|None" = None, pitch: "float|None" = None, note: "str|None" = None,
+                 wave_type: str = "other") -> None:
+        """
+        Initialize a sample entry.
+
+        Args:
+            path: Path of the file in its library, with forward slashes
+            kind: "wav" or "midi"
+            size: Size of the file, to detect changes
+            mtime_ns: Modification time of the file, to detect changes
+            duration: Length in seconds
+            rate: Sample rate in Hz, for WAV files
+            channels: Audio channels, or MIDI channels used
+            peak: Peak level in dBFS, for WAV files
+            rms: RMS level in dBFS, for WAV files
+            pitch: Detected frequency in Hz, or that of the first MIDI note
+            note: Note named in the file name, or closest to the pitch
+            wave_type: Wave type named in the file name, "midi" for MIDI files
+        """
+
+        self.path: str = path
+        self.kind: str = kind
+        self.size: int = size
+        self.mtime_ns: int = mtime_ns
+        self.duration: float = duration
+        self.rate: "int|None" = rate
+        self.channels: int = channels
+        self.peak: "float|None" = peak
+        self.rms: "float|None" = rms
+        self.pitch: "float|None" = pitch
+        self.note: "str|None" = note
+        self.wave_type: str = wave_type
+
+    def to_json(self) -> Dict[str, Any]:
+        """The entry, for JSON."""
+
+        return dict(vars(self))
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "SampleEntry":
+        """Read an entry written by to_json."""
+
+        return cls(**data)
+
+    def describe(self) -> str:
+        """One line description of the metadata."""
+
+        parts: List[str] = [f"{self.duration:.2f} s"]
+
+        if self.rate is not None:
+            parts.append(f"{self.rate} Hz")
+
+        parts.append(f"{self.channels} ch")
+
+        if self.peak is not None and self.rms is not None:
+            parts.append(f"peak {self.peak:.1f} dBFS, RMS {self.rms:.1f} dBFS")
+
+        if self.pitch is not None:
+            parts.append(f"pitch {self.pitch:.1f} Hz")
+
+        return ", ".join(parts)
+
+
+def level(value: float) -> float:
+    """A 16-bit level in dBFS, -inf for silence."""
+
+    return 20 * math.log10(value / 32768) if value > 0 else -math.inf
+
+
+def analyze(path: Path, relative: str) -> SampleEntry:
+    """
+    Extract the metadata of a sample file.
+
+    Args:
+        path: The WAV or MIDI file
+        relative: Its path in the library
+
+    Returns:
+        SampleEntry: The metadata
+
+    Raises:
+        ValueError: If the file is not a valid WAV or MIDI file
+        OSError: If the file cannot be read
+    """
+
+    stat: os.stat_result = path.stat()
+    named: "str|None" = note_of_name(path.stem)
+
+    if path.suffix.lower() in (".mid", ".midi"):
+        duration, notes, channels = read_midi(path)
+
+        pitch: "float|None" = 440.0 * 2 ** ((notes[0] - 69) / 12) if notes else None
+
+        return SampleEntry(
+            relative, "midi", stat.st_size, stat.st_mtime_ns, duration, None, channels,
+            pitch=pitch, note=named or (note_name(notes[0]) if notes else None), wave_type="midi"
+        )
+
+    from brr_codec import WavSample, read_wav
+
+    sample: WavSample = read_wav(path)
+    samples: np.ndarray = sample.samples.astype(np.float64)
+
+    pitch = detect_pitch(sample.samples, sample.rate)
+
+    return SampleEntry(
+        relative, "wav", stat.st_size, stat.st_mtime_ns, len(samples) / sample.rate if sample.rate else 0.0,
+        sample.rate, sample.channels,
+        level(float(np.max(np.abs(samples)))) if len(samples) else -math.inf,
+        level(float(np.sqrt(np.mean(samples ** 2)))) if len(samples) else -math.inf,
+        pitch, named or (note_name(midi_note_of(pitch)) if pitch else None), wave_type_of_name(path.stem)
+    )
+
+
+class SampleCatalogue:
+    """
+    Persisted index of the samples of a library directory.
+
+    The index is a JSON file in the cache; refreshing it only analyses the
+    files whose size or modification time changed. Files that fail to be
+    analysed are recorded too, so they are only retried once they change.
+    """
+
+    def __init__(self, root: Path, index_file: "Path|None" = None) -> None:
+        """
+        Initialize a catalogue and load its index, if any.
+
+        Args:
+            root: The library directory
+            index_file: JSON file of the index, defaults to one per library in <cache home>/samples
+        """
+
+        self.root: Path = root
+        self.index_file: Path = index_file or (
+            get_cache_home() / "samples" / f"{hash_values(str(root.resolve()))[:16]}.json"
+        )
+        self.entries: Dict[str, SampleEntry] = {}
+        # Size, modification time and error of the files that could not be analysed.
+        self.failures: Dict[str, Dict[str, Any]] = {}
+
+        try:
+            with open(self.index_file, "r") as index:
+                data: Dict[str, Any] = json.load(index)
+
+            if data.get("version") == INDEX_VERSION:
+                self.entries = {
+                    entry["path"]: SampleEntry.from_json(entry) for entry in data.get("entries", [])
+                }
+                self.failures = {
+                    failure["path"]: failure for failure in data.get("failures", [])
+                }
+
+        except (OSError, ValueError, TypeError, KeyError):
+            self.entries = {}
+            self.failures = {}
+
+    def scan(self) -> Dict[str, os.stat_result]:
+        """Find the sample files of the library, skipping hidden ones."""
+
+        found: Dict[str, os.stat_result] = {}
+        pending: List[Path] = [self.root]
+
+        while pending:
+            try:
+                with os.scandir(pending.pop()) as entries:
+                    for entry in entries:
+                        if entry.name.startswith("."):
+                            continue
+
+                        if entry.is_dir():
+                            pending.append(Path(entry.path))
+
+                        elif entry.name.lower().endswith(SAMPLE_SUFFIXES):
+                            found[Path(entry.path).relative_to(self.root).as_posix()] = entry.stat()
+
+            except OSError:
+                continue
+
+        return found
+
+    def refresh(self, jobs: "int|None" = None) -> Tuple[int, int]:
+        """
+        Bring the index up to date with the files.
+
+        Args:
+            jobs: Files analysed at once, defaults to the CPU count
+
+        Returns:
+            Tuple[int, int]: Files analysed, and files removed
+        """
+
+        found: Dict[str, os.stat_result] = self.scan()
+
+        removed: List[str] = [path for path in [*self.entries, *self.failures] if path not in found]
+
+        for path in removed:
+            self.entries.pop(path, None)
+            self.failures.pop(path, None)
+
+        def is_unchanged(path: str, stat: os.stat_result) -> bool:
+            if path in self.entries:
+                return (self.entries[path].size, self.entries[path].mtime_ns) == (stat.st_size, stat.st_mtime_ns)
+
+            if path in self.failures:
+                return (self.failures[path]["size"], self.failures[path]["mtime_ns"]) == \
+                    (stat.st_size, stat.st_mtime_ns)
+
+            return False
+
+        changed: List[str] = [path for path, stat in found.items() if not is_unchanged(path, stat)]
+
+        def analyze_file(path: str) -> "SampleEntry|str":
+            try:
+                return analyze(self.root / path, path)
+
+            # Any file may be malformed in a way the readers do not foresee; one
+            # must never stop the scan.
+            except Exception as e:
+                return str(e) or type(e).__name__
+
+        with ThreadPoolExecutor(max_workers=max(1, jobs or os.cpu_count() or 1)) as pool:
+            for path, result in zip(changed, pool.map(analyze_file, changed)):
+                if isinstance(result, SampleEntry):
+                    self.entries[path] = result
+                    self.failures.pop(path, None)
+
+                else:
+                    self.entries.pop(path, None)
+                    self.failures[path] = {
+                        "path": path, "size": found[path].st_size,
+                        "mtime_ns": found[path].st_mtime_ns, "error": result,
+                    }
+
+        return len(changed), len(removed)
+
+    def save(self) -> None:
+        """Write the index, replacing the file atomically."""
+
+        self.index_file.parent.mkdir(parents=True, exist_ok=True)
+
+        temporary: Path = self.index_file.with_name(self.index_file.name + ".tmp")
+        temporary.write_text(json.dumps({
+            "version": INDEX_VERSION,
+            "root": str(self.root),
+            "entries": [self.entries[path].to_json() for path in sorted(self.entries)],
+            "failures": [self.failures[path] for path in sorted(self.failures)],
+        }))
+
+        os.replace(temporary, self.index_file)
+
+    @classmethod
+    def open(cls, root: Path) -> "SampleCatalogue":
+        """
+        Load the index of a library and refresh it, saving it if it changed.
+
+        Args:
+            root: The library directory
+
+        Returns:
+            SampleCatalogue: The up to date catalogue
+        """
+
+        catalogue: SampleCatalogue = cls(root)
+
+        if catalogue.refresh() != (0, 0) or not catalogue.index_file.exists():
+            try:
+                catalogue.save()
+
+            except OSError as e:
+                print(f"Failed to save the sample index: {e}")
+
+        return catalogue
+
+
+def libraries_file() -> Path:
+    """File listing the libraries added by the user."""
+
+    return get_cache_home() / "samples" / "libraries.json"
+
+
+def load_libraries() -> List[Path]:
+    """The libraries added by the user."""
+
+    try:
+        with open(libraries_file(), "r") as libraries:
+            return [Path(path) for path in json.load(libraries)]
+
+    except (OSError, ValueError, TypeError):
+        return []
+
+
+def add_library(path: Path) -> List[Path]:
+    """
+    Remember a library directory.
+
+    Args:
+        path: The directory
+
+    Returns:
+        List[Path]: The libraries added by the user
+    """
+
+    libraries: List[Path] = load_libraries()
+
+    if path.resolve() not in (library.resolve() for library in libraries):
+        libraries.append(path.resolve())
+
+        libraries_file().parent.mkdir(parents=True, exist_ok=True)
+        libraries_file().write_text(json.dumps([str(library) for library in libraries]))
+
+    return libraries
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    """
+    Parse the arguments of the sample catalogue.
+
+    Args:
+        argv: The command line arguments
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        prog="snes-ide samples",
+        description="Index the WAV and MIDI files of sample libraries and list their metadata."
+    )
+
+    parser.add_argument(
+        "paths", type=Path, nargs="*",
+        help="library directories, defaults to the bundled SampleLibrary and the added libraries"
+    )
+    parser.add_argument("--add", action="store_true", help="remember the directories given as libraries")
+    parser.add_argument("--rebuild", action="store_true", help="analyse every file again")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only print the summary of every library")
+
+    return parser.parse_args(argv)
+
+
+def main(argv: "List[str]|None" = None) -> int:
+    """
+    Index sample libraries from the command line.
+
+    Args:
+        argv: The command line arguments, defaults to sys.argv[1:]
+
+    Returns:
+        int: 0 on success, -1 if a library does not exist
+    """
+
+    args: argparse.Namespace = parse_args(sys.argv[1:] if argv is None else argv)
+
+    from toolchains import get_home_path
+
+    roots: List[Path] = args.paths or (
+        [Path(get_home_path()) / "libs" / "SampleLibrary"] + load_libraries()
+    )
+
+    for root in roots:
+        if not root.is_dir():
+            print(f"Not a directory: {root}")
+            return -1
+
+        if args.add:
+            add_library(root)
+
+        started: float = time.perf_counter()
+
+        catalogue: SampleCatalogue = SampleCatalogue(root)
+
+        if args.rebuild:
+            catalogue.entries.clear()
+            catalogue.failures.clear()
+
+        analysed, removed = catalogue.refresh()
+
+        try:
+            catalogue.save()
+
+        except OSError as e:
+            print(f"Failed to save the sample index: {e}")
+
+        if not args.quiet:
+            for path, entry in sorted(catalogue.entries.items()):
+                print(f"{entry.note or '-':>5} {entry.wave_type:<9} {entry.describe():<70} {path}")
+
+            for path, failure in sorted(catalogue.failures.items()):
+                print(f"{'-':>5} {'error':<9} {failure['error']:<70} {path}")
+
+        print(f"{root}: {len(catalogue.entries)} samples, {len(catalogue.failures)} unreadable, "
+              f"{analysed} analysed, {removed} removed "
+              f"in {time.perf_counter() - started:.2f} s")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
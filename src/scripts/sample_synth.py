@@ -0,0 +1,444 @@
+"""
+SNES-IDE - sample_synth.py
+Copyright (C) 2025 BrunoRNS
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from typing import List, Tuple
+from pathlib import Path
+import argparse
+import math
+import re
+import sys
+
+import numpy as np
+
+from brr_codec import BLOCK_SAMPLES, encode, write_wav
+
+
+WAVEFORMS: Tuple[str, ...] = ("sine", "square", "triangle", "sawtooth", "noise")
+
+# Pitch error accepted to loop on fewer BRR blocks.
+TUNING_CENTS: float = 1.0
+
+# Longest loop searched for, in seconds, to suggest a length when none fits.
+MAX_LOOP_SECONDS: float = 2.0
+
+NOTE_NAMES: Tuple[str, ...] = ("C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B")
+
+
+def note_frequency(note: str) -> float:
+    """
+    Get the frequency of a note name such as "A4" or "C#3".
+
+    Args:
+        note: Note name, sharps only, octave 4 holding A at 440 Hz
+
+    Returns:
+        float: The frequency in Hz
+
+    Raises:
+        ValueError: If the note name is not valid
+    """
+
+    match = re.fullmatch(r"([A-G]#?)(-?\d+)", note.strip().upper())
+
+    if match is None or match.group(1) not in NOTE_NAMES:
+        raise ValueError(f"Invalid note name: {note}")
+
+    midi_note: int = (int(match.group(2)) + 1) * 12 + NOTE_NAMES.index(match.group(1))
+
+    return 440.0 * math.pow(2, (midi_note - 69) / 12.0)
+
+
+class Envelope:
+    """Linear attack, decay, sustain and release of a sample."""
+
+    def __init__(self, attack: float = 0.0, decay: float = 0.0, sustain: float = 1.0,
+                 release: float = 0.0) -> None:
+        """
+        Initialize an envelope.
+
+        Args:
+            attack: Seconds to rise from silence to full volume
+            decay: Seconds to fall from full volume to the sustain level
+            sustain: Level held after the decay, 0-1
+            release: Seconds to fall to silence at the end, unless the sample loops
+        """
+
+        self.attack: float = attack
+        self.decay: float = decay
+        self.sustain: float = sustain
+        self.release: float = release
+
+    def gains(self, count: int, rate: int, release: bool = True) -> np.ndarray:
+        """
+        Compute the gain of every sample.
+
+        Args:
+            count: Number of samples
+            rate: Sample rate in Hz
+            release: Whether to fade out at the end
+
+        Returns:
+            np.ndarray: The gains, float64 in [0, 1]
+        """
+
+        times: np.ndarray = np.arange(count) / rate
+        gains: np.ndarray = np.full(count, self.sustain, dtype=np.float64)
+
+        if self.decay > 0:
+            falling: np.ndarray = 1 - (1 - self.sustain) * np.clip((times - self.attack) / self.decay, 0, 1)
+            gains = np.where(times < self.attack + self.decay, falling, gains)
+
+        if self.attack > 0:
+            gains = np.where(times < self.attack, times / self.attack, gains)
+
+        if release and self.release > 0:
+            gains *= np.clip((count / rate - times) / self.release, 0, 1)
+
+        return gains
+
+
+class SynthOptions:
+    """How to synthesize a sample."""
+
+    def __init__(self, waveform: str = "square", rate: int = 32000, length: float = 0.5,
+                 duty: float = 0.5, volume: float = 0.8, band_limited: bool = True,
+                 envelope: "Envelope|None" = None, loop: bool = False, seed: int = 0) -> None:
+        """
+        Initialize synthesis options.
+
+        Args:
+            waveform: One of WAVEFORMS
+            rate: Sample rate in Hz
+            length: Length in seconds
+            duty: Part of the period a square wave is high, 0-1
+            volume: Peak level, 0-1; below 1 leaves headroom for the BRR filters
+            band_limited: Remove the harmonics above half the sample rate (PolyBLEP)
+            envelope: Volume envelope, constant without one
+            loop: Loop the sustain, from the end of the decay to the end of the sample
+            seed: Seed of the noise waveform
+        """
+
+        self.waveform: str = waveform
+        self.rate: int = rate
+        self.length: float = length
+        self.duty: float = duty
+        self.volume: float = volume
+        self.band_limited: bool = band_limited
+        self.envelope: Envelope = envelope or Envelope()
+        self.loop: bool = loop
+        self.seed: int = seed
+
+
+class SynthSample:
+    """A synthesized sample."""
+
+    def __init__(self, samples: np.ndarray, rate: int, frequency: float,
+                 loop_start: "int|None" = None) -> None:
+        """
+        Initialize a synthesized sample.
+
+        Args:
+            samples: The samples, int16
+            rate: Sample rate in Hz
+            frequency: Frequency actually synthesized, which a loop may have tuned
+            loop_start: First sample of the loop, which runs to the end, if any
+        """
+
+        self.samples: np.ndarray = samples
+        self.rate: int = rate
+        self.frequency: float = frequency
+        self.loop_start: "int|None" = loop_start
+
+
+def poly_blep(phase: np.ndarray, step: float) -> np.ndarray:
+    """
+    Correction smoothing the steps of a naive waveform at phase 0.
+
+    Args:
+        phase: Phase of every sample, in [0, 1)
+        step: Phase advance per sample
+
+    Returns:
+        np.ndarray: The correction to subtract from a rising step of 2
+    """
+
+    correction: np.ndarray = np.zeros_like(phase)
+
+    rising: np.ndarray = phase < step
+    x: np.ndarray = phase[rising] / step
+    correction[rising] = 2 * x - x * x - 1
+
+    falling: np.ndarray = phase > 1 - step
+    x = (phase[falling] - 1) / step
+    correction[falling] = x * x + 2 * x + 1
+
+    return correction
+
+
+def oscillator(waveform: str, frequency: float, count: int, rate: int, duty: float = 0.5,
+               band_limited: bool = True, seed: int = 0) -> np.ndarray:
+    """
+    Generate a waveform at full scale.
+
+    Args:
+        waveform: One of WAVEFORMS
+        frequency: Frequency in Hz
+        count: Number of samples
+        rate: Sample rate in Hz
+        duty: Part of the period a square wave is high
+        band_limited: Smooth the discontinuities with PolyBLEP
+        seed: Seed of the noise waveform
+
+    Returns:
+        np.ndarray: The samples, float64 in about [-1, 1]
+
+    Raises:
+        ValueError: If the waveform is unknown
+    """
+
+    step: float = frequency / rate
+    phase: np.ndarray = (np.arange(count) * step) % 1.0
+
+    if waveform == "sine":
+        return np.sin(2 * np.pi * phase)
+
+    if waveform == "noise":
+        return np.random.default_rng(seed).uniform(-1, 1, count)
+
+    if waveform == "sawtooth":
+        return 2 * phase - 1 - (poly_blep(phase, step) if band_limited else 0)
+
+    if waveform == "square":
+        square: np.ndarray = np.where(phase < duty, 1.0, -1.0)
+
+        if band_limited:
+            square += poly_blep(phase, step) - poly_blep((phase - duty) % 1.0, step)
+
+        return square
+
+    if waveform == "triangle":
+        if not band_limited:
+            return 1 - 4 * np.abs(phase - 0.5)
+
+        # The integral of a band limited square wave, from -1 up to 1 and back.
+        square = np.where(phase < 0.5, 1.0, -1.0) + poly_blep(phase, step) - poly_blep((phase - 0.5) % 1.0, step)
+
+        return np.cumsum(square) * 4 * step - 1
+
+    raise ValueError(f"Unknown waveform: {waveform}")
+
+
+def loop_length(frequency: float, rate: int, available: int) -> Tuple[int, float]:
+    """
+    Pick a loop of whole BRR blocks holding whole periods.
+
+    The shortest loop within TUNING_CENTS of the pitch is used, saving
+    ARAM; a sample is never detuned further.
+
+    Args:
+        frequency: Wanted frequency in Hz
+        rate: Sample rate in Hz
+        available: Most samples the loop can take
+
+    Returns:
+        Tuple[int, float]: The loop length in samples and the frequency
+            making it hold a whole number of periods
+
+    Raises:
+        ValueError: If no loop of at most available samples is in tune,
+            naming the length needed when one is found
+    """
+
+    period: float = rate / frequency
+    longest: int = max(available, round(MAX_LOOP_SECONDS * rate)) // BLOCK_SAMPLES
+    blocks: np.ndarray = np.arange(1, max(1, longest) + 1)
+
+    periods: np.ndarray = np.rint(blocks * BLOCK_SAMPLES / period)
+    tuned: np.ndarray = periods * rate / (blocks * BLOCK_SAMPLES)
+
+    # Loops shorter than a period hold no whole period at all.
+    cents: np.ndarray = np.full(len(blocks), np.inf)
+    cents[periods > 0] = 1200 * np.abs(np.log2(tuned[periods > 0] / frequency))
+
+    in_tune: np.ndarray = np.flatnonzero(cents <= TUNING_CENTS)
+
+    if not len(in_tune):
+        raise ValueError(f"No loop up to {MAX_LOOP_SECONDS:g} s holds {frequency:.2f} Hz "
+                         f"within {TUNING_CENTS:g} cent at {rate} Hz")
+
+    best: int = int(in_tune[0])
+    length: int = int(blocks[best] * BLOCK_SAMPLES)
+
+    if length > available:
+        raise ValueError(f"Looping {frequency:.2f} Hz in tune at {rate} Hz takes "
+                         f"{1000 * length / rate:.0f} ms of loop, "
+                         f"{1000 * available / rate:.0f} ms are left after the attack and decay")
+
+    return length, float(tuned[best])
+
+
+def synthesize(frequency: float, options: SynthOptions) -> SynthSample:
+    """
+    Synthesize a sample.
+
+    A looping sample loops from the end of the attack and decay, on a BRR
+    block, to its end, the length being the most it takes; the frequency
+    is tuned so the loop holds whole periods and whole BRR blocks, which
+    BRR encoding then keeps without resampling.
+
+    Args:
+        frequency: Frequency in Hz, ignored by noise
+        options: The synthesis options
+
+    Returns:
+        SynthSample: The sample
+
+    Raises:
+        ValueError: If the options are invalid
+    """
+
+    if options.waveform not in WAVEFORMS:
+        raise ValueError(f"Unknown waveform: {options.waveform}")
+
+    if options.rate <= 0 or options.length <= 0:
+        raise ValueError("The sample rate and length must be positive")
+
+    if options.waveform != "noise" and not 0 < frequency < options.rate / 2:
+        raise ValueError(f"{frequency:.2f} Hz cannot be sampled at {options.rate} Hz")
+
+    count: int = max(1, round(options.length * options.rate))
+    loop_start: "int|None" = None
+
+    if options.loop:
+        envelope: Envelope = options.envelope
+        loop_start = -(-round((envelope.attack + envelope.decay) * options.rate) // BLOCK_SAMPLES) * BLOCK_SAMPLES
+
+        available: int = count - loop_start
+
+        if available < BLOCK_SAMPLES:
+            raise ValueError(f"The length leaves no room for a loop after the "
+                             f"{1000 * (envelope.attack + envelope.decay):.0f} ms of attack and decay")
+
+        if options.waveform == "noise":
+            count = loop_start + available // BLOCK_SAMPLES * BLOCK_SAMPLES
+        else:
+            length, frequency = loop_length(frequency, options.rate, available)
+            count = loop_start + length
+
+    samples: np.ndarray = oscillator(
+        options.waveform, frequency, count, options.rate, options.duty, options.band_limited, options.seed
+    )
+
+    # Band limited waveforms overshoot a little.
+    samples = samples / max(1.0, float(np.max(np.abs(samples))) if count else 1.0)
+    samples = samples * options.envelope.gains(count, options.rate, release=not options.loop)
+
+    return SynthSample(
+        np.clip(np.rint(samples * options.volume * 32767), -32768, 32767).astype(np.int16),
+        options.rate, frequency, loop_start
+    )
+
+
+def write_sample(path: Path, sample: SynthSample) -> None:
+    """
+    Write a sample as BRR if the path ends with .brr, as WAV otherwise.
+
+    Args:
+        path: The output file
+        sample: The sample
+
+    Raises:
+        OSError: If the file cannot be written
+    """
+
+    if path.suffix.lower() == ".brr":
+        path.write_bytes(encode(sample.samples, sample.loop_start).data)
+    else:
+        write_wav(path, sample.samples, sample.rate, sample.loop_start)
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    """
+    Parse the arguments of the sample synthesizer.
+
+    Args:
+        argv: The command line arguments
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        prog="snes-ide synth",
+        description="Synthesize a sample to WAV or BRR."
+    )
+
+    parser.add_argument("note", help="note name such as A4 or C#3, or frequency in Hz")
+    parser.add_argument("-o", "--output", type=Path, required=True, help="WAV or BRR file")
+    parser.add_argument("-w", "--wave", choices=WAVEFORMS, default="square", help="waveform (default square)")
+    parser.add_argument("-r", "--rate", type=int, default=32000, help="sample rate in Hz (default 32000)")
+    parser.add_argument("-l", "--length", type=float, default=0.5, help="length in seconds (default 0.5)")
+    parser.add_argument("--duty", type=float, default=0.5, help="duty cycle of the square wave (default 0.5)")
+    parser.add_argument("--volume", type=float, default=0.8, help="peak level, 0-1 (default 0.8)")
+    parser.add_argument(
+        "--adsr", type=float, nargs=4, default=(0.0, 0.0, 1.0, 0.0),
+        metavar=("ATTACK", "DECAY", "SUSTAIN", "RELEASE"),
+        help="envelope: attack, decay and release in seconds, sustain level 0-1"
+    )
+    parser.add_argument("--aliased", action="store_true", help="do not band limit the waveform")
+    parser.add_argument("--loop", action="store_true", help="loop the sustain")
+
+    return parser.parse_args(argv)
+
+
+def main(argv: "List[str]|None" = None) -> int:
+    """
+    Synthesize a sample from the command line.
+
+    Args:
+        argv: The command line arguments, defaults to sys.argv[1:]
+
+    Returns:
+        int: 0 on success, -1 on failure
+    """
+
+    args: argparse.Namespace = parse_args(sys.argv[1:] if argv is None else argv)
+
+    try:
+        frequency: float = float(args.note) if re.fullmatch(r"[\d.]+", args.note) else note_frequency(args.note)
+
+        sample: SynthSample = synthesize(frequency, SynthOptions(
+            args.wave, args.rate, args.length, args.duty, args.volume, not args.aliased,
+            Envelope(*args.adsr), args.loop
+        ))
+
+        write_sample(args.output, sample)
+
+    except (ValueError, OSError) as e:
+        print(f"Could not synthesize the sample: {e}")
+        return -1
+
+    print(f"{len(sample.samples)} samples at {sample.rate} Hz, {sample.frequency:.2f} Hz"
+          + (f", loop from sample {sample.loop_start}" if sample.loop_start is not None else "")
+          + f", written to {args.output}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
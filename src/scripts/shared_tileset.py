@@ -0,0 +1,321 @@
+"""
+SNES-IDE - shared_tileset.py
+Copyright (C) 2025 BrunoRNS
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from typing import List
+from pathlib import Path
+import argparse
+import sys
+
+import numpy as np
+
+from gfx_batch import DEFAULT_OPTIONS, BatchItem, collect_items, parse_options
+from tile_encoder import (EncoderOptions, TileLayout, UnsupportedOptions, encode_palette,
+                          encode_planar, encode_tilemap, load_indexed_image, reduce_tiles,
+                          slice_tiles, tile_keys)
+
+
+# Tile numbers a map entry can address.
+MAX_TILES: int = 1024
+
+
+class SharedImage:
+    """One image of a shared tileset and its map into it."""
+
+    def __init__(self, image: Path, options: EncoderOptions, layout: TileLayout,
+                 palette: np.ndarray, own_tiles: int, new_tiles: int) -> None:
+        """
+        Initialize a shared image.
+
+        Args:
+            image: The PNG or BMP file
+            options: Its conversion options
+            layout: Its map, numbering tiles of the shared tileset
+            palette: Its colors, shape (256, 3)
+            own_tiles: Tiles gfx4snes would store for the image alone
+            new_tiles: Tiles of the shared tileset first used by this image
+        """
+
+        self.image: Path = image
+        self.options: EncoderOptions = options
+        self.layout: TileLayout = layout
+        self.palette: np.ndarray = palette
+        self.own_tiles: int = own_tiles
+        self.new_tiles: int = new_tiles
+
+
+class SharedTileset:
+    """Tiles shared by many images, each image keeping its own map and palette."""
+
+    def __init__(self, tiles: np.ndarray, images: List[SharedImage], bits_per_pixel: int,
+                 tile_offset: int) -> None:
+        """
+        Initialize a shared tileset.
+
+        Args:
+            tiles: Color indices of the shared tiles, shape (count, 8, 8)
+            images: The images using them
+            bits_per_pixel: Depth of the tiles
+            tile_offset: Tile number the tileset is loaded at
+        """
+
+        self.tiles: np.ndarray = tiles
+        self.images: List[SharedImage] = images
+        self.bits_per_pixel: int = bits_per_pixel
+        self.tile_offset: int = tile_offset
+
+    @property
+    def tile_bytes(self) -> int:
+        """Size of one tile."""
+
+        return 8 * self.bits_per_pixel
+
+    @property
+    def separate_bytes(self) -> int:
+        """Tile data of the images converted one by one."""
+
+        return sum(image.own_tiles for image in self.images) * self.tile_bytes
+
+    @property
+    def shared_bytes(self) -> int:
+        """Tile data of the shared tileset."""
+
+        return len(self.tiles) * self.tile_bytes
+
+    def report(self) -> List[str]:
+        """
+        Describe the tileset and the tiles every image adds to it.
+
+        Returns:
+            List[str]: The lines, without line ends
+        """
+
+        lines: List[str] = [f"{'alone':>6} {'new':>6}  image"]
+
+        for image in self.images:
+            lines.append(f"{image.own_tiles:>6} {image.new_tiles:>6}  {image.image}")
+
+        saved: int = self.separate_bytes - self.shared_bytes
+
+        lines.append(
+            f"{len(self.images)} images: {len(self.tiles)} shared tiles ({self.shared_bytes} B) instead of "
+            f"{self.separate_bytes // self.tile_bytes} ({self.separate_bytes} B), "
+            f"{saved} B of ROM and DMA saved"
+        )
+
+        return lines
+
+
+def build_shared_tileset(items: List[BatchItem], tile_offset: int = 0,
+                         flip_reduction: bool = True) -> SharedTileset:
+    """
+    Deduplicate the tiles of many images into one tileset.
+
+    Tiles are compared on their colors, so tiles only differing by palette
+    are stored once, and with flip_reduction also when they are flipped
+    copies of each other. Tiles are numbered in order of first use, each
+    image adding its new tiles after those of the images before it.
+
+    Args:
+        items: The images and their gfx4snes options, all with the same colors (-u)
+        tile_offset: Tile number the tileset is loaded at, replacing -f
+        flip_reduction: Merge H/V flipped tiles
+
+    Returns:
+        SharedTileset: The tileset and the map of every image
+
+    Raises:
+        UnsupportedOptions: If an image or its options cannot be converted natively
+        ValueError: If the images have different color depths or too many tiles
+        OSError: If an image cannot be read
+    """
+
+    options: List[EncoderOptions] = []
+    pixels: List[np.ndarray] = []
+    palettes: List[np.ndarray] = []
+
+    for item in items:
+        image_options: EncoderOptions = EncoderOptions.from_args(item.command_line())
+
+        if image_options.block_size != 8:
+            raise UnsupportedOptions(f"{item.image.name}: shared tilesets need 8x8 blocks")
+
+        image_options.map_output = True
+        image_options.tile_offset = tile_offset
+        options.append(image_options)
+
+        image_pixels, palette = load_indexed_image(item.image)
+
+        if image_pixels.shape[0] % 8 or image_pixels.shape[1] % 8:
+            raise UnsupportedOptions(f"{item.image.name}: size is not a multiple of 8")
+
+        pixels.append(image_pixels)
+        palettes.append(palette)
+
+    depths = {image_options.bits_per_pixel for image_options in options}
+
+    if len(depths) > 1:
+        raise ValueError(f"Images use different color depths: {sorted(depths)} bpp")
+
+    bits_per_pixel: int = depths.pop() if depths else 4
+
+    tiles: List[np.ndarray] = [slice_tiles(image_pixels) for image_pixels in pixels]
+    all_tiles: np.ndarray = np.concatenate(tiles) if tiles else np.zeros((0, 8, 8), dtype=np.uint8)
+
+    unique, numbers, flips = reduce_tiles(all_tiles & ((1 << bits_per_pixel) - 1), flip_reduction)
+
+    if tile_offset + len(unique) > MAX_TILES:
+        raise ValueError(
+            f"The shared tileset has {len(unique)} tiles, a map can only address "
+            f"{MAX_TILES - tile_offset} from tile {tile_offset}")
+
+    # Tile numbers are in order of first use: image k adds those above the
+    # highest number of the images before it.
+    images: List[SharedImage] = []
+    start: int = 0
+    seen: int = 0
+
+    for item, image_options, image_pixels, palette, image_tiles in zip(items, options, pixels, palettes, tiles):
+        end: int = start + len(image_tiles)
+        image_numbers: np.ndarray = numbers[start:end]
+
+        layout: TileLayout = TileLayout(
+            unique, image_numbers, flips[start:end], image_tiles[:, 0, 0], image_pixels.shape[1] // 8
+        )
+
+        highest: int = int(image_numbers.max()) + 1 if len(image_numbers) else seen
+
+        images.append(SharedImage(
+            item.image, image_options, layout, palette,
+            len(np.unique(tile_keys(image_tiles))) if len(image_tiles) else 0,
+            max(0, highest - seen)
+        ))
+
+        seen = max(seen, highest)
+        start = end
+
+    return SharedTileset(unique, images, bits_per_pixel, tile_offset)
+
+
+def write_shared_tileset(tileset: SharedTileset, output: Path) -> List[Path]:
+    """
+    Write the tileset, and the map and palette of every image next to it.
+
+    Args:
+        tileset: The shared tileset
+        output: The .pic file of the tileset
+
+    Returns:
+        List[Path]: The written files
+    """
+
+    output.write_bytes(encode_planar(tileset.tiles, tileset.bits_per_pixel))
+    written: List[Path] = [output]
+
+    for image in tileset.images:
+        image.image.with_suffix(".map").write_bytes(encode_tilemap(image.layout, image.options))
+        image.image.with_suffix(".pal").write_bytes(encode_palette(image.palette, image.options.colors_output))
+
+        written += [image.image.with_suffix(".map"), image.image.with_suffix(".pal")]
+
+    return written
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    """
+    Parse the arguments of the shared tileset builder.
+
+    Args:
+        argv: The command line arguments
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        prog="snes-ide tileset",
+        description="Convert many images to one shared tileset, with a map and palette per image."
+    )
+
+    parser.add_argument("source", type=Path, help="directory of images or gfx-batch JSON manifest")
+    parser.add_argument(
+        "-o", "--output", type=Path,
+        help="tileset file, defaults to tileset.pic in the source directory"
+    )
+    parser.add_argument(
+        "--options", default=" ".join(DEFAULT_OPTIONS),
+        help="gfx4snes options for the images of a directory "
+             f"(default \"{' '.join(DEFAULT_OPTIONS)}\")"
+    )
+    parser.add_argument(
+        "-f", "--offset", type=int, default=0,
+        help="tile number the tileset is loaded at, used by every map (default 0)"
+    )
+    parser.add_argument(
+        "--no-flip", action="store_true",
+        help="do not merge tiles that are flipped copies of each other"
+    )
+
+    return parser.parse_args(argv)
+
+
+def main(argv: "List[str]|None" = None) -> int:
+    """
+    Build a shared tileset from the command line.
+
+    Args:
+        argv: The command line arguments, defaults to sys.argv[1:]
+
+    Returns:
+        int: 0 on success, -1 on failure
+    """
+
+    args: argparse.Namespace = parse_args(sys.argv[1:] if argv is None else argv)
+
+    if not args.source.exists():
+        print(f"Not found: {args.source}")
+        return -1
+
+    try:
+        items: List[BatchItem] = collect_items(args.source, parse_options(args.options))
+
+    except (ValueError, OSError) as e:
+        print(f"Invalid manifest: {e}")
+        return -1
+
+    if not items:
+        print(f"No PNG or BMP file found in {args.source}")
+        return -1
+
+    output: Path = args.output or (args.source if args.source.is_dir() else args.source.parent) / "tileset.pic"
+
+    try:
+        tileset: SharedTileset = build_shared_tileset(items, args.offset, not args.no_flip)
+        write_shared_tileset(tileset, output)
+
+    except (ValueError, OSError) as e:
+        print(f"Could not build the shared tileset: {e}")
+        return -1
+
+    print("\n".join(tileset.report()))
+    print(f"Tileset written to {output}, maps and palettes next to the images")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,527 @@
+"""
+SNES-IDE - tile_encoder.py
+Copyright (C) 2025 BrunoRNS
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from typing import Dict, List, Tuple
+from pathlib import Path
+
+from PIL import Image
+import numpy as np
+
+from gfx_cache import parse_gfx4snes_args
+from lz77 import compress
+
+
+# Map entry bits, see the BG tilemap format of the SNES.
+MAP_PRIORITY: int = 0x2000
+MAP_HFLIP: int = 0x4000
+MAP_VFLIP: int = 0x8000
+
+# Options of gfx4snes the native encoder reproduces byte for byte, and -z,
+# whose stream decompresses to the same bytes.
+SUPPORTED_OPTIONS: Tuple[str, ...] = ("-s", "-f", "-m", "-g", "-R", "-M", "-e", "-o", "-p", "-u", "-t", "-z")
+
+
+class UnsupportedOptions(ValueError):
+    """Raised for gfx4snes options or images the native encoder cannot reproduce."""
+
+
+class EncoderOptions:
+    """The subset of gfx4snes options understood by the native encoder."""
+
+    def __init__(self, block_size: int = 8, colors_used: int = 16, colors_output: int = 256,
+                 map_output: bool = False, no_reduction: bool = False, tile_offset: int = 0,
+                 palette_entry: int = 0, high_priority: bool = False,
+                 flip_reduction: bool = False, compressed: bool = False) -> None:
+        """
+        Initialize the options, with the defaults of gfx4snes.
+
+        Args:
+            block_size: Size of the image blocks (-s), 8, 16, 32 or 64
+            colors_used: Number of colors per tile (-u), 4, 16, 128 or 256
+            colors_output: Number of palette colors written to the .pal (-o)
+            map_output: Whether to reduce tiles and write a .map (-m)
+            no_reduction: Keep duplicated tiles in the map (-R)
+            tile_offset: Added to every tile number of the map (-f)
+            palette_entry: Added to every palette number of the map (-e)
+            high_priority: Set the priority bit of every map entry (-g)
+            flip_reduction: Also merge tiles that are flipped copies of each
+                other; gfx4snes does not, so outputs differ from it when set
+            compressed: Write the .pic LZ77 compressed (-z)
+        """
+
+        self.block_size: int = block_size
+        self.colors_used: int = colors_used
+        self.colors_output: int = colors_output
+        self.map_output: bool = map_output
+        self.no_reduction: bool = no_reduction
+        self.tile_offset: int = tile_offset
+        self.palette_entry: int = palette_entry
+        self.high_priority: bool = high_priority
+        self.flip_reduction: bool = flip_reduction
+        self.compressed: bool = compressed
+
+    @property
+    def bits_per_pixel(self) -> int:
+        """Bit planes of a tile: 2 for 4 colors, 8 for 256, 4 otherwise."""
+
+        return {4: 2, 256: 8}.get(self.colors_used, 4)
+
+    def layout_key(self) -> Tuple[int, bool, bool, bool]:
+        """The options the tile layout depends on, see layout_tiles."""
+
+        return (self.block_size, self.map_output, self.no_reduction, self.flip_reduction)
+
+    @classmethod
+    def from_args(cls, args: List[str]) -> "EncoderOptions":
+        """
+        Build the options from a gfx4snes command line.
+
+        Args:
+            args: The gfx4snes arguments (-i, -t and -q are ignored)
+
+        Returns:
+            EncoderOptions: The equivalent options
+
+        Raises:
+            UnsupportedOptions: If an option needs gfx4snes itself
+        """
+
+        try:
+            pairs, _ = parse_gfx4snes_args(args)
+
+        except ValueError as e:
+            raise UnsupportedOptions(str(e))
+
+        values: Dict[str, str] = dict(pairs)
+        unsupported: List[str] = [option for option in values if option not in SUPPORTED_OPTIONS]
+
+        if unsupported:
+            raise UnsupportedOptions(f"Options not supported by the native encoder: {' '.join(unsupported)}")
+
+        try:
+            options: EncoderOptions = cls(
+                block_size=int(values.get("-s", 8)),
+                colors_used=int(values.get("-u", 16)),
+                colors_output=int(values.get("-o", 256)),
+                map_output="-m" in values,
+                no_reduction="-R" in values,
+                tile_offset=int(values.get("-f", 0)),
+                palette_entry=int(values.get("-e", 0)),
+                high_priority="-g" in values,
+                compressed="-z" in values,
+            )
+
+        except ValueError as e:
+            raise UnsupportedOptions(f"Invalid numeric option: {e}")
+
+        if values.get("-M", "1") != "1":
+            raise UnsupportedOptions("Only BG mode 1 maps are supported by the native encoder")
+
+        if options.block_size not in (8, 16, 32, 64) or (options.map_output and options.block_size != 8):
+            raise UnsupportedOptions("Maps need 8x8 blocks, sprites 8, 16, 32 or 64")
+
+        if options.colors_used not in (4, 16, 128, 256) or not 0 <= options.colors_output <= 256:
+            raise UnsupportedOptions("Invalid number of colors")
+
+        return options
+
+
+class EncodedImage:
+    """The SNES data of a converted image."""
+
+    def __init__(self, pic: bytes, pal: bytes, tilemap: "bytes|None", tile_count: int) -> None:
+        """
+        Initialize the result of an encoding.
+
+        Args:
+            pic: Planar tiles, the .pic file
+            pal: BGR555 palette, the .pal file
+            tilemap: Map entries, the .map file, if a map was requested
+            tile_count: Number of tiles in pic
+        """
+
+        self.pic: bytes = pic
+        self.pal: bytes = pal
+        self.tilemap: "bytes|None" = tilemap
+        self.tile_count: int = tile_count
+
+
+def load_indexed_image(path: Path) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Load a palette based PNG or BMP.
+
+    Args:
+        path: The image file
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Pixel indices (height x width, uint8)
+            and the 256 palette colors (256 x 3, uint8)
+
+    Raises:
+        UnsupportedOptions: If the image has no palette
+    """
+
+    with Image.open(path) as image:
+        if image.mode != "P":
+            raise UnsupportedOptions(f"{path.name} is not a 256 colors image (mode {image.mode})")
+
+        pixels: np.ndarray = np.array(image, dtype=np.uint8)
+        colors: List[int] = image.getpalette() or []
+
+    palette: np.ndarray = np.zeros((256, 3), dtype=np.uint8)
+    found: np.ndarray = np.array(colors[:768], dtype=np.uint8).reshape(-1, 3)
+    palette[:len(found)] = found
+
+    return pixels, palette
+
+
+def slice_tiles(pixels: np.ndarray) -> np.ndarray:
+    """
+    Cut an image into 8x8 tiles, in raster order.
+
+    Args:
+        pixels: Pixel indices, height and width multiple of 8
+
+    Returns:
+        np.ndarray: Tiles, shape (count, 8, 8)
+    """
+
+    height, width = pixels.shape
+
+    return pixels.reshape(height // 8, 8, width // 8, 8).swapaxes(1, 2).reshape(-1, 8, 8)
+
+
+def arrange_blocks(pixels: np.ndarray, block_size: int) -> np.ndarray:
+    """
+    Lay the blocks of a sprite sheet out in VRAM order, 16 tiles per row.
+
+    Blocks are read in raster order and placed side by side in a 128 pixels
+    wide sheet, the way gfx4snes writes sprites without a map; the last row
+    is completed with blank tiles.
+
+    Args:
+        pixels: Pixel indices, height and width multiple of block_size
+        block_size: 8, 16, 32 or 64
+
+    Returns:
+        np.ndarray: Tiles, shape (count, 8, 8), count a multiple of 16
+    """
+
+    height, width = pixels.shape
+
+    blocks: np.ndarray = pixels.reshape(
+        height // block_size, block_size, width // block_size, block_size
+    ).swapaxes(1, 2).reshape(-1, block_size, block_size)
+
+    per_row: int = 128 // block_size
+    rows: int = -(-len(blocks) // per_row)
+
+    sheet: np.ndarray = np.zeros((rows * per_row, block_size, block_size), dtype=np.uint8)
+    sheet[:len(blocks)] = blocks
+
+    sheet = sheet.reshape(rows, per_row, block_size, block_size).swapaxes(1, 2)
+
+    return slice_tiles(sheet.reshape(rows * block_size, 128))
+
+
+def flip_variants(tiles: np.ndarray) -> np.ndarray:
+    """
+    Get every tile in its 4 orientations.
+
+    Args:
+        tiles: Tiles, shape (count, 8, 8)
+
+    Returns:
+        np.ndarray: Shape (count, 4, 8, 8); index 1 is H-flipped, 2 V-flipped, 3 both
+    """
+
+    return np.stack([
+        tiles, tiles[:, :, ::-1], tiles[:, ::-1, :], tiles[:, ::-1, ::-1]
+    ], axis=1)
+
+
+def tile_keys(tiles: np.ndarray) -> np.ndarray:
+    """View every 8x8 tile as one 64 bytes value usable as a hash table key."""
+
+    return np.ascontiguousarray(tiles).reshape(len(tiles), 64).view(np.dtype((np.void, 64))).ravel()
+
+
+def reduce_tiles(tiles: np.ndarray, flip_reduction: bool = False) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Merge identical tiles, keeping the order of first appearance.
+
+    With flip_reduction, a tile equal to a flipped copy of an earlier one is
+    merged too: the key of a tile is the smallest of its 4 orientations, so
+    all flipped copies share one entry of the table.
+
+    Args:
+        tiles: Tiles, shape (count, 8, 8)
+        flip_reduction: Whether to match H/V flipped tiles
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: The unique tiles, the tile
+            number of every input tile and its flip bits (1 = H, 2 = V)
+    """
+
+    count: int = len(tiles)
+
+    if not flip_reduction:
+        _, first, inverse = np.unique(tile_keys(tiles), return_index=True, return_inverse=True)
+
+        order: np.ndarray = np.argsort(first, kind="stable")
+        rank: np.ndarray = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+
+        return tiles[first[order]], rank[inverse.ravel()], np.zeros(count, dtype=np.int64)
+
+    variants: np.ndarray = flip_variants(tiles)
+
+    # Rank the 4 keys of every tile in one sorted table; the smallest rank is
+    # the canonical key, the argmin its orientation.
+    _, ranks = np.unique(tile_keys(variants.reshape(-1, 8, 8)), return_inverse=True)
+    ranks = ranks.reshape(count, 4)
+
+    orientation: np.ndarray = ranks.argmin(axis=1)
+    canonical: np.ndarray = ranks[np.arange(count), orientation]
+
+    _, first, inverse = np.unique(canonical, return_index=True, return_inverse=True)
+
+    order = np.argsort(first, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+
+    numbers: np.ndarray = rank[inverse.ravel()]
+
+    # Flips compose by XOR: tile = stored tile flipped by both orientations.
+    flips: np.ndarray = orientation ^ orientation[first[order]][numbers]
+
+    return tiles[first[order]], numbers, flips
+
+
+def encode_planar(tiles: np.ndarray, bits_per_pixel: int) -> bytes:
+    """
+    Encode tiles in the SNES planar format.
+
+    Each pair of bit planes is stored as 8 rows of 2 bytes, pairs one after
+    the other: 16 bytes a tile in 2bpp, 32 in 4bpp and 64 in 8bpp.
+
+    Args:
+        tiles: Color indices, shape (count, 8, 8)
+        bits_per_pixel: 2, 4 or 8
+
+    Returns:
+        bytes: The tile data
+    """
+
+    count: int = len(tiles)
+
+    bits: np.ndarray = (tiles[..., None] >> np.arange(bits_per_pixel, dtype=np.uint8)) & 1
+    rows: np.ndarray = np.packbits(bits, axis=2).reshape(count, 8, bits_per_pixel)
+
+    return rows.reshape(count, 8, bits_per_pixel // 2, 2).swapaxes(1, 2).tobytes()
+
+
+def encode_palette(palette: np.ndarray, colors_output: int) -> bytes:
+    """
+    Encode palette colors as little endian BGR555 words.
+
+    Args:
+        palette: Colors, shape (256, 3)
+        colors_output: Number of colors to write
+
+    Returns:
+        bytes: The palette data
+    """
+
+    rgb: np.ndarray = palette[:colors_output].astype(np.uint16) >> 3
+
+    return (rgb[:, 0] | (rgb[:, 1] << 5) | (rgb[:, 2] << 10)).astype("<u2").tobytes()
+
+
+class TileLayout:
+    """The tiles of an image and where the map places them, before encoding."""
+
+    def __init__(self, tiles: np.ndarray, numbers: "np.ndarray|None" = None,
+                 flips: "np.ndarray|None" = None, corners: "np.ndarray|None" = None,
+                 columns: int = 16) -> None:
+        """
+        Initialize a layout.
+
+        Args:
+            tiles: Tiles to store, shape (count, 8, 8), with the full pixel indices
+            numbers: Tile number of every map entry, None without a map
+            flips: Flip bits of every map entry (1 = H, 2 = V)
+            corners: Top-left pixel of every map entry, giving its palette
+            columns: Width of the map, or of the tile sheet, in tiles
+        """
+
+        self.tiles: np.ndarray = tiles
+        self.numbers: "np.ndarray|None" = numbers
+        self.flips: "np.ndarray|None" = flips
+        self.corners: "np.ndarray|None" = corners
+        self.columns: int = columns
+
+
+def layout_tiles(pixels: np.ndarray, options: EncoderOptions) -> TileLayout:
+    """
+    Slice and reduce the tiles of an image.
+
+    The result only depends on the pixels and on EncoderOptions.layout_key(),
+    so it can be reused when the palette or map offset options change.
+
+    Args:
+        pixels: Pixel indices, shape (height, width)
+        options: The conversion options
+
+    Returns:
+        TileLayout: The tiles and map of the image
+
+    Raises:
+        UnsupportedOptions: If the image size is not a multiple of the block size
+    """
+
+    height, width = pixels.shape
+
+    if height % options.block_size or width % options.block_size:
+        raise UnsupportedOptions(
+            f"Image size {width}x{height} is not a multiple of {options.block_size}")
+
+    if not options.map_output:
+        return TileLayout(arrange_blocks(pixels, options.block_size))
+
+    tiles: np.ndarray = slice_tiles(pixels)
+
+    if options.no_reduction:
+        return TileLayout(
+            tiles, np.arange(len(tiles)), np.zeros(len(tiles), dtype=np.int64),
+            tiles[:, 0, 0], width // 8
+        )
+
+    unique, numbers, flips = reduce_tiles(tiles, options.flip_reduction)
+
+    return TileLayout(unique, numbers, flips, tiles[:, 0, 0], width // 8)
+
+
+def encode_tilemap(layout: TileLayout, options: EncoderOptions) -> bytes:
+    """
+    Encode the map entries of a layout.
+
+    The palette number of an entry is taken from the top-left pixel of its
+    tile, as gfx4snes does.
+
+    Args:
+        layout: A layout with a map
+        options: The conversion options
+
+    Returns:
+        bytes: The map data
+    """
+
+    palette_shift: int = 2 if options.colors_used == 4 else 4
+
+    # gfx4snes adds the fields of an entry instead of masking them, so a
+    # large tile offset or palette entry carries into the next field.
+    palettes: np.ndarray = ((layout.corners.astype(np.int64) >> palette_shift) & 7) + options.palette_entry
+
+    entries: np.ndarray = layout.numbers + options.tile_offset + (palettes << 10)
+
+    if options.high_priority:
+        entries += MAP_PRIORITY
+
+    entries |= np.where(layout.flips & 1, MAP_HFLIP, 0) | np.where(layout.flips & 2, MAP_VFLIP, 0)
+
+    return (entries & 0xFFFF).astype("<u2").tobytes()
+
+
+def encode_layout(layout: TileLayout, palette: np.ndarray, options: EncoderOptions) -> EncodedImage:
+    """
+    Encode a tile layout with the color, palette and map options.
+
+    The color of a pixel is the low bits of its index, as gfx4snes does.
+
+    Args:
+        layout: The tiles and map, from layout_tiles
+        palette: Colors, shape (256, 3)
+        options: The conversion options
+
+    Returns:
+        EncodedImage: The converted data
+    """
+
+    color_mask: int = (1 << options.bits_per_pixel) - 1
+
+    return EncodedImage(
+        encode_planar(layout.tiles & color_mask, options.bits_per_pixel),
+        encode_palette(palette, options.colors_output),
+        encode_tilemap(layout, options) if layout.numbers is not None else None,
+        len(layout.tiles)
+    )
+
+
+def encode_image(pixels: np.ndarray, palette: np.ndarray, options: EncoderOptions) -> EncodedImage:
+    """
+    Convert an indexed image to SNES tiles, palette and map like gfx4snes.
+
+    Args:
+        pixels: Pixel indices, shape (height, width)
+        palette: Colors, shape (256, 3)
+        options: The conversion options
+
+    Returns:
+        EncodedImage: The converted data
+
+    Raises:
+        UnsupportedOptions: If the image size is not a multiple of the block size
+    """
+
+    return encode_layout(layout_tiles(pixels, options), palette, options)
+
+
+def convert_file(image: Path, args: List[str], flip_reduction: bool = False) -> List[Path]:
+    """
+    Convert an image with gfx4snes arguments, writing the outputs next to it.
+
+    Args:
+        image: The PNG or BMP file
+        args: gfx4snes arguments, e.g. ["-s", "8", "-o", "16", "-u", "16", "-p", "-m"]
+        flip_reduction: Also merge H/V flipped tiles (not done by gfx4snes)
+
+    Returns:
+        List[Path]: The written files
+
+    Raises:
+        UnsupportedOptions: If gfx4snes is needed for these options or this image
+    """
+
+    options: EncoderOptions = EncoderOptions.from_args(args)
+    options.flip_reduction = flip_reduction
+
+    pixels, palette = load_indexed_image(image)
+    encoded: EncodedImage = encode_image(pixels, palette, options)
+
+    outputs: Dict[str, bytes] = {
+        ".pic": compress(encoded.pic) if options.compressed else encoded.pic, ".pal": encoded.pal
+    }
+
+    if encoded.tilemap is not None:
+        outputs[".map"] = encoded.tilemap
+
+    for suffix, data in outputs.items():
+        image.with_suffix(suffix).write_bytes(data)
+
+    return [image.with_suffix(suffix) for suffix in outputs]
@@ -0,0 +1,225 @@
+"""
+SNES-IDE - tile_preview.py
+Copyright (C) 2025 BrunoRNS
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from typing import Dict, List, Tuple
+from pathlib import Path
+import time
+
+import numpy as np
+
+from tile_encoder import (EncodedImage, EncoderOptions, TileLayout, encode_layout,
+                          layout_tiles, load_indexed_image)
+
+
+def decode_planar(pic: bytes, bits_per_pixel: int) -> np.ndarray:
+    """
+    Decode SNES planar tiles, the reverse of tile_encoder.encode_planar.
+
+    Args:
+        pic: The tile data
+        bits_per_pixel: 2, 4 or 8
+
+    Returns:
+        np.ndarray: Color indices, shape (count, 8, 8)
+    """
+
+    rows: np.ndarray = np.frombuffer(pic, dtype=np.uint8).reshape(-1, bits_per_pixel // 2, 8, 2)
+    planes: np.ndarray = rows.swapaxes(1, 2).reshape(-1, 8, bits_per_pixel)
+
+    bits: np.ndarray = np.unpackbits(planes[..., None], axis=3).astype(np.uint8)
+    weights: np.ndarray = (1 << np.arange(bits_per_pixel, dtype=np.uint16))[:, None]
+
+    return (bits * weights).sum(axis=2).astype(np.uint8)
+
+
+def decode_palette(pal: bytes) -> np.ndarray:
+    """
+    Decode a BGR555 palette into the 256 colors of CGRAM.
+
+    Args:
+        pal: The palette data, colors missing from it are black
+
+    Returns:
+        np.ndarray: RGB colors, shape (256, 3)
+    """
+
+    words: np.ndarray = np.frombuffer(pal[:512], dtype="<u2")
+    channels: np.ndarray = np.stack([words & 31, (words >> 5) & 31, (words >> 10) & 31], axis=1)
+
+    cgram: np.ndarray = np.zeros((256, 3), dtype=np.uint8)
+    cgram[:len(words)] = (channels << 3) | (channels >> 2)
+
+    return cgram
+
+
+class Preview:
+    """An encoded image rendered the way the SNES displays it."""
+
+    def __init__(self, rgb: np.ndarray, cgram: np.ndarray, encoded: EncodedImage,
+                 options: EncoderOptions, reused: bool, seconds: float) -> None:
+        """
+        Initialize a preview.
+
+        Args:
+            rgb: The rendered map, or tile sheet without a map, shape (height, width, 3)
+            cgram: The palette colors, shape (256, 3)
+            encoded: The data the preview was rendered from
+            options: The options it was encoded with
+            reused: Whether the tile layout came from the cache
+            seconds: Time spent encoding and rendering
+        """
+
+        self.rgb: np.ndarray = rgb
+        self.cgram: np.ndarray = cgram
+        self.encoded: EncodedImage = encoded
+        self.options: EncoderOptions = options
+        self.reused: bool = reused
+        self.seconds: float = seconds
+
+    def summary(self) -> str:
+        """One line description of the encoded data."""
+
+        sizes: str = f"{len(self.encoded.pic)} B tiles, {len(self.encoded.pal)} B palette"
+
+        if self.encoded.tilemap is not None:
+            sizes += f", {len(self.encoded.tilemap)} B map"
+
+        return (f"{self.encoded.tile_count} tiles ({sizes}) in {self.seconds * 1000:.1f} ms"
+                + (", tile layout reused" if self.reused else ""))
+
+
+def render(encoded: EncodedImage, options: EncoderOptions, columns: int) -> np.ndarray:
+    """
+    Render encoded data from its bytes, as the SNES would display it.
+
+    Map entries are drawn with their palette and flips, tiles being loaded
+    at the tile offset; without a map, the tile sheet is drawn with the
+    first palette. Transparent pixels show the backdrop color (CGRAM 0).
+
+    Args:
+        encoded: The encoded image
+        options: The options it was encoded with
+        columns: Width of the map, or of the tile sheet, in tiles
+
+    Returns:
+        np.ndarray: RGB pixels, shape (height, width, 3)
+    """
+
+    bits_per_pixel: int = options.bits_per_pixel
+    cgram: np.ndarray = decode_palette(encoded.pal)
+
+    # One blank tile after the real ones for entries pointing outside of them.
+    tiles: np.ndarray = np.concatenate([
+        decode_planar(encoded.pic, bits_per_pixel), np.zeros((1, 8, 8), dtype=np.uint8)
+    ]).astype(np.int64)
+
+    if encoded.tilemap is None:
+        colors: np.ndarray = tiles[:-1]
+
+    else:
+        entries: np.ndarray = np.frombuffer(encoded.tilemap, dtype="<u2").astype(np.int64)
+
+        numbers: np.ndarray = ((entries & 0x3FF) - options.tile_offset) & 0x3FF
+        numbers[numbers >= len(tiles) - 1] = len(tiles) - 1
+
+        colors = tiles[numbers]
+        colors = np.where((entries & 0x4000)[:, None, None] != 0, colors[:, :, ::-1], colors)
+        colors = np.where((entries & 0x8000)[:, None, None] != 0, colors[:, ::-1, :], colors)
+
+        if bits_per_pixel < 8:
+            palettes: np.ndarray = (entries >> 10) & 7
+            colors = np.where(colors != 0, colors + (palettes << bits_per_pixel)[:, None, None], 0)
+
+    rows: int = -(-len(colors) // columns)
+
+    sheet: np.ndarray = np.zeros((rows * columns, 8, 8), dtype=np.int64)
+    sheet[:len(colors)] = colors
+
+    pixels: np.ndarray = sheet.reshape(rows, columns, 8, 8).swapaxes(1, 2).reshape(rows * 8, columns * 8)
+
+    return cgram[pixels]
+
+
+class PreviewRenderer:
+    """
+    Encode and render previews, caching the image and its tile layouts.
+
+    Changing the color, palette or map offset options only re-encodes the
+    cached layout; the image is reloaded when its file changes.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty renderer."""
+
+        self.image_key: "Tuple[str, int, int]|None" = None
+        self.pixels: np.ndarray = np.zeros((0, 0), dtype=np.uint8)
+        self.palette: np.ndarray = np.zeros((256, 3), dtype=np.uint8)
+        self.layouts: Dict[Tuple[int, bool, bool, bool], TileLayout] = {}
+
+    def load(self, image: Path) -> None:
+        """
+        Load an image unless it is unchanged since the last call.
+
+        Args:
+            image: The PNG or BMP file
+        """
+
+        stat = image.stat()
+        key: Tuple[str, int, int] = (str(image.resolve()), stat.st_mtime_ns, stat.st_size)
+
+        if key != self.image_key:
+            self.pixels, self.palette = load_indexed_image(image)
+            self.layouts.clear()
+            self.image_key = key
+
+    def render(self, image: Path, args: List[str], flip_reduction: bool = False) -> Preview:
+        """
+        Encode an image with gfx4snes arguments and render the result.
+
+        Args:
+            image: The PNG or BMP file
+            args: gfx4snes arguments
+            flip_reduction: Merge H/V flipped tiles
+
+        Returns:
+            Preview: The rendered preview
+
+        Raises:
+            UnsupportedOptions: If the options or image need gfx4snes
+            OSError: If the image cannot be read
+        """
+
+        started: float = time.perf_counter()
+
+        options: EncoderOptions = EncoderOptions.from_args(args)
+        options.flip_reduction = flip_reduction
+
+        self.load(image)
+
+        layout: "TileLayout|None" = self.layouts.get(options.layout_key())
+        reused: bool = layout is not None
+
+        if layout is None:
+            layout = layout_tiles(self.pixels, options)
+            self.layouts[options.layout_key()] = layout
+
+        encoded: EncodedImage = encode_layout(layout, self.palette, options)
+
+        rgb: np.ndarray = render(encoded, options, layout.columns)
+
+        return Preview(rgb, decode_palette(encoded.pal), encoded, options, reused, time.perf_counter() - started)
@@ -0,0 +1,313 @@
+"""
+SNES-IDE - toolchains.py
+Copyright (C) 2025 BrunoRNS
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from typing import Callable, Dict, List
+from pathlib import Path
+import subprocess
+import platform
+import os
+
+from gfx_cache import GfxCache, gfxconv_override
+from parallel_make import make_command, jobserver_fds
+from build_cache import BuildCache
+
+
+def get_executable_path() -> str:
+    """
+    Get Script Path, by using the path of the script itself.
+    """
+
+    return str(Path(__file__).resolve().parent)
+
+
+def get_home_path() -> str:
+    """Get snes-ide home directory"""
+
+    return str(Path(get_executable_path()).parent)
+
+
+def get_make_path() -> Path:
+    """Get the bundled make executable"""
+
+    return Path(get_home_path()) / "bin" / "make" / \
+        ("make" if os.name == "posix" else "make.exe")
+
+
+def setup_pvsneslib_env() -> Path:
+    """
+    Set the environment used by PVSnesLib's snes_rules.
+
+    Returns:
+        Path: The PVSNESLIB_HOME directory
+    """
+
+    pvsneslib_home: Path = Path(get_home_path()) / "bin" / "pvsneslib"
+
+    os.environ["PVSNESLIB_HOME"] = str(pvsneslib_home)
+
+    return pvsneslib_home
+
+
+def setup_dotnetsnes_env() -> None:
+    """Set the environment used by DotnetSnes Makefiles."""
+
+    home_path: str = get_home_path()
+
+    dntc_home: Path = Path(home_path) / "libs" / "DntcTranspiler"
+    dotnetsnes_home: Path = Path(home_path) / "libs" / "DotnetSnesLib" / "src"
+    makefile_defaults: Path = dotnetsnes_home / "Makefile.defaults"
+
+    dotnet_home: Path = Path(home_path) / "bin" / "dotnet8"
+
+    if platform.system().lower() == "darwin":
+        dotnet_home = dotnet_home / "dotnet-sdk-8.0.415-osx-arm64" / "dotnet"
+
+    elif platform.system().lower() == "windows":
+        dotnet_home = dotnet_home / "dotnet-sdk-8.0.415-win-x64" / "dotnet.exe"
+
+    else:
+        dotnet_home = dotnet_home / "dotnet-sdk-8.0.415-linux-x64" / "dotnet"
+
+    setup_pvsneslib_env()
+
+    os.environ["DNTC_HOME"] = str(dntc_home)
+    os.environ["DOTNETSNES_HOME"] = str(dotnetsnes_home)
+    os.environ["MAKEFILE_DEFAULTS"] = str(makefile_defaults)
+    os.environ["REPO_DEFAULT_RULES"] = str(makefile_defaults)
+    os.environ["DOTNET"] = str(dotnet_home)
+
+
+def setup_javasnes_env() -> Path:
+    """
+    Set the environment used by JavaSnes projects.
+
+    Returns:
+        Path: The bin directory of the bundled JDK
+    """
+
+    home_path: str = get_home_path()
+    java_home: Path
+
+    if platform.system().lower() == "darwin":
+        java_home = (
+            Path(home_path) / "bin" / "jdk8" / "jdk8" /
+            "zulu-8.jdk" / "Contents" / "Home" / "bin"
+        )
+    else:
+        java_home = Path(home_path) / "bin" / "jdk8" / "jdk8" / "bin"
+
+    setup_pvsneslib_env()
+
+    os.environ["JAVA_HOME"] = str(java_home)
+
+    return java_home
+
+
+def run_make(project: Path) -> int:
+    """
+    Run the bundled make in a project directory, streaming its output.
+
+    Args:
+        project: Directory containing the Makefile
+
+    Returns:
+        int: 0 on success, -1 on failure
+    """
+
+    if not (project / "Makefile").exists():
+        print("No Makefile to build project found, exiting...")
+        return -1
+
+    # gfx4snes calls of the Makefile go through the gfx cache.
+    gfxconv: List[str] = gfxconv_override(project)
+    make_output: subprocess.CompletedProcess
+
+    try:
+        make_output = subprocess.run(
+            make_command(get_make_path(), project) + gfxconv, cwd=project,
+            env=os.environ, pass_fds=jobserver_fds()
+        )
+
+    except OSError as e:
+        print(f"Could not run make: {e}")
+        return -1
+
+    if gfxconv:
+        GfxCache().evict()
+
+    if make_output.returncode != 0:
+        print(
+            f"Error while compiling the software (make exited with "
+            f"{make_output.returncode}), exiting...")
+        return -1
+
+    return 0
+
+
+def build_pvsneslib(project: Path) -> int:
+    """
+    Build a PVSnesLib project, restoring unchanged outputs from the build cache.
+
+    Args:
+        project: The project directory
+
+    Returns:
+        int: 0 on success, -1 on failure
+    """
+
+    pvsneslib_home: Path = setup_pvsneslib_env()
+
+    if not (project / "Makefile").exists():
+        print("No Makefile to build project found, exiting...")
+        return -1
+
+    build_cache: "BuildCache|None" = None
+
+    if os.environ.get("SNES_IDE_BUILD_CACHE", "1") != "0":
+        build_cache = BuildCache(project, pvsneslib_home)
+
+        try:
+            build_cache.restore()
+
+        except Exception as e:
+            print(f"Build cache unavailable, doing a full build: {e}")
+            build_cache = None
+
+    if run_make(project) != 0:
+        return -1
+
+    if build_cache is not None:
+        try:
+            build_cache.store()
+
+        except Exception as e:
+            print(f"Failed to update the build cache: {e}")
+
+    return 0
+
+
+def build_dotnetsnes(project: Path) -> int:
+    """
+    Build a DotnetSnes project.
+
+    Args:
+        project: The project directory
+
+    Returns:
+        int: 0 on success, -1 on failure
+    """
+
+    setup_dotnetsnes_env()
+
+    return run_make(project)
+
+
+def find_javasnes_jar(project: Path) -> "Path|None":
+    """
+    Find the JAR output of a JavaSnes project.
+
+    Args:
+        project: The JAR itself or the directory containing exactly one JAR
+
+    Returns:
+        Path|None: The JAR, or None if there is none or several
+    """
+
+    if project.suffix == ".jar":
+        return project if project.exists() else None
+
+    jars: List[Path] = sorted(project.glob("*.jar"))
+
+    return jars[0] if len(jars) == 1 else None
+
+
+def build_javasnes(project: Path) -> int:
+    """
+    Run a JavaSnes project's JAR to generate its output directory, then build it.
+
+    Args:
+        project: The project's JAR, or the directory containing it
+
+    Returns:
+        int: 0 on success, -1 on failure
+    """
+
+    java_home: Path = setup_javasnes_env()
+    javasnes_proj_jar: "Path|None" = find_javasnes_jar(project)
+
+    if javasnes_proj_jar is None:
+        print("No JAR file to build project found, exiting...")
+        return -1
+
+    javasnes_proj: Path = javasnes_proj_jar.parent
+
+    try:
+        subprocess.run(
+            [
+                str(java_home / ("java" if os.name == "posix" else "java.exe")),
+                "-jar", str(javasnes_proj_jar)
+            ],
+            cwd=javasnes_proj, env=os.environ, check=True
+        )
+
+    except subprocess.CalledProcessError as e:
+        print(f"Error while building javasnes project: {e}")
+        return -1
+
+    except Exception as e:
+        print(f"Unknown error while building java project: {e}")
+        return -1
+
+    if not (javasnes_proj / "output").exists():
+        print("No output path found, exiting...")
+        return -1
+
+    return run_make(javasnes_proj / "output")
+
+
+TOOLCHAINS: Dict[str, Callable[[Path], int]] = {
+    "pvsneslib": build_pvsneslib,
+    "dotnetsnes": build_dotnetsnes,
+    "javasnes": build_javasnes,
+}
+
+
+def detect_toolchain(project: Path) -> "str|None":
+    """
+    Guess the toolchain of a project from its files.
+
+    Args:
+        project: The project directory or JavaSnes JAR
+
+    Returns:
+        str|None: A key of TOOLCHAINS, or None if unknown
+    """
+
+    if find_javasnes_jar(project) is not None:
+        return "javasnes"
+
+    if not project.is_dir():
+        return None
+
+    if any(project.glob("*.csproj")):
+        return "dotnetsnes"
+
+    if (project / "Makefile").exists():
+        return "pvsneslib"
+
+    return None
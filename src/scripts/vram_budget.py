@@ -0,0 +1,434 @@
+"""
+SNES-IDE - vram_budget.py
+Copyright (C) 2025 BrunoRNS
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from typing import Dict, List, Set, Tuple
+from pathlib import Path
+import argparse
+import sys
+
+import numpy as np
+
+
+VRAM_BYTES: int = 64 * 1024
+
+# A 32x32 screen of map entries.
+SCREEN_BYTES: int = 2048
+
+# Color depth of the background layers of the BG modes gfx4snes converts
+# for (-M); 9 is counted like mode 1.
+BG_MODE_LAYERS: Dict[str, Tuple[int, ...]] = {
+    "1": (4, 4, 2),
+    "5": (4, 2),
+    "6": (4,),
+    "7": (8,),
+    "9": (4, 4, 2),
+}
+
+# Mode 7 tiles and its 128x128 map share the first 32 KB of VRAM.
+MODE7_MAX_TILES: int = 256
+MODE7_MAP_BYTES: int = 128 * 128
+
+MAX_TILES: int = 1024
+
+
+class Asset:
+    """The converted data of one image: tiles, and optionally map and palette."""
+
+    def __init__(self, name: str, pic: bytes, tilemap: "bytes|None" = None,
+                 pal: "bytes|None" = None, bits_per_pixel: int = 4) -> None:
+        """
+        Initialize an asset.
+
+        Args:
+            name: Name shown in reports
+            pic: Planar tile data (.pic)
+            tilemap: Map entries (.map), if any
+            pal: Palette (.pal), if any
+            bits_per_pixel: Depth of the tiles, 2, 4 or 8
+        """
+
+        self.name: str = name
+        self.pic: bytes = pic
+        self.tilemap: "bytes|None" = tilemap
+        self.pal: "bytes|None" = pal
+        self.bits_per_pixel: int = bits_per_pixel
+
+    @property
+    def tile_bytes(self) -> int:
+        """Size of one tile."""
+
+        return 8 * self.bits_per_pixel
+
+    @property
+    def tile_count(self) -> int:
+        """Number of tiles in pic."""
+
+        return len(self.pic) // self.tile_bytes
+
+    @classmethod
+    def from_files(cls, pic: Path, bits_per_pixel: int = 4) -> "Asset":
+        """
+        Load the .pic of a conversion and the .map and .pal next to it.
+
+        The depth is deduced from the map when the tile numbers it uses are
+        consecutive (the usual reduced map), otherwise bits_per_pixel is used.
+
+        Args:
+            pic: The .pic file
+            bits_per_pixel: Depth to use when it cannot be deduced
+
+        Returns:
+            Asset: The loaded data
+
+        Raises:
+            ValueError: If the .map is too short to hold a tile entry
+        """
+
+        tilemap: "bytes|None" = pic.with_suffix(".map").read_bytes() if pic.with_suffix(".map").exists() else None
+        pal: "bytes|None" = pic.with_suffix(".pal").read_bytes() if pic.with_suffix(".pal").exists() else None
+
+        data: bytes = pic.read_bytes()
+
+        if tilemap:
+            numbers: np.ndarray = np.unique(np.frombuffer(tilemap[:len(tilemap) & ~1], dtype="<u2") & 0x3FF)
+
+            if not len(numbers):
+                raise ValueError(f"{pic.with_suffix('.map').name} is {len(tilemap)} byte, too short for a tile entry")
+
+            if len(numbers) == numbers[-1] - numbers[0] + 1 and len(data) % len(numbers) == 0:
+                bits_per_pixel = {16: 2, 32: 4, 64: 8}.get(len(data) // len(numbers), bits_per_pixel)
+
+        return cls(str(pic), data, tilemap, pal, bits_per_pixel)
+
+
+class AssetReport:
+    """Tile, palette and VRAM usage of one asset."""
+
+    def __init__(self, asset: Asset) -> None:
+        """
+        Initialize an empty report, filled by analyze.
+
+        Args:
+            asset: The analysed asset
+        """
+
+        self.asset: Asset = asset
+        self.unique_tiles: int = 0
+        self.shared_tiles: int = 0
+        self.palette_slots: Set[int] = set()
+        self.palette_colors: int = 0
+        self.vram: Dict[str, "int|None"] = {}
+
+    @property
+    def duplicate_tiles(self) -> int:
+        """Tiles of pic equal to an earlier tile of the same asset."""
+
+        return self.asset.tile_count - self.unique_tiles
+
+
+class BudgetReport:
+    """Usage of a set of assets, and the tiles they have in common."""
+
+    def __init__(self, assets: List[AssetReport]) -> None:
+        """
+        Initialize a report, filled by analyze.
+
+        Args:
+            assets: The report of every asset
+        """
+
+        self.assets: List[AssetReport] = assets
+        self.unique_tiles: int = 0
+        self.shared_tiles: int = 0
+        self.shared_bytes: int = 0
+        self.palette_slots: Dict[int, List[str]] = {}
+
+    def total_vram(self, mode: str) -> "int|None":
+        """VRAM needed by all the assets in a BG mode, None if one does not fit it."""
+
+        sizes: List["int|None"] = [report.vram[mode] for report in self.assets]
+
+        if None in sizes:
+            return None
+
+        if mode != "7":
+            return sum(sizes)
+
+        # Mode 7 has a single map and room for 256 tiles.
+        tiles: int = sum(report.unique_tiles for report in self.assets)
+        has_map: bool = any(report.asset.tilemap for report in self.assets)
+
+        return None if tiles > MODE7_MAX_TILES else tiles * 64 + (MODE7_MAP_BYTES if has_map else 0)
+
+
+def vram_footprint(asset: Asset, unique_tiles: int, mode: str) -> "int|None":
+    """
+    VRAM taken by the deduplicated tiles and the map of an asset in a BG mode.
+
+    The tiles are counted at the smallest layer depth of the mode able to
+    show them, maps by whole 32x32 screens.
+
+    Args:
+        asset: The asset
+        unique_tiles: Its number of distinct tiles
+        mode: A key of BG_MODE_LAYERS
+
+    Returns:
+        int|None: Bytes, or None if no layer of the mode can hold the asset
+    """
+
+    map_entries: int = len(asset.tilemap) // 2 if asset.tilemap else 0
+
+    if mode == "7":
+        if unique_tiles > MODE7_MAX_TILES or map_entries > MODE7_MAP_BYTES:
+            return None
+
+        return unique_tiles * 64 + (MODE7_MAP_BYTES if map_entries else 0)
+
+    depths: List[int] = [depth for depth in BG_MODE_LAYERS[mode] if depth >= asset.bits_per_pixel]
+
+    if not depths or unique_tiles > MAX_TILES:
+        return None
+
+    screens: int = -(-map_entries * 2 // SCREEN_BYTES)
+
+    return unique_tiles * 8 * min(depths) + screens * SCREEN_BYTES
+
+
+def analyze(assets: List[Asset]) -> BudgetReport:
+    """
+    Measure the tiles, palettes and VRAM used by assets.
+
+    All the tiles of a depth are hashed in one table, giving at once the
+    distinct tiles of every asset and the tiles found in several assets.
+
+    Args:
+        assets: The assets to analyse
+
+    Returns:
+        BudgetReport: The usage of every asset and of the whole set
+    """
+
+    reports: List[AssetReport] = [AssetReport(asset) for asset in assets]
+    budget: BudgetReport = BudgetReport(reports)
+
+    for depth in sorted({asset.bits_per_pixel for asset in assets}):
+        members: List[int] = [index for index, asset in enumerate(assets) if asset.bits_per_pixel == depth]
+        tile_bytes: int = 8 * depth
+
+        tiles: np.ndarray = np.concatenate([
+            np.frombuffer(assets[index].pic[:assets[index].tile_count * tile_bytes], dtype=np.uint8)
+            for index in members
+        ]).reshape(-1, tile_bytes)
+
+        owners: np.ndarray = np.repeat(np.arange(len(members)), [assets[index].tile_count for index in members])
+
+        if not len(tiles):
+            continue
+
+        _, tile_ids = np.unique(tiles.view(np.dtype((np.void, tile_bytes))).ravel(), return_inverse=True)
+        tile_ids = tile_ids.ravel()
+
+        # Distinct (asset, tile) pairs: their count per asset is the number of
+        # distinct tiles of the asset, their count per tile the number of
+        # assets containing it.
+        pairs: np.ndarray = np.unique(tile_ids * len(members) + owners)
+        pair_tiles: np.ndarray = pairs // len(members)
+        pair_owners: np.ndarray = pairs % len(members)
+
+        unique_per_asset: np.ndarray = np.bincount(pair_owners, minlength=len(members))
+        assets_per_tile: np.ndarray = np.bincount(pair_tiles)
+        shared: np.ndarray = assets_per_tile[pair_tiles] > 1
+
+        shared_per_asset: np.ndarray = np.bincount(pair_owners[shared], minlength=len(members))
+
+        for position, index in enumerate(members):
+            reports[index].unique_tiles = int(unique_per_asset[position])
+            reports[index].shared_tiles = int(shared_per_asset[position])
+
+        budget.unique_tiles += int(np.count_nonzero(assets_per_tile))
+        budget.shared_tiles += int(np.count_nonzero(assets_per_tile > 1))
+        budget.shared_bytes += int((assets_per_tile[assets_per_tile > 1] - 1).sum()) * tile_bytes
+
+    for report in reports:
+        asset: Asset = report.asset
+
+        for mode in BG_MODE_LAYERS:
+            report.vram[mode] = vram_footprint(asset, report.unique_tiles, mode)
+
+        if asset.pal is not None:
+            report.palette_colors = len(asset.pal) // 2
+
+        if asset.tilemap and asset.bits_per_pixel < 8:
+            entries: np.ndarray = np.frombuffer(asset.tilemap[:len(asset.tilemap) & ~1], dtype="<u2")
+            report.palette_slots = {int(slot) for slot in np.unique((entries >> 10) & 7)}
+
+        for slot in report.palette_slots:
+            budget.palette_slots.setdefault(slot, []).append(asset.name)
+
+    return budget
+
+
+def format_size(size: "int|None") -> str:
+    """Format a VRAM size in KB, or '-' when it does not fit."""
+
+    return "-" if size is None else f"{size / 1024:.1f}K"
+
+
+def format_report(budget: BudgetReport) -> List[str]:
+    """
+    Format a budget report as table lines.
+
+    Args:
+        budget: The report
+
+    Returns:
+        List[str]: The lines, without line ends
+    """
+
+    modes: List[str] = list(BG_MODE_LAYERS)
+
+    lines: List[str] = [
+        f"{'bpp':>3} {'tiles':>6} {'unique':>6} {'dup':>5} {'shared':>6} {'palettes':<10} "
+        + " ".join(f"{'M' + mode:>7}" for mode in modes) + "  file"
+    ]
+
+    for report in budget.assets:
+        slots: str = ",".join(str(slot) for slot in sorted(report.palette_slots)) or "-"
+
+        lines.append(
+            f"{report.asset.bits_per_pixel:>3} {report.asset.tile_count:>6} {report.unique_tiles:>6} "
+            f"{report.duplicate_tiles:>5} {report.shared_tiles:>6} {slots:<10} "
+            + " ".join(f"{format_size(report.vram[mode]):>7}" for mode in modes)
+            + f"  {report.asset.name}"
+        )
+
+    lines.append(
+        f"{len(budget.assets)} assets, {budget.unique_tiles} distinct tiles, "
+        f"{budget.shared_tiles} found in several assets ({budget.shared_bytes} B loaded more than once)"
+    )
+
+    for mode in modes:
+        total: "int|None" = budget.total_vram(mode)
+
+        if total is not None:
+            lines.append(
+                f"Mode {mode}: {format_size(total)} of {format_size(VRAM_BYTES)} VRAM"
+                + (" - OVER BUDGET" if total > VRAM_BYTES else "")
+            )
+
+    for slot, names in sorted(budget.palette_slots.items()):
+        if len(names) > 1:
+            lines.append(f"Palette slot {slot} used by {len(names)} assets: {', '.join(names)}")
+
+    return lines
+
+
+def collect_assets(paths: List[Path], bits_per_pixel: int = 4) -> List[Asset]:
+    """
+    Load the .pic files given, and those of the directories given.
+
+    Args:
+        paths: .pic files and directories, searched recursively
+        bits_per_pixel: Depth of the tiles that cannot be deduced
+
+    Returns:
+        List[Asset]: The assets, in path order
+
+    Raises:
+        ValueError: If a .map is truncated
+    """
+
+    pics: List[Path] = []
+
+    for path in paths:
+        if path.is_dir():
+            pics += [
+                pic for pic in sorted(path.rglob("*.pic"))
+                if not any(part.startswith(".") for part in pic.relative_to(path).parts)
+            ]
+
+        elif path.suffix == ".pic":
+            pics.append(path)
+
+    return [Asset.from_files(pic, bits_per_pixel) for pic in pics]
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    """
+    Parse the arguments of the VRAM budget report.
+
+    Args:
+        argv: The command line arguments
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        prog="snes-ide vram",
+        description="Report the tiles, palettes and VRAM used by converted graphics."
+    )
+
+    parser.add_argument("paths", type=Path, nargs="+", help=".pic files or directories containing them")
+    parser.add_argument(
+        "--bpp", type=int, choices=(2, 4, 8), default=4,
+        help="depth of the tiles when it cannot be deduced from a map (default 4)"
+    )
+
+    return parser.parse_args(argv)
+
+
+def main(argv: "List[str]|None" = None) -> int:
+    """
+    Print the VRAM budget of converted graphics.
+
+    Args:
+        argv: The command line arguments, defaults to sys.argv[1:]
+
+    Returns:
+        int: 0 if the assets fit the VRAM of a BG mode, -1 otherwise
+    """
+
+    args: argparse.Namespace = parse_args(sys.argv[1:] if argv is None else argv)
+
+    try:
+        assets: List[Asset] = collect_assets(args.paths, args.bpp)
+
+    except (OSError, ValueError) as e:
+        print(f"Could not read the converted graphics: {e}")
+        return -1
+
+    if not assets:
+        print("No .pic file found")
+        return -1
+
+    budget: BudgetReport = analyze(assets)
+
+    print("\n".join(format_report(budget)))
+
+    fits: bool = any(
+        total is not None and total <= VRAM_BYTES
+        for total in (budget.total_vram(mode) for mode in BG_MODE_LAYERS)
+    )
+
+    return 0 if fits else -1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+"""
+SNES-IDE - watch-proj.py
+Copyright (C) 2025 BrunoRNS
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from typing_extensions import NoReturn
+from pathlib import Path
+
+from get_file_path import get_file_path
+from toolchains import detect_toolchain
+from watch_cli import watch
+
+
+def main() -> NoReturn:
+    """Main logic of the watch mode: rebuild and reopen the ROM on every change"""
+
+    project: Path = Path(str(get_file_path(
+        "Select project directory to watch", file_types=[("Directories", "*")],
+        multiple=False, directory=True
+    )))
+
+    toolchain: "str|None" = detect_toolchain(project)
+
+    if toolchain is None:
+        print("No PvSnesLib, DotnetSnes or JavaSnes project found, exiting...")
+        exit(-1)
+
+    exit(watch(project, toolchain))
+
+
+if __name__ == "__main__":
+    main()
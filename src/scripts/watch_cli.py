@@ -0,0 +1,240 @@
+"""
+SNES-IDE - watch_cli.py
+Copyright (C) 2025 BrunoRNS
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from typing import Callable, List, Set, Tuple
+from pathlib import Path
+import argparse
+import signal
+import sys
+
+from toolchains import TOOLCHAINS, detect_toolchain, setup_pvsneslib_env
+from project_watcher import create_watcher, is_hidden, wait_for_changes
+from emulator import EmulatorSession
+from build_cache import BuildCache
+
+
+DEFAULT_DEBOUNCE: float = 0.3
+
+OUTPUT_DIRS: Tuple[str, ...] = ("bin", "obj", "output")
+OUTPUT_SUFFIXES: Tuple[str, ...] = (
+    ".obj", ".ps", ".asp", ".dbg", ".sfc", ".sym", ".pic", ".pal", ".map", ".brr"
+)
+
+
+def get_watch_root(project: Path) -> Path:
+    """The directory watched for a project directory or JavaSnes JAR."""
+
+    return project if project.is_dir() else project.parent
+
+
+def source_filter(project: Path, toolchain: str) -> Callable[[Set[Path]], Set[Path]]:
+    """
+    Get a function that drops the paths written by the build from a batch of changes.
+
+    PvSnesLib projects use the output groups of the build cache; the other
+    toolchains generate their C and ROM under bin, obj or output.
+
+    Args:
+        project: The project directory or JavaSnes JAR
+        toolchain: A key of TOOLCHAINS
+
+    Returns:
+        Callable[[Set[Path]], Set[Path]]: Keeps the changed sources of a batch
+    """
+
+    root: Path = get_watch_root(project).resolve()
+
+    if toolchain == "pvsneslib":
+        build_cache: BuildCache = BuildCache(root, setup_pvsneslib_env())
+
+        def pvsneslib_sources(changed: Set[Path]) -> Set[Path]:
+            # Deleted outputs are not listed anymore, but their suffix still tells.
+            files: List[Path] = build_cache.project_files() + sorted(changed)
+
+            return changed - build_cache.generated_files(files)
+
+        return pvsneslib_sources
+
+    def is_output(path: Path) -> bool:
+        if path.name == "linkfile" or path.suffix in OUTPUT_SUFFIXES:
+            return True
+
+        try:
+            return any(part in OUTPUT_DIRS for part in path.relative_to(root).parts)
+
+        except ValueError:
+            return False
+
+    def sources(changed: Set[Path]) -> Set[Path]:
+        return {path for path in changed if not is_output(path)}
+
+    return sources
+
+
+def find_rom(project: Path) -> "Path|None":
+    """
+    Find the most recently built ROM of a project.
+
+    Args:
+        project: The project directory or JavaSnes JAR
+
+    Returns:
+        Path|None: The newest .sfc file, or None if there is none
+    """
+
+    root: Path = get_watch_root(project)
+
+    roms: List[Path] = [
+        rom for rom in root.rglob("*.sfc") if not is_hidden(root, rom)
+    ]
+
+    return max(roms, key=lambda rom: rom.stat().st_mtime) if roms else None
+
+
+def watch(project: Path, toolchain: str, launch: bool = True,
+          debounce: float = DEFAULT_DEBOUNCE) -> int:
+    """
+    Rebuild a project whenever its sources change and reopen the ROM.
+
+    Make only reruns the rules whose inputs changed: the build cache removes
+    the outputs of changed groups and keeps every other one up to date.
+
+    Args:
+        project: The project directory or JavaSnes JAR
+        toolchain: A key of TOOLCHAINS
+        launch: Whether to open the ROM in the emulator after each build
+        debounce: Quiet period, in seconds, before a batch of changes is built
+
+    Returns:
+        int: 0 when stopped
+    """
+
+    build: Callable[[Path], int] = TOOLCHAINS[toolchain]
+    sources: Callable[[Set[Path]], Set[Path]] = source_filter(project, toolchain)
+
+    watcher = create_watcher(get_watch_root(project))
+    session: EmulatorSession = EmulatorSession()
+
+    # The Jobs panel stops scripts with SIGTERM, killing them only if they are
+    # still running after a grace period; close the emulator before exiting.
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    print(f"Watching {get_watch_root(project)} ({toolchain}), press Ctrl+C to stop", flush=True)
+
+    try:
+        while True:
+            if build(project) == 0:
+                rom: "Path|None" = find_rom(project)
+
+                if rom is None:
+                    print("Build succeeded but no ROM was found")
+
+                elif launch:
+                    print(f"Opening {rom.name}...")
+                    session.launch(rom)
+
+            else:
+                print("Build failed, waiting for changes...")
+
+            sys.stdout.flush()
+
+            changed: Set[Path] = set()
+
+            while not changed:
+                changed = sources(wait_for_changes(watcher, debounce))
+
+            print("Changed: " + ", ".join(sorted(
+                path.name for path in changed
+            )), flush=True)
+
+    except KeyboardInterrupt:
+        pass
+
+    finally:
+        session.stop()
+        watcher.close()
+
+    return 0
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    """
+    Parse the arguments of the watch command.
+
+    Args:
+        argv: The arguments after "watch"
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        prog="snes-ide watch",
+        description="Rebuild a SNES project on every change and reopen the ROM."
+    )
+
+    parser.add_argument(
+        "project", type=Path,
+        help="project directory (or the JAR output of a JavaSnes project)"
+    )
+    parser.add_argument(
+        "--toolchain", choices=sorted(TOOLCHAINS),
+        help="toolchain of the project, detected from its files by default"
+    )
+    parser.add_argument(
+        "--no-emulator", action="store_true",
+        help="only rebuild, do not open the ROM"
+    )
+    parser.add_argument(
+        "--debounce", type=float, default=DEFAULT_DEBOUNCE,
+        help=f"seconds without changes before rebuilding (default {DEFAULT_DEBOUNCE})"
+    )
+
+    return parser.parse_args(argv)
+
+
+def main(argv: "List[str]|None" = None) -> int:
+    """
+    Watch a project from the command line.
+
+    Args:
+        argv: The arguments after "watch", defaults to sys.argv[1:]
+
+    Returns:
+        int: 0 when stopped, -1 on failure
+    """
+
+    args: argparse.Namespace = parse_args(sys.argv[1:] if argv is None else argv)
+
+    project: Path = args.project.resolve()
+
+    if not project.exists():
+        print(f"Project not found: {project}")
+        return -1
+
+    toolchain: "str|None" = args.toolchain or detect_toolchain(project)
+
+    if toolchain is None:
+        print(f"Could not detect the toolchain of {project}, use --toolchain")
+        return -1
+
+    return watch(project, toolchain, not args.no_emulator, args.debounce)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,33 +16,179 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import sys
+
+# Command line tools of scripts/, run headless before any Qt module is imported.
+HEADLESS_COMMANDS = {
+    "build": "build_cli",
+    "watch": "watch_cli",
+    "gfx-batch": "gfx_batch",
+    "vram": "vram_budget",
+    "tileset": "shared_tileset",
+    "lz77": "lz77",
+    "brr-batch": "brr_batch",
+    "brr": "brr_codec",
+    "aram": "aram_planner",
+    "synth": "sample_synth",
+    "samples": "sample_catalogue",
+}
+
+if __name__ == "__main__" and len(sys.argv) > 1 and sys.argv[1] in HEADLESS_COMMANDS:
+    from pathlib import Path
+    import importlib
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+
+    sys.exit(importlib.import_module(HEADLESS_COMMANDS[sys.argv[1]]).main(sys.argv[2:]))
+
 from PySide6.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QWidget
-from PySide6.QtCore import QObject, Slot, Signal, QUrl, QProcess
+from PySide6.QtCore import (
+    QObject, Slot, Signal, QUrl, QProcess, QProcessEnvironment, QTimer
+)
 from PySide6.QtWebEngineWidgets import QWebEngineView
 from PySide6.QtWebChannel import QWebChannel
 
 from typing_extensions import NoReturn, Any
+from typing import Deque, Dict, List, Tuple
+from collections import deque
 from pathlib import Path
-import sys
+import codecs
+import json
+import time
+
+
+class ScriptJob:
+    """Book-keeping of one script run by the ScriptRunner."""
+
+    STARTING: str = "starting"
+    RUNNING: str = "running"
+    FINISHED: str = "finished"
+    FAILED: str = "failed"
+    CRASHED: str = "crashed"
+
+    MAX_LOG_LINES: int = 5000
+    MAX_LINE_LENGTH: int = 4096
+
+    def __init__(self, job_id: int, script_name: str) -> None:
+        """
+        Initialize a job that has not been started yet.
+
+        :param job_id: Unique id of the job inside its ScriptRunner.
+        :param script_name: The name of the script run by the job.
+        :return: None
+        """
+
+        self.job_id: int = job_id
+        self.script_name: str = script_name
+        self.process: "QProcess|None" = None
+        self.state: str = self.STARTING
+        self.started_at: float = time.time()
+        self.finished_at: "float|None" = None
+        self.exit_code: "int|None" = None
+
+        self.log: Deque[Tuple[str, str]] = deque(maxlen=self.MAX_LOG_LINES)
+        self.last_error: str = ""
+        self.decoders: Dict[str, Any] = {
+            stream: codecs.getincrementaldecoder("utf-8")(errors="replace")
+            for stream in ("stdout", "stderr")
+        }
+        self.pending: Dict[str, str] = {"stdout": "", "stderr": ""}
+
+    def feed(self, stream: str, data: bytes, final: bool = False) -> List[str]:
+        """
+        Decode a chunk of process output and split it into complete lines.
+
+        Bytes of a multi-byte character split across chunks and the text after
+        the last newline are kept until the next chunk, or flushed when final
+        is set. Every complete line is also stored in the job's bounded log.
+
+        :param stream: Either "stdout" or "stderr".
+        :param data: The raw bytes read from the process.
+        :param final: Whether this is the last chunk of the stream.
+        :return: The complete lines, without line terminators.
+        """
+
+        text: str = self.pending[stream] + \
+            self.decoders[stream].decode(data, final=final)
+
+        lines: List[str] = text.split("\n")
+        rest: str = "" if final else lines.pop()
+
+        while len(rest) > self.MAX_LINE_LENGTH:
+            lines.append(rest[:self.MAX_LINE_LENGTH])
+            rest = rest[self.MAX_LINE_LENGTH:]
+
+        self.pending[stream] = rest
+
+        if final and lines and lines[-1] == "":
+            lines.pop()
+
+        lines = [line.rstrip("\r") for line in lines]
+
+        for line in lines:
+            self.log.append((stream, line))
+
+        if stream == "stderr" and lines:
+            self.last_error = lines[-1]
+
+        return lines
+
+    def is_active(self) -> bool:
+        """Whether the job's process is still starting or running."""
+
+        return self.state in (self.STARTING, self.RUNNING)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert job to dictionary representation."""
+
+        return {
+            'id': self.job_id,
+            'script': self.script_name,
+            'state': self.state,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'exit_code': self.exit_code
+        }
 
 
 class ScriptRunner(QObject):
 
     scriptExecuted: Signal = Signal(str, str)
+    scriptOutput: Signal = Signal(int, str, str)
+    jobStarted: Signal = Signal(int, str)
+    jobFinished: Signal = Signal(int, str, int, str)
 
-    def __init__(self) -> None:
+    MAX_WORKER_FAILURES: int = 3
+    MAX_JOB_HISTORY: int = 100
+
+    # Time a stopped job gets to clean up (a watcher closes its emulator,
+    # which itself gets 3 s) before it is killed.
+    KILL_GRACE_MS: int = 5000
+
+    def __init__(self, warm_workers: int = 1) -> None:
         """
         Initializes the ScriptRunner object.
 
         Sets the path of the scripts directory to the directory containing the
         executable or script, depending on whether the script is frozen (PyInstaller)
-        or not.
+        or not, and starts the pool of warm script host workers.
 
+        :param warm_workers: Number of pre-started workers kept waiting for a script.
         :return: None
         """
 
         super().__init__()
         self.scripts_dir: Path = self.get_executable_path() / "scripts"
+        self.host_path: Path = self.get_executable_path() / "script_host.py"
+
+        self.warm_workers: int = warm_workers if self.host_path.exists() else 0
+        self.idle_workers: List[QProcess] = []
+        self.worker_failures: int = 0
+
+        self.jobs: Dict[int, ScriptJob] = {}
+        self.next_job_id: int = 1
+
+        self.fill_worker_pool()
 
     @staticmethod
     def get_executable_path() -> Path:
@@ -59,111 +205,407 @@ class ScriptRunner(QObject):
             print("Python script path mode chosen")
             return Path(__file__).resolve().parent
 
-    @Slot(str)
-    def run_script(self, script_name: str) -> None:
+    def spawn_worker(self) -> None:
         """
-        Execute a Python script from the scripts directory.
+        Start a script host worker that pre-imports PySide6 and waits for a request.
 
-        This slot is connected to the run_script method which takes a script name
-        as a parameter and executes it using the subprocess module.
+        :return: None
+        """
+
+        worker: QProcess = QProcess()
+        worker.setProcessEnvironment(self.script_environment())
+        worker.setWorkingDirectory(str(self.scripts_dir))
+        worker.finished.connect(self.handle_worker_exited)
+        worker.start(sys.executable, ['-s', str(self.host_path)])
+
+        self.idle_workers.append(worker)
+
+    @staticmethod
+    def script_environment() -> QProcessEnvironment:
+        """
+        Environment of the script processes, unbuffered so output streams live.
+
+        :return: The process environment.
+        """
+
+        env: QProcessEnvironment = QProcessEnvironment.systemEnvironment()
+        env.insert("PYTHONUNBUFFERED", "1")
+
+        return env
+
+    def fill_worker_pool(self) -> None:
+        """
+        Top up the pool of idle workers, unless they keep dying before being used.
 
-        :param script_name: The name of the script to execute.
         :return: None
         """
 
-        try:
-            script_path: Path = self.scripts_dir / script_name
+        if self.worker_failures >= self.MAX_WORKER_FAILURES:
+            return
+
+        while len(self.idle_workers) < self.warm_workers:
+            self.spawn_worker()
+
+    def take_worker(self) -> "QProcess|None":
+        """
+        Hand out a running idle worker, or None if the pool is empty.
+
+        :return: The worker process, detached from the pool.
+        """
+
+        while self.idle_workers:
+            worker: QProcess = self.idle_workers.pop(0)
+            worker.finished.disconnect(self.handle_worker_exited)
+
+            if worker.state() != QProcess.ProcessState.NotRunning:
+                return worker
+
+        return None
+
+    def handle_worker_exited(self, exit_code: int, _: Any) -> None:
+        """
+        Handle an idle worker that exited before receiving a script.
+
+        The worker is dropped from the pool and replaced. After too many
+        consecutive failures the pool is disabled and scripts are started cold.
+
+        :param exit_code: The exit code of the worker.
+        :param _: Unused parameter.
+        :return: None
+        """
+
+        worker: Any = self.sender()
+
+        if worker in self.idle_workers:
+            self.idle_workers.remove(worker)
+
+        self.worker_failures += 1
+        print(f"Script host worker exited while idle with code {exit_code}")
+
+        self.fill_worker_pool()
+
+    def shutdown(self) -> None:
+        """
+        Stop the idle workers; closing their stdin makes them exit cleanly.
+
+        :return: None
+        """
+
+        self.warm_workers = 0
+
+        while self.idle_workers:
+            worker: QProcess = self.idle_workers.pop(0)
+            worker.finished.disconnect(self.handle_worker_exited)
+            worker.closeWriteChannel()
+
+            if not worker.waitForFinished(1000):
+                worker.kill()
+
+    def create_process(self, job: ScriptJob) -> None:
+        """
+        Attach a process to the job and route its signals to the job handlers.
+
+        A warm script host worker is used when available, otherwise a fresh
+        interpreter is started for the script.
+
+        :param job: The job that will own the process.
+        :return: None
+        """
 
-            if script_path.exists():
-                self.process = QProcess()
+        job_id: int = job.job_id
+        script_path: Path = self.scripts_dir / job.script_name
+        worker: "QProcess|None" = self.take_worker()
 
-                self.process.readyReadStandardOutput.connect(
-                    self.handle_stdout)
-                self.process.readyReadStandardError.connect(self.handle_stderr)
-                self.process.finished.connect(self.handle_finished)
+        job.process = worker if worker is not None else QProcess()
 
-                self.process.setWorkingDirectory(str(self.scripts_dir))
-                self.process.start(sys.executable, ['-s', str(script_path)])
-                self.current_script = script_name
+        job.process.readyReadStandardOutput.connect(
+            lambda: self.handle_stdout(job_id))
+        job.process.readyReadStandardError.connect(
+            lambda: self.handle_stderr(job_id))
+        job.process.finished.connect(
+            lambda exit_code, status: self.handle_finished(job_id, exit_code, status))
+        job.process.errorOccurred.connect(
+            lambda error: self.handle_error(job_id, error))
 
-            else:
+        job.state = ScriptJob.RUNNING
+
+        if worker is not None:
+            request: str = json.dumps({"script": str(script_path)})
+            worker.write((request + "\n").encode("utf-8"))
+            worker.closeWriteChannel()
+            self.worker_failures = 0
+            self.fill_worker_pool()
+
+        else:
+            job.process.setProcessEnvironment(self.script_environment())
+            job.process.setWorkingDirectory(str(self.scripts_dir))
+            job.process.start(sys.executable, ['-s', str(script_path)])
+
+    def prune_jobs(self) -> None:
+        """
+        Forget the oldest finished jobs once the history grows past MAX_JOB_HISTORY.
+
+        :return: None
+        """
+
+        done: List[int] = [
+            job_id for job_id, job in self.jobs.items() if not job.is_active()
+        ]
+
+        for job_id in done[:max(0, len(done) - self.MAX_JOB_HISTORY)]:
+            del self.jobs[job_id]
+
+    @Slot(str, result=int)
+    def run_script(self, script_name: str) -> int:
+        """
+        Execute a Python script from the scripts directory as a new job.
+
+        Every call gets its own job and process, so several scripts can run at
+        the same time. The script runs in a warm script host worker, or in a
+        fresh interpreter when no worker is available.
+
+        :param script_name: The name of the script to execute.
+        :return: The id of the new job, or -1 if it could not be started.
+        """
+
+        try:
+            script_path: Path = self.scripts_dir / script_name
+
+            if not script_path.exists():
                 self.scriptExecuted.emit(
                     script_name, f"Script not found: {script_path}")
+                return -1
+
+            job: ScriptJob = ScriptJob(self.next_job_id, script_name)
+            self.next_job_id += 1
+
+            self.jobs[job.job_id] = job
+            self.prune_jobs()
+
+            self.create_process(job)
+            self.jobStarted.emit(job.job_id, script_name)
+
+            return job.job_id
 
         except Exception as e:
             self.scriptExecuted.emit(script_name, f"Exception: {str(e)}")
+            return -1
 
-    @Slot(str)
-    def runScript(self, scriptName: str) -> None:
+    @Slot(str, result=int)
+    def runScript(self, scriptName: str) -> int:
         """
         Execute a Python script from the scripts directory.
 
         This slot is connected to the run_script method which takes a script name
-        as a parameter and executes it using the subprocess module.
+        as a parameter and executes it as a new job.
 
         :param scriptName: The name of the script to execute.
+        :return: The id of the new job, or -1 if it could not be started.
+        """
+
+        return self.run_script(scriptName)
+
+    @Slot(result=str)
+    def listJobs(self) -> str:
+        """
+        Describe every known job for the web UI.
+
+        :return: JSON list of the jobs, oldest first.
+        """
+
+        return json.dumps([job.to_dict() for job in self.jobs.values()])
+
+    @Slot(int, result=bool)
+    def killJob(self, jobId: int) -> bool:
+        """
+        Stop the process of a running job.
+
+        The process is asked to terminate (SIGTERM, WM_CLOSE on Windows) so it
+        can clean up, and killed if it is still running after KILL_GRACE_MS.
+        The GUI is not blocked meanwhile.
+
+        :param jobId: The id of the job to kill.
+        :return: True if the job was running and got stopped, False otherwise.
+        """
+
+        job: "ScriptJob|None" = self.jobs.get(jobId)
+
+        if job is None or not job.is_active() or job.process is None:
+            return False
+
+        process: QProcess = job.process
+        process.terminate()
+
+        def kill_if_running() -> None:
+            if job.process is process and process.state() != QProcess.ProcessState.NotRunning:
+                process.kill()
+
+        QTimer.singleShot(self.KILL_GRACE_MS, kill_if_running)
+        return True
+
+    @Slot()
+    def clearFinishedJobs(self) -> None:
+        """
+        Drop every job that is no longer running from the job table.
+
         :return: None
         """
 
-        self.run_script(scriptName)
+        for job_id in [
+            job_id for job_id, job in self.jobs.items() if not job.is_active()
+        ]:
+            del self.jobs[job_id]
 
-    def handle_stdout(self):
+    @Slot(int, result=str)
+    def getJobLog(self, jobId: int) -> str:
         """
-        Handle standard output from the subprocess.
+        Get the buffered output of a job, e.g. when the UI selects it late.
+
+        :param jobId: The id of the job.
+        :return: JSON list of [stream, line] pairs, oldest first.
+        """
+
+        job: "ScriptJob|None" = self.jobs.get(jobId)
+
+        return json.dumps(list(job.log) if job is not None else [])
+
+    def emit_output(self, job: ScriptJob, stream: str, data: bytes, final: bool = False) -> None:
+        """
+        Split output of a job into lines and stream them to the web UI.
+
+        :param job: The job that produced the output.
+        :param stream: Either "stdout" or "stderr".
+        :param data: The raw bytes read from the process.
+        :param final: Whether this is the last chunk of the stream.
+        :return: None
+        """
+
+        for line in job.feed(stream, data, final):
+            print(f"{stream.upper()} [{job.job_id}]: {line}")
+            self.scriptOutput.emit(job.job_id, stream, line)
+
+    def handle_stdout(self, job_id: int) -> None:
+        """
+        Handle standard output from the process of a job.
 
         This slot is connected to the readyReadStandardOutput signal of the
-        QProcess object. It reads the standard output data and prints it to
-        the console.
+        job's QProcess object. It streams the decoded output lines to the web UI.
 
+        :param job_id: The id of the job that produced the output.
         :return: None
         """
-        
-        data: "str|Any" = self.process.readAllStandardOutput().data()
-        print(f"STDOUT: {data}")
 
+        job: "ScriptJob|None" = self.jobs.get(job_id)
+
+        if job is None or job.process is None:
+            return
+
+        self.emit_output(
+            job, "stdout", bytes(job.process.readAllStandardOutput().data()))
 
-    def handle_stderr(self):
+    def handle_stderr(self, job_id: int) -> None:
         """
-        Handle standard error from the subprocess.
+        Handle standard error from the process of a job.
 
         This slot is connected to the readyReadStandardError signal of the
-        QProcess object. It reads the standard error data and prints it to
-        the console.
+        job's QProcess object. It streams the decoded error lines to the web UI.
+
+        :param job_id: The id of the job that produced the output.
+        :return: None
+        """
+
+        job: "ScriptJob|None" = self.jobs.get(job_id)
+
+        if job is None or job.process is None:
+            return
+
+        self.emit_output(
+            job, "stderr", bytes(job.process.readAllStandardError().data()))
+
+    def flush_output(self, job: ScriptJob) -> None:
+        """
+        Stream what is left in the pipes and in the partial line buffers of a job.
 
+        :param job: The job whose process ended.
         :return: None
         """
-        
-        data: "str|Any" = self.process.readAllStandardError().data()
-        print(f"STDERR: {data}")
 
+        if job.process is None:
+            return
 
-    def handle_finished(self, exit_code: int, _: Any):
+        self.emit_output(
+            job, "stdout", bytes(job.process.readAllStandardOutput().data()), True)
+        self.emit_output(
+            job, "stderr", bytes(job.process.readAllStandardError().data()), True)
+
+    def finish_job(self, job: ScriptJob, state: str, exit_code: int, message: str) -> None:
+        """
+        Record the end of a job and notify the web UI.
+
+        :param job: The job that ended.
+        :param state: The final state of the job.
+        :param exit_code: The exit code of the job's process.
+        :param message: Human readable outcome.
+        :return: None
         """
-        Handle the finished signal of the QProcess object.
 
-        This slot is connected to the finished signal of the QProcess object.
-        It reads the standard error data and prints it to the console.
+        job.state = state
+        job.exit_code = exit_code
+        job.finished_at = time.time()
+
+        self.jobFinished.emit(job.job_id, job.script_name, exit_code, message)
+        self.scriptExecuted.emit(job.script_name, message)
 
+    def handle_finished(self, job_id: int, exit_code: int, status: Any) -> None:
+        """
+        Handle the finished signal of the process of a job.
+
+        This slot is connected to the finished signal of the job's QProcess
+        object. It records the exit code and end time of the job and reports
+        the result to the web UI.
+
+        :param job_id: The id of the job whose process finished.
         :param exit_code: The exit code of the subprocess.
-        :param _: Unused parameter.
+        :param status: Whether the process exited normally or crashed.
         :return: None
         """
-        
-        script_name = getattr(self, 'current_script', 'Unknown')
 
-        if exit_code == 0:
-            self.scriptExecuted.emit(script_name, "Script executed successfully!")
-            
+        job: "ScriptJob|None" = self.jobs.get(job_id)
+
+        if job is None or not job.is_active():
+            return
+
+        self.flush_output(job)
+
+        if status == QProcess.ExitStatus.CrashExit:
+            self.finish_job(job, ScriptJob.CRASHED, exit_code,
+                            f"Error: process crashed {job.last_error}")
+
+        elif exit_code == 0:
+            self.finish_job(job, ScriptJob.FINISHED, exit_code,
+                            "Script executed successfully!")
+
         else:
-            error_msg: "str|Any" = self.process.readAllStandardError().data()
-            
-            if isinstance(error_msg, str):
-                error_msg = f"Error: {error_msg}"
-                self.scriptExecuted.emit(script_name, error_msg)
-            
-            else:
-                error_msg = f"Error: {error_msg}"
-                self.scriptExecuted.emit(script_name, error_msg)
+            self.finish_job(job, ScriptJob.FAILED, exit_code,
+                            f"Error: {job.last_error}")
+
+    def handle_error(self, job_id: int, error: Any) -> None:
+        """
+        Handle processes that could not be started, which never emit finished.
+
+        :param job_id: The id of the job whose process failed.
+        :param error: The QProcess error.
+        :return: None
+        """
+
+        job: "ScriptJob|None" = self.jobs.get(job_id)
+
+        if job is None or not job.is_active():
+            return
+
+        if error == QProcess.ProcessError.FailedToStart:
+            self.finish_job(job, ScriptJob.FAILED, -1,
+                            "Error: failed to start the script")
 
 
 class MainWindow(QMainWindow):
@@ -220,6 +662,7 @@ def main() -> NoReturn:
         ...
 
     window: MainWindow = MainWindow()
+    app.aboutToQuit.connect(window.script_runner.shutdown)
     window.show()
 
     sys.exit(app.exec())